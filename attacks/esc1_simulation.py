@@ -27,6 +27,9 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
 
     parser = argparse.ArgumentParser(description="Run ESC1 simulation against lab config")
     parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH, help="Path to lab YAML config")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore and do not write the compiled configuration snapshot"
+    )
     parser.add_argument("--requester", type=str, default="alice", help="Security principal requesting enrollment")
     return parser.parse_args(argv)
 
@@ -37,7 +40,7 @@ def main(argv: List[str] | None = None) -> int:
     args = parse_args(argv)
     try:
         config = LabConfiguration(args.config)
-        config.load()
+        config.load(use_cache=not args.no_cache)
     except (FileNotFoundError, ValueError) as exc:
         LOGGER.error("Unable to load configuration: %s", exc)
         return 3
@@ -1,57 +1,128 @@
+// Dashboard renderer for the feed exported by `adcs-lab dashboard` (or served at
+// `/dashboard` by `adcs-lab serve`). Pass `?feed=<url>` to read another source;
+// `sampleData` is only shown when the feed cannot be fetched (e.g. file:// pages).
+const params = new URLSearchParams(window.location.search);
+const FEED_URL = params.get("feed") || "dashboard.json";
+const POLL_INTERVAL_MS = Number(params.get("poll") || 30000);
+const PAGE_SIZE = 50;
+
 const sampleData = {
+  revision: "sample",
   cas: [
-    { name: "LAB-ROOT-CA", role: "Root", children: ["LAB-SUB-CA"] },
-    { name: "LAB-SUB-CA", role: "Subordinate", children: [] },
+    { name: "LAB-ROOT-CA", role: "root", children: ["LAB-SUB-CA"] },
+    { name: "LAB-SUB-CA", role: "subordinate", children: [] },
   ],
   templates: [
     { name: "UserAuthentication", eku: ["Client Authentication"], risk: "medium" },
     { name: "ESC1-Template", eku: ["Client Authentication", "Smart Card Logon"], risk: "high" },
   ],
-  detections: [
-    { template: "ESC1-Template", severity: "high", message: "Subject editable without approval" },
-  ],
+  rules: {
+    ESC1: { severity: "high", message: "Subject editable without approval" },
+  },
+  detections: [{ template: "ESC1-Template", rule: "ESC1" }],
+  score: { hardened: 1, total: 2, percentage: 50 },
 };
 
+const state = { data: null, revision: null, pages: { templates: 0, detections: 0 } };
+
 function renderPKIGraph() {
-  const container = document.getElementById("pki-graph");
-  container.innerHTML = "";
-  sampleData.cas.forEach((ca) => {
+  const fragment = document.createDocumentFragment();
+  state.data.cas.forEach((ca) => {
     const element = document.createElement("div");
     element.className = "badge";
-    element.innerText = `${ca.role}: ${ca.name}`;
-    container.appendChild(element);
+    const children = ca.children.length ? ` → ${ca.children.join(", ")}` : "";
+    element.textContent = `${ca.role}: ${ca.name}${children}`;
+    fragment.appendChild(element);
   });
+  document.getElementById("pki-graph").replaceChildren(fragment);
+}
+
+function renderPage(key, containerId, pagerId, renderItem) {
+  const items = state.data[key];
+  const pageCount = Math.max(1, Math.ceil(items.length / PAGE_SIZE));
+  const page = Math.min(state.pages[key], pageCount - 1);
+  state.pages[key] = page;
+
+  const fragment = document.createDocumentFragment();
+  items.slice(page * PAGE_SIZE, (page + 1) * PAGE_SIZE).forEach((item) => fragment.appendChild(renderItem(item)));
+  document.getElementById(containerId).replaceChildren(fragment);
+
+  const pager = document.getElementById(pagerId);
+  const label = document.createElement("span");
+  label.textContent = ` ${page + 1} / ${pageCount} (${items.length}) `;
+  pager.replaceChildren(
+    pagerButton("‹", page > 0, () => turnPage(key, -1)),
+    label,
+    pagerButton("›", page < pageCount - 1, () => turnPage(key, 1)),
+  );
+}
+
+function pagerButton(text, enabled, onClick) {
+  const button = document.createElement("button");
+  button.textContent = text;
+  button.disabled = !enabled;
+  button.addEventListener("click", onClick);
+  return button;
+}
+
+function turnPage(key, delta) {
+  state.pages[key] += delta;
+  if (key === "templates") {
+    renderTemplates();
+  } else {
+    renderDetections();
+  }
 }
 
 function renderTemplates() {
-  const list = document.getElementById("template-list");
-  list.innerHTML = "";
-  sampleData.templates.forEach((template) => {
+  renderPage("templates", "template-list", "template-pager", (template) => {
     const item = document.createElement("li");
-    item.innerText = `${template.name} – EKU: ${template.eku.join(", ")} (risk: ${template.risk})`;
-    list.appendChild(item);
+    item.textContent = `${template.name} – EKU: ${template.eku.join(", ")} (risk: ${template.risk})`;
+    return item;
   });
 }
 
 function renderDetections() {
-  const feed = document.getElementById("detection-feed");
-  feed.innerHTML = "";
-  sampleData.detections.forEach((finding) => {
+  renderPage("detections", "detection-feed", "detection-pager", (finding) => {
+    const rule = state.data.rules[finding.rule] || { severity: "unknown", message: finding.rule };
     const card = document.createElement("div");
     card.className = "badge";
-    card.innerText = `${finding.severity.toUpperCase()} – ${finding.template}: ${finding.message}`;
-    feed.appendChild(card);
+    card.textContent = `${rule.severity.toUpperCase()} – ${finding.template}: ${rule.message}`;
+    return card;
   });
 }
 
 function renderScore() {
-  const score = document.getElementById("score");
-  const hardenedTemplates = sampleData.templates.filter((t) => t.risk !== "high").length;
-  const percentage = Math.round((hardenedTemplates / sampleData.templates.length) * 100);
-  score.innerText = `Hardening completeness: ${percentage}%`;
+  const { percentage } = state.data.score;
+  document.getElementById("score").textContent = `Hardening completeness: ${percentage}%`;
+}
+
+function render(data) {
+  if (data.revision === state.revision) {
+    return;
+  }
+  state.data = data;
+  state.revision = data.revision;
+  renderPKIGraph();
+  renderTemplates();
+  renderDetections();
+  renderScore();
+}
+
+async function refresh() {
+  try {
+    const response = await fetch(FEED_URL, { cache: "no-store" });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    render(await response.json());
+  } catch (error) {
+    console.warn(`Dashboard feed unavailable (${error}); showing sample data.`);
+    if (state.data === null) {
+      render(sampleData);
+    }
+  }
 }
 
-renderPKIGraph();
-renderTemplates();
-renderDetections();
-renderScore();
+refresh();
+setInterval(refresh, POLL_INTERVAL_MS);
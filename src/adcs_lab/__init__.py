@@ -1,9 +1,30 @@
-"""ADCS Lab package for simulated attack, detection, and defence logic."""
+"""ADCS Lab package for simulated attack, detection, and defence logic.
 
-from adcs_lab.attack_simulator import Esc1Simulation
-from adcs_lab.config_loader import LabConfiguration
-from adcs_lab.detection import TemplateAnalyzer, Finding
-from adcs_lab.hardening import EkuHardener
+Public classes are resolved lazily on first attribute access so that importing
+the package (for example from the CLI entry point) does not pull in every
+submodule and its third-party dependencies up front.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from adcs_lab.attack_simulator import Esc1Simulation
+    from adcs_lab.config_loader import LabConfiguration
+    from adcs_lab.detection import Finding, TemplateAnalyzer
+    from adcs_lab.graph import EscalationGraph
+    from adcs_lab.hardening import EkuHardener
+
+_EXPORTS = {
+    "Esc1Simulation": "adcs_lab.attack_simulator",
+    "LabConfiguration": "adcs_lab.config_loader",
+    "TemplateAnalyzer": "adcs_lab.detection",
+    "Finding": "adcs_lab.detection",
+    "EkuHardener": "adcs_lab.hardening",
+    "EscalationGraph": "adcs_lab.graph",
+}
 
 __all__ = [
     "Esc1Simulation",
@@ -11,4 +32,18 @@ __all__ = [
     "TemplateAnalyzer",
     "Finding",
     "EkuHardener",
+    "EscalationGraph",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,59 @@
+"""Atomic replacement of generated files.
+
+Every file adcs-lab writes for another reader (metrics textfiles, dashboard
+feeds, scan state, configuration snapshots) goes through :func:`atomic_write`,
+which writes a ``.tmp`` sibling, syncs it to disk and renames it over the
+target, so readers see either the old file or the new one, never a partial
+write.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import stat
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Tuple
+
+_CREATE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+_CREATE_ATTEMPTS = 100
+
+
+@contextmanager
+def atomic_write(path: str | Path, mode: str = "w") -> Iterator[IO[Any]]:
+    """Yield a file that replaces ``path`` when the block exits cleanly; text modes use UTF-8.
+
+    The new file keeps the permissions of the file it replaces, or gets the
+    usual ``0o666 & ~umask`` when ``path`` does not exist yet. On error the
+    temporary file is removed and ``path`` is left untouched.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary, fd = _create_temporary(path)
+    try:
+        with open(fd, mode, encoding=None if "b" in mode else "utf-8") as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        try:
+            os.chmod(temporary, stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def _create_temporary(path: Path) -> Tuple[Path, int]:
+    """Create a unique ``.tmp`` sibling of ``path``; the kernel applies the umask to its ``0o666`` mode."""
+
+    for _ in range(_CREATE_ATTEMPTS):
+        temporary = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return temporary, os.open(temporary, _CREATE_FLAGS, 0o666)
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Could not create a temporary file next to {path}")
@@ -7,16 +7,27 @@ without touching real Active Directory environments.
 from __future__ import annotations
 
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List
-
-from rich.table import Table
-from rich.console import Console
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from adcs_lab import profiling
 from adcs_lab.config_loader import LabConfiguration, CertificateTemplate, SecurityPrincipal
+from adcs_lab.rendering import get_console
 
 logger = logging.getLogger(__name__)
-console = Console()
+
+_BLOCKED_MESSAGE = "No ESC1-prone templates are accessible to the requester."
+_SUCCESS_MESSAGE = "Requester can enroll in ESC1-prone templates leading to privilege escalation."
+_REASON = "Subject editable; manager approval disabled"
+
+# ESC1-prone templates as (enrollment group mask, name) pairs, in configuration order.
+VulnerableTemplates = Tuple[Tuple[int, str], ...]
+
+_worker_templates: VulnerableTemplates = ()
+
+DEFAULT_CACHE_SIZE = 4096
 
 
 @dataclass
@@ -28,6 +39,92 @@ class SimulationResult:
     impacted_templates: List[str]
 
 
+class SimulationCache:
+    """LRU memo of ESC1 results keyed on a configuration generation and an effective group mask.
+
+    Results depend only on a principal's effective groups, as numbered by
+    :meth:`LabConfiguration.effective_group_mask`, so principals whose group
+    sets grant the same enrollment share one entry. The cache follows one configuration
+    at a time: it empties itself when it sees a different
+    ``LabConfiguration.index_generation``, which changes on every load,
+    :meth:`~LabConfiguration.reindex`, :meth:`~LabConfiguration.refresh_templates`
+    (run by :class:`EkuHardener` after it patches templates) and template
+    add/remove/rename. Call :meth:`clear` to
+    drop entries explicitly, for example when swapping configurations.
+    Methods are thread-safe, so one cache can serve queries answered in
+    worker threads.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        if maxsize < 1:
+            raise ValueError("Simulation cache size must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._generation: Optional[int] = None
+        self._results: "OrderedDict[Tuple[bool, int], Tuple[str, ...]]" = OrderedDict()
+        self._vulnerable: Dict[bool, VulnerableTemplates] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def clear(self) -> None:
+        """Drop every cached result and vulnerable-template list."""
+
+        with self._lock:
+            self._generation = None
+            self._results.clear()
+            self._vulnerable.clear()
+
+    def get(self, configuration: LabConfiguration, issuable_only: bool, group_mask: int) -> Optional[Tuple[str, ...]]:
+        """Return impacted template names cached for ``group_mask``, or ``None`` on a miss."""
+
+        key = (issuable_only, group_mask)
+        with self._lock:
+            self._sync(configuration)
+            impacted = self._results.get(key)
+            if impacted is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return impacted
+
+    def put(
+        self,
+        configuration: LabConfiguration,
+        issuable_only: bool,
+        group_mask: int,
+        impacted: Tuple[str, ...],
+    ) -> None:
+        key = (issuable_only, group_mask)
+        with self._lock:
+            self._sync(configuration)
+            self._results[key] = impacted
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def vulnerable_templates(self, simulation: "Esc1Simulation") -> VulnerableTemplates:
+        """Return the simulation's ESC1-prone templates, collecting them once per generation."""
+
+        with self._lock:
+            self._sync(simulation.configuration)
+            templates = self._vulnerable.get(simulation.issuable_only)
+            if templates is None:
+                templates = self._vulnerable[simulation.issuable_only] = simulation._vulnerable_templates()
+            return templates
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._results), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def _sync(self, configuration: LabConfiguration) -> None:
+        if configuration.index_generation != self._generation:
+            self.clear()
+            self._generation = configuration.index_generation
+
+
 class Esc1Simulation:
     """Simulate ESC1 (user certificate mapping abuse).
 
@@ -35,47 +132,153 @@ class Esc1Simulation:
     arbitrary subject alternative names (SAN) or subject names. This
     simulation checks for templates that allow subject editing and lack
     manager approval.
+
+    With ``issuable_only`` the simulation ignores templates that no CA chained
+    to an NTAuth-published CA publishes (see :meth:`LabConfiguration.is_issuable`).
+
+    Results are memoised in ``cache``; pass one :class:`SimulationCache` to
+    many simulations (as ``adcs-lab serve`` does) to share it between queries.
     """
 
-    def __init__(self, configuration: LabConfiguration) -> None:
+    def __init__(
+        self,
+        configuration: LabConfiguration,
+        *,
+        issuable_only: bool = False,
+        cache: Optional[SimulationCache] = None,
+    ) -> None:
         self.configuration = configuration
+        self.issuable_only = issuable_only
+        self.cache = cache if cache is not None else SimulationCache()
 
     def _template_is_esc1(self, template: CertificateTemplate) -> bool:
         """Assess whether a template is ESC1-like."""
 
-        return template.subject_name_editable and not template.manager_approval_required
+        flags = self.configuration.template_flags(template)
+        return flags.esc1_prone and (flags.issuable or not self.issuable_only)
 
-    def run(self, requester: SecurityPrincipal) -> SimulationResult:
+    def run(self, requester: SecurityPrincipal, *, show_table: bool = True) -> SimulationResult:
         """Execute the simulation for a given security principal."""
 
         logger.info("Running ESC1 simulation for requester %s", requester.name)
-        vulnerable_templates = [
-            template for template in self.configuration.certificate_templates if self._template_is_esc1(template)
-        ]
-
-        eligible_templates = [
-            template
-            for template in vulnerable_templates
-            if any(group in template.enrollment_rights for group in requester.groups)
-        ]
-
-        if not eligible_templates:
-            return SimulationResult(
-                success=False,
-                message="No ESC1-prone templates are accessible to the requester.",
-                impacted_templates=[],
-            )
-
-        table = Table(title="ESC1 Simulation")
-        table.add_column("Template")
-        table.add_column("Reason")
-        for template in eligible_templates:
-            reason = "Subject editable; manager approval disabled"
-            table.add_row(template.name, reason)
-        console.print(table)
-
-        return SimulationResult(
-            success=True,
-            message="Requester can enroll in ESC1-prone templates leading to privilege escalation.",
-            impacted_templates=[template.name for template in eligible_templates],
+        with profiling.stage("simulate.run") as record:
+            group_mask = self.configuration.effective_group_mask(requester)
+            impacted = self.cache.get(self.configuration, self.issuable_only, group_mask)
+            if impacted is None:
+                impacted = _impacted(group_mask, self.cache.vulnerable_templates(self))
+                self.cache.put(self.configuration, self.issuable_only, group_mask, impacted)
+            record.count(1)
+
+        if impacted and show_table:
+            from rich.table import Table
+
+            table = Table(title="ESC1 Simulation")
+            table.add_column("Template")
+            table.add_column("Reason")
+            for name in impacted:
+                table.add_row(name, _REASON)
+            get_console().print(table)
+
+        return _result(list(impacted))
+
+    def run_all(self, *, workers: Optional[int] = None) -> Dict[str, SimulationResult]:
+        """Simulate ESC1 for every security principal in the configuration."""
+
+        return self.run_many(self.configuration.security_principals, workers=workers)
+
+    def run_many(
+        self, principals: Iterable[SecurityPrincipal], *, workers: Optional[int] = None
+    ) -> Dict[str, SimulationResult]:
+        """Simulate ESC1 for many principals in a single pass.
+
+        ESC1-prone templates are identified once with their enrollment group
+        masks, and principals sharing the same effective (nested) group mask
+        share one evaluation. Masks already in the cache are not evaluated
+        again.
+        With ``workers`` greater than one, the remaining masks are evaluated
+        in chunks across a process pool.
+
+        Returns
+        -------
+        Dict[str, SimulationResult]
+            Results keyed by principal name, in input order.
+        """
+
+        with profiling.stage("simulate.run_many") as record:
+            configuration = self.configuration
+            requesters = [(principal.name, configuration.effective_group_mask(principal)) for principal in principals]
+            known: Dict[int, Tuple[str, ...]] = {}
+            pending: List[int] = []
+            for _, group_mask in requesters:
+                if group_mask in known:
+                    continue
+                cached = self.cache.get(configuration, self.issuable_only, group_mask)
+                known[group_mask] = () if cached is None else cached
+                if cached is None:
+                    pending.append(group_mask)
+
+            if pending:
+                templates = self.cache.vulnerable_templates(self)
+                logger.info(
+                    "Running ESC1 simulation for %d requesters (%d uncached group masks) against %d vulnerable "
+                    "templates",
+                    len(requesters),
+                    len(pending),
+                    len(templates),
+                )
+                if workers and workers > 1 and len(pending) > 1:
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    chunk_size = max(1, -(-len(pending) // (workers * 4)))
+                    chunks = [pending[offset : offset + chunk_size] for offset in range(0, len(pending), chunk_size)]
+                    with ProcessPoolExecutor(
+                        max_workers=workers, initializer=_init_worker, initargs=(templates,)
+                    ) as pool:
+                        evaluated = [impacted for chunk in pool.map(_evaluate_chunk, chunks) for impacted in chunk]
+                else:
+                    evaluated = [_impacted(group_mask, templates) for group_mask in pending]
+                for group_mask, impacted in zip(pending, evaluated):
+                    known[group_mask] = impacted
+                    self.cache.put(configuration, self.issuable_only, group_mask, impacted)
+
+            record.count(len(requesters))
+            return {name: _result(list(known[group_mask])) for name, group_mask in requesters}
+
+    def _vulnerable_templates(self) -> VulnerableTemplates:
+        """Collect ESC1-prone templates with the group masks allowed to enroll in them."""
+
+        configuration = self.configuration
+        return tuple(
+            (configuration.enrollment_mask(template), template.name)
+            for template in configuration.certificate_templates
+            if self._template_is_esc1(template)
         )
+
+
+def _result(impacted_templates: List[str]) -> SimulationResult:
+    """Build a simulation result for the templates a requester can abuse."""
+
+    if not impacted_templates:
+        return SimulationResult(success=False, message=_BLOCKED_MESSAGE, impacted_templates=[])
+    return SimulationResult(success=True, message=_SUCCESS_MESSAGE, impacted_templates=impacted_templates)
+
+
+def _impacted(group_mask: int, templates: VulnerableTemplates) -> Tuple[str, ...]:
+    """Return the names of vulnerable templates whose enrollment mask intersects ``group_mask``."""
+
+    if not group_mask:
+        return ()
+    return tuple(name for enrollment_mask, name in templates if enrollment_mask & group_mask)
+
+
+def _init_worker(templates: VulnerableTemplates) -> None:
+    """Install the shared vulnerable-template list in a pool worker."""
+
+    global _worker_templates
+    _worker_templates = templates
+
+
+def _evaluate_chunk(group_masks: Sequence[int]) -> List[Tuple[str, ...]]:
+    """Pool entry point evaluating one chunk of group masks."""
+
+    return [_impacted(group_mask, _worker_templates) for group_mask in group_masks]
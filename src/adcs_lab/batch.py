@@ -0,0 +1,164 @@
+"""Batch detection across many tenant configuration files.
+
+Each configuration is loaded and scanned independently, either in process or
+across a process pool. The rule selection is validated once up front and
+handed to each pool worker when it starts; the compiled rule definitions are
+module-level, so a worker builds them once and reuses them for every file it
+scans. At most ``2 * workers`` files are in flight at a time, so memory stays
+bounded by the pool size rather than the number of tenants. A file that fails
+to load or validate is reported with exit code ``3`` and does not stop the
+batch.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from adcs_lab.config_loader import LabConfiguration
+from adcs_lab.detection import Finding, TemplateAnalyzer
+from adcs_lab.rules import select_rules
+
+logger = logging.getLogger(__name__)
+
+CONFIG_SUFFIXES = (".yaml", ".yml", ".json", ".ndjson", ".jsonl")
+LOAD_ERROR_EXIT_CODE = 3
+
+_worker_settings: Tuple[Optional[List[str]], bool, bool] = (None, False, True)
+
+
+@dataclass
+class TenantReport:
+    """Detection outcome for one configuration file."""
+
+    config: str
+    exit_code: int = 0
+    error: Optional[str] = None
+    findings: List[Finding] = field(default_factory=list)
+
+    @property
+    def status(self) -> str:
+        return "ok" if self.exit_code == 0 else "error"
+
+    def summary(self) -> Dict[str, int]:
+        """Return finding counts in total and by severity."""
+
+        counts = {"findings": len(self.findings), "high": 0, "medium": 0, "low": 0}
+        for finding in self.findings:
+            counts[finding.severity] = counts.get(finding.severity, 0) + 1
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable representation of the tenant report."""
+
+        return {
+            "config": self.config,
+            "status": self.status,
+            "exit_code": self.exit_code,
+            "error": self.error,
+            "summary": self.summary(),
+            "findings": [finding.__dict__ for finding in self.findings],
+        }
+
+
+def resolve_configs(spec: str | Path) -> List[Path]:
+    """Expand a directory (its YAML/JSON/NDJSON files) or a glob pattern into a sorted list of configuration paths."""
+
+    path = Path(spec)
+    if path.is_dir():
+        return sorted(child for child in path.iterdir() if child.suffix.lower() in CONFIG_SUFFIXES and child.is_file())
+    return sorted(Path(match) for match in glob.glob(str(spec), recursive=True) if Path(match).is_file())
+
+
+def consolidate(reports: Sequence[TenantReport]) -> Dict[str, Any]:
+    """Build the batch report with overall and per-tenant summaries."""
+
+    totals = {"findings": 0, "high": 0, "medium": 0, "low": 0}
+    for report in reports:
+        for key, value in report.summary().items():
+            totals[key] = totals.get(key, 0) + value
+    failed = sum(1 for report in reports if report.exit_code)
+    return {
+        "summary": {"configs": len(reports), "scanned": len(reports) - failed, "failed": failed, **totals},
+        "tenants": [report.to_dict() for report in reports],
+    }
+
+
+class BatchScanner:
+    """Scan many configuration files with shared rule selection and per-file error isolation."""
+
+    def __init__(
+        self,
+        *,
+        rules: Optional[Iterable[str]] = None,
+        issuable_only: bool = False,
+        use_cache: bool = True,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.rule_ids = None if rules is None else list(rules)
+        select_rules(self.rule_ids)
+        self.issuable_only = issuable_only
+        self.use_cache = use_cache
+        self.workers = workers
+
+    def run(self, paths: Sequence[Path]) -> List[TenantReport]:
+        return list(self.iter_reports(paths))
+
+    def iter_reports(self, paths: Sequence[Path]) -> Iterator[TenantReport]:
+        """Yield one report per path, in input order, as scans complete."""
+
+        if not self.workers or self.workers <= 1 or len(paths) <= 1:
+            for path in paths:
+                yield _scan(path, self.rule_ids, self.issuable_only, self.use_cache)
+            return
+
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        window = 2 * self.workers
+        logger.info("Scanning %d configurations across %d workers", len(paths), self.workers)
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.rule_ids, self.issuable_only, self.use_cache),
+        ) as pool:
+            pending: List[Future[TenantReport]] = []
+            remaining = iter(paths)
+            for path in remaining:
+                pending.append(pool.submit(_scan_in_worker, path))
+                if len(pending) >= window:
+                    break
+            while pending:
+                yield pending.pop(0).result()
+                following = next(remaining, None)
+                if following is not None:
+                    pending.append(pool.submit(_scan_in_worker, following))
+
+
+def _scan(path: Path, rule_ids: Optional[List[str]], issuable_only: bool, use_cache: bool) -> TenantReport:
+    """Load and scan one configuration, capturing load errors in the report."""
+
+    configuration = LabConfiguration(path)
+    try:
+        configuration.load(use_cache=use_cache)
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        logger.error("Unable to load configuration %s: %s", path, exc)
+        return TenantReport(config=str(path), exit_code=LOAD_ERROR_EXIT_CODE, error=str(exc))
+    analyzer = TemplateAnalyzer(configuration, rules=rule_ids, issuable_only=issuable_only)
+    return TenantReport(config=str(path), findings=list(analyzer.iter_findings()))
+
+
+def _init_worker(rule_ids: Optional[List[str]], issuable_only: bool, use_cache: bool) -> None:
+    """Install the batch settings in a pool worker."""
+
+    global _worker_settings
+    _worker_settings = (rule_ids, issuable_only, use_cache)
+
+
+def _scan_in_worker(path: Path) -> TenantReport:
+    """Pool entry point scanning one configuration with the worker's shared settings."""
+
+    rule_ids, issuable_only, use_cache = _worker_settings
+    return _scan(path, rule_ids, issuable_only, use_cache)
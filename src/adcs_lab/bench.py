@@ -0,0 +1,261 @@
+"""Benchmark harness for the load, simulate, detect and harden stages.
+
+:func:`run_benchmarks` times each stage against one configuration file,
+keeping the best wall time of ``repeat`` runs, then runs the stage once more
+under :mod:`tracemalloc` to record the peak memory it allocates. Per-stage
+setup (loading a fresh configuration for hardening, which mutates it) is not
+timed, and ``adcs_lab`` log records below WARNING are suppressed while the
+stages run so that logging does not dominate the measurements. Reports
+serialise to JSON so that one run can be stored as a baseline and later runs
+compared against it with :func:`compare`.
+
+Typical use is ``adcs-lab bench``, which generates a synthetic forest (see
+:mod:`adcs_lab.synthetic`) and benchmarks it.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import platform
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from adcs_lab.attack_simulator import Esc1Simulation
+from adcs_lab.config_loader import LabConfiguration
+from adcs_lab.detection import TemplateAnalyzer
+from adcs_lab.hardening import EkuHardener
+
+DEFAULT_TOLERANCE = 0.25
+# Stages faster than this in both runs are too noisy for a timing comparison.
+MIN_SIGNIFICANT_SECONDS = 0.005
+
+
+@dataclass
+class StageResult:
+    """Best wall time, processed item count and peak traced memory of one stage."""
+
+    stage: str
+    seconds: float
+    items: int
+    peak_bytes: int
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second."""
+
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "seconds": self.seconds,
+            "items": self.items,
+            "throughput": self.throughput,
+            "peak_bytes": self.peak_bytes,
+        }
+
+
+@dataclass
+class BenchmarkReport:
+    """Stage results for one configuration, with the inputs that produced them."""
+
+    config: str
+    stages: List[StageResult]
+    forest: Optional[Dict[str, Any]] = None
+    python: str = field(default_factory=platform.python_version)
+
+    def stage(self, name: str) -> Optional[StageResult]:
+        return next((result for result in self.stages if result.stage == name), None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "config": self.config,
+            "forest": self.forest,
+            "python": self.python,
+            "stages": [result.to_dict() for result in self.stages],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkReport":
+        try:
+            stages = [
+                StageResult(
+                    stage=str(item["stage"]),
+                    seconds=float(item["seconds"]),
+                    items=int(item["items"]),
+                    peak_bytes=int(item["peak_bytes"]),
+                )
+                for item in data["stages"]
+            ]
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid benchmark report: {exc}") from exc
+        return cls(
+            config=str(data.get("config", "")), stages=stages, forest=data.get("forest"), python=data.get("python", "")
+        )
+
+
+@dataclass
+class Regression:
+    """A stage metric that exceeded its baseline by more than the tolerance."""
+
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.__dict__, "ratio": self.ratio}
+
+
+@dataclass
+class _Stage:
+    setup: Callable[[Path, Path], Any]
+    run: Callable[[Any], int]
+
+
+def _load(path: Path, cache_dir: Path, *, use_cache: bool = False) -> LabConfiguration:
+    configuration = LabConfiguration(path, cache_dir=cache_dir)
+    configuration.load(use_cache=use_cache)
+    return configuration
+
+
+def _entity_count(configuration: LabConfiguration) -> int:
+    return (
+        len(configuration.certificate_templates)
+        + len(configuration.certificate_authorities)
+        + len(configuration.security_principals)
+        + len(configuration.security_groups)
+    )
+
+
+def _paths(path: Path, cache_dir: Path) -> Tuple[Path, Path]:
+    return path, cache_dir
+
+
+def _warm_snapshot(path: Path, cache_dir: Path) -> Tuple[Path, Path]:
+    _load(path, cache_dir, use_cache=True)
+    return path, cache_dir
+
+
+def _run_load(paths: Tuple[Path, Path]) -> int:
+    return _entity_count(_load(*paths))
+
+
+def _run_load_cached(paths: Tuple[Path, Path]) -> int:
+    return _entity_count(_load(*paths, use_cache=True))
+
+
+def _run_simulate(configuration: LabConfiguration) -> int:
+    return len(Esc1Simulation(configuration).run_all())
+
+
+def _run_detect(configuration: LabConfiguration) -> int:
+    for _ in TemplateAnalyzer(configuration).iter_findings():
+        pass
+    return len(configuration.certificate_templates)
+
+
+def _run_harden(configuration: LabConfiguration) -> int:
+    hardener = EkuHardener(configuration.certificate_templates, configuration=configuration)
+    for _ in hardener.iter_apply():
+        pass
+    return len(configuration.certificate_templates)
+
+
+# Stage name -> (untimed setup, timed run returning the number of items processed).
+STAGES: Dict[str, _Stage] = {
+    "load": _Stage(setup=_paths, run=_run_load),
+    "load_cached": _Stage(setup=_warm_snapshot, run=_run_load_cached),
+    "simulate": _Stage(setup=_load, run=_run_simulate),
+    "detect": _Stage(setup=_load, run=_run_detect),
+    "harden": _Stage(setup=_load, run=_run_harden),
+}
+
+
+def run_benchmarks(
+    config_path: str | Path,
+    *,
+    stages: Optional[Iterable[str]] = None,
+    repeat: int = 3,
+    forest: Optional[Dict[str, Any]] = None,
+) -> BenchmarkReport:
+    """Benchmark ``stages`` (all of :data:`STAGES` by default) against one configuration."""
+
+    names = list(STAGES) if stages is None else list(stages)
+    unknown = set(names).difference(STAGES)
+    if unknown:
+        raise ValueError("Unknown benchmark stages: " + ", ".join(sorted(unknown)))
+    path = Path(config_path)
+    results = []
+    package_logger = logging.getLogger("adcs_lab")
+    previous_level = package_logger.level
+    package_logger.setLevel(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory(prefix="adcs-lab-bench-") as cache_dir:
+            for name in names:
+                seconds, items, peak = _measure(STAGES[name], path, Path(cache_dir), max(1, repeat))
+                results.append(StageResult(stage=name, seconds=seconds, items=items, peak_bytes=peak))
+    finally:
+        package_logger.setLevel(previous_level)
+    return BenchmarkReport(config=str(path), stages=results, forest=forest)
+
+
+def _measure(stage: _Stage, path: Path, cache_dir: Path, repeat: int) -> Tuple[float, int, int]:
+    """Return the best of ``repeat`` timed runs, the item count, and the peak of one traced run."""
+
+    best = float("inf")
+    items = 0
+    for _ in range(repeat):
+        context = stage.setup(path, cache_dir)
+        gc.collect()
+        started = time.perf_counter()
+        items = stage.run(context)
+        best = min(best, time.perf_counter() - started)
+
+    context = stage.setup(path, cache_dir)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stage.run(context)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, items, peak
+
+
+def compare(
+    report: BenchmarkReport, baseline: BenchmarkReport, *, tolerance: float = DEFAULT_TOLERANCE
+) -> List[Regression]:
+    """Return stage metrics that are more than ``tolerance`` (a fraction) worse than the baseline.
+
+    Time is compared per item, so a baseline taken on a different forest size
+    still gives a meaningful comparison; stages missing from either report are
+    skipped.
+    """
+
+    regressions = []
+    for current in report.stages:
+        previous = baseline.stage(current.stage)
+        if previous is None:
+            continue
+        if max(current.seconds, previous.seconds) >= MIN_SIGNIFICANT_SECONDS:
+            now, before = _per_item(current.seconds, current.items), _per_item(previous.seconds, previous.items)
+            if now > before * (1 + tolerance):
+                regressions.append(Regression(current.stage, "seconds_per_item", before, now))
+        now, before = _per_item(current.peak_bytes, current.items), _per_item(previous.peak_bytes, previous.items)
+        if now > before * (1 + tolerance):
+            regressions.append(Regression(current.stage, "peak_bytes_per_item", before, now))
+    return regressions
+
+
+def _per_item(value: float, items: int) -> float:
+    return value / items if items else value
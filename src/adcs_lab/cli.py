@@ -3,91 +3,731 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
 import logging
+import sys
+import time
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Iterable, Optional, TextIO
 
-from adcs_lab import Esc1Simulation, LabConfiguration, TemplateAnalyzer, EkuHardener
+from adcs_lab import LabConfiguration
+
+if TYPE_CHECKING:
+    from adcs_lab.detection import TemplateAnalyzer
+    from adcs_lab.hardening import HardeningPlan
+    from adcs_lab.incremental import IncrementalScanResult
 
 LOGGER = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 
+_COMPACT_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
 
-def _load_configuration(path: Path) -> LabConfiguration:
-    """Load and validate lab configuration from a YAML file."""
+def _load_configuration(path: Path, *, use_cache: bool = True, workers: Optional[int] = None) -> LabConfiguration:
+    """Load and validate lab configuration from a YAML, JSON or NDJSON file."""
 
     configuration = LabConfiguration(path)
-    configuration.load()
+    configuration.load(use_cache=use_cache, workers=workers)
     return configuration
 
 
+def _output_format(args: argparse.Namespace) -> str:
+    """Resolve the requested output format; ``--output-json`` is shorthand for ``--format json``."""
+
+    return "json" if args.output_json else args.format
+
+
+def _open_output(path: Optional[Path]) -> ContextManager[TextIO]:
+    """Open the record destination: stdout by default, gzip-compressed for ``.gz`` paths."""
+
+    if path is None:
+        return contextlib.nullcontext(sys.stdout)
+    if path.suffix == ".gz":
+        import gzip
+
+        return gzip.open(path, "wt", encoding="utf-8")
+    return path.open("w", encoding="utf-8")
+
+
+def _emit(records: Iterable[Any], output_format: str, path: Optional[Path]) -> int:
+    """Write records as an indented JSON array or as compact JSON lines; return the record count.
+
+    JSON lines are encoded and written one record at a time, so the first
+    result reaches the destination without waiting for the full scan.
+    """
+
+    count = 0
+    with _open_output(path) as handle:
+        if output_format == "jsonl":
+            for record in records:
+                handle.write(_COMPACT_ENCODER.encode(record))
+                handle.write("\n")
+                count += 1
+        else:
+            collected = list(records)
+            count = len(collected)
+            handle.write(json.dumps(collected, indent=2))
+            handle.write("\n")
+    return count
+
+
 def _handle_simulate(args: argparse.Namespace) -> int:
     try:
-        config = _load_configuration(args.config)
+        config = _load_configuration(args.config, use_cache=not args.no_cache, workers=args.load_workers)
     except (FileNotFoundError, ValueError) as exc:
         LOGGER.error("Unable to load configuration: %s", exc)
         return 3
 
+    from adcs_lab.attack_simulator import Esc1Simulation
+
+    output_format = _output_format(args)
+    simulation = Esc1Simulation(config, issuable_only=args.issuable_only)
+    if args.all:
+        results = simulation.run_all(workers=args.workers)
+        vulnerable = sum(1 for result in results.values() if result.success)
+        records = ({"requester": name, **result.__dict__} for name, result in results.items())
+        if output_format == "jsonl":
+            _emit(records, output_format, args.output)
+        elif output_format == "json":
+            report = {
+                "summary": {"principals": len(results), "escalation_possible": vulnerable},
+                "results": list(records),
+            }
+            with _open_output(args.output) as handle:
+                handle.write(json.dumps(report, indent=2) + "\n")
+        else:
+            from rich.table import Table
+
+            from adcs_lab.rendering import get_console
+
+            table = Table(title="ESC1 Simulation (all principals)")
+            table.add_column("Requester")
+            table.add_column("Escalation")
+            table.add_column("Impacted templates")
+            for name, result in results.items():
+                table.add_row(name, "yes" if result.success else "no", ", ".join(result.impacted_templates) or "-")
+            get_console().print(table)
+        LOGGER.info("%d of %d principals can enroll in ESC1-prone templates", vulnerable, len(results))
+        return 0 if vulnerable else 2
+
     requester = config.principal_by_name(args.requester)
     if not requester:
         LOGGER.error("Requester %s not found in configuration", args.requester)
         return 1
 
-    simulation = Esc1Simulation(config)
-    result = simulation.run(requester)
+    result = simulation.run(requester, show_table=output_format == "table")
+    if output_format != "table":
+        record = {"requester": requester.name, **result.__dict__}
+        with _open_output(args.output) as handle:
+            if output_format == "jsonl":
+                handle.write(_COMPACT_ENCODER.encode(record) + "\n")
+            else:
+                handle.write(json.dumps(record, indent=2) + "\n")
     LOGGER.info("%s", result.message)
     return 0 if result.success else 2
 
 
 def _handle_detect(args: argparse.Namespace) -> int:
+    if args.configs is not None:
+        return _handle_batch_detect(args)
+    started = time.perf_counter()
     try:
-        config = _load_configuration(args.config)
+        config = _load_configuration(args.config, use_cache=not args.no_cache, workers=args.load_workers)
     except (FileNotFoundError, ValueError) as exc:
         LOGGER.error("Unable to load configuration: %s", exc)
         return 3
+    load_seconds = time.perf_counter() - started
+
+    from adcs_lab.detection import TemplateAnalyzer
+    from adcs_lab.metrics import MetricsRegistry, count_findings, tally, write_textfile
 
-    analyzer = TemplateAnalyzer(config)
-    findings = analyzer.run(show_table=not args.output_json)
-    if args.output_json:
-        print(json.dumps([finding.__dict__ for finding in findings], indent=2))
-    LOGGER.info("Completed scan with %d findings", len(findings))
+    analyzer = TemplateAnalyzer(config, rules=args.rules, issuable_only=args.issuable_only)
+    output_format = _output_format(args)
+    started = time.perf_counter()
+    if args.state is not None:
+        result = _report_incremental(analyzer, args.state, output_format, args.output)
+        templates = len(result.evaluated_templates)
+        counts = count_findings(result.findings)
+    else:
+        templates = len(analyzer.templates_in_scope())
+        if output_format == "table":
+            counts = count_findings(analyzer.run(workers=args.workers))
+        else:
+            counts = {}
+            findings = tally(analyzer.iter_findings(workers=args.workers), counts)
+            _emit((finding.__dict__ for finding in findings), output_format, args.output)
+        LOGGER.info("Completed scan with %d findings", sum(counts.values()))
+
+    if args.metrics_file is not None:
+        metrics = MetricsRegistry()
+        metrics.observe_load(
+            load_seconds, config.load_source, from_cache=None if args.no_cache else config.loaded_from_cache
+        )
+        metrics.observe_scan(counts, templates=templates, seconds=time.perf_counter() - started)
+        write_textfile(args.metrics_file, metrics)
+        LOGGER.info("Wrote scan metrics to %s", args.metrics_file)
     return 0
 
 
+def _handle_batch_detect(args: argparse.Namespace) -> int:
+    """Scan every configuration matched by ``--configs`` and emit one consolidated report."""
+
+    from adcs_lab.batch import LOAD_ERROR_EXIT_CODE, BatchScanner, consolidate, resolve_configs
+
+    if args.state is not None or args.metrics_file is not None:
+        LOGGER.error("--state and --metrics-file cannot be combined with --configs")
+        return 1
+    paths = resolve_configs(args.configs)
+    if not paths:
+        LOGGER.error("No configuration files match %s", args.configs)
+        return LOAD_ERROR_EXIT_CODE
+    scanner = BatchScanner(
+        rules=args.rules, issuable_only=args.issuable_only, use_cache=not args.no_cache, workers=args.workers
+    )
+    output_format = _output_format(args)
+    failed = 0
+    if output_format == "jsonl":
+
+        def records() -> Iterable[Any]:
+            nonlocal failed
+            for report in scanner.iter_reports(paths):
+                failed += bool(report.exit_code)
+                yield report.to_dict()
+
+        count = _emit(records(), output_format, args.output)
+    else:
+        reports = list(scanner.iter_reports(paths))
+        failed = sum(1 for report in reports if report.exit_code)
+        count = len(reports)
+        if output_format == "json":
+            with _open_output(args.output) as handle:
+                handle.write(json.dumps(consolidate(reports), indent=2) + "\n")
+        else:
+            from rich.table import Table
+
+            from adcs_lab.rendering import get_console
+
+            table = Table(title="Batch Template Scan")
+            for column in ("Config", "Status", "Findings", "High", "Medium", "Low"):
+                table.add_column(column)
+            for report in reports:
+                summary = report.summary()
+                table.add_row(
+                    report.config,
+                    report.status if report.error is None else f"{report.status}: {report.error}",
+                    *(str(summary[key]) for key in ("findings", "high", "medium", "low")),
+                )
+            get_console().print(table)
+    LOGGER.info("Scanned %d configurations; %d failed to load", count, failed)
+    return LOAD_ERROR_EXIT_CODE if failed else 0
+
+
+def _report_incremental(
+    analyzer: "TemplateAnalyzer", state_path: Path, output_format: str, output: Optional[Path]
+) -> "IncrementalScanResult":
+    """Run an incremental scan, report the finding diff against the previous run, and return the result."""
+
+    from adcs_lab.incremental import IncrementalScanner
+
+    result = IncrementalScanner(analyzer, state_path).run()
+    changes = [("new", finding) for finding in result.new] + [("resolved", finding) for finding in result.resolved]
+    if output_format == "jsonl":
+        unchanged = [("unchanged", finding) for finding in result.unchanged]
+        _emit(({"status": status, **finding.__dict__} for status, finding in changes + unchanged), "jsonl", output)
+    elif output_format == "json":
+        report = {
+            "summary": result.summary(),
+            "removed_templates": result.removed_templates,
+            "new": [finding.__dict__ for finding in result.new],
+            "resolved": [finding.__dict__ for finding in result.resolved],
+            "unchanged": [finding.__dict__ for finding in result.unchanged],
+        }
+        with _open_output(output) as handle:
+            handle.write(json.dumps(report, indent=2) + "\n")
+    elif changes:
+        from rich.table import Table
+
+        from adcs_lab.rendering import get_console
+
+        table = Table(title="Template Misconfiguration Changes")
+        table.add_column("Status")
+        table.add_column("Template")
+        table.add_column("Severity")
+        table.add_column("Description")
+        for status, finding in changes:
+            table.add_row(status, finding.template, finding.severity, finding.description)
+        get_console().print(table)
+    summary = result.summary()
+    LOGGER.info(
+        "Completed incremental scan with %d findings (%d new, %d resolved, %d unchanged)",
+        summary["findings"],
+        summary["new"],
+        summary["resolved"],
+        summary["unchanged"],
+    )
+    return result
+
+
 def _handle_harden(args: argparse.Namespace) -> int:
     try:
-        config = _load_configuration(args.config)
+        config = _load_configuration(args.config, use_cache=not args.no_cache, workers=args.load_workers)
     except (FileNotFoundError, ValueError) as exc:
         LOGGER.error("Unable to load configuration: %s", exc)
         return 3
 
-    hardener = EkuHardener(config.certificate_templates)
-    actions = hardener.apply()
-    LOGGER.info("Applied %d hardening actions", len(actions))
-    if args.output_json:
-        print(json.dumps([action.__dict__ for action in actions], indent=2))
+    from adcs_lab.hardening import EkuHardener
+
+    try:
+        hardener = EkuHardener(config.certificate_templates, configuration=config, controls=args.controls)
+    except ValueError as exc:
+        LOGGER.error("%s", exc)
+        return 1
+    output_format = _output_format(args)
+
+    if args.dry_run:
+        plan = hardener.plan().select(args.only)
+        if output_format == "table":
+            _print_plan(plan)
+        else:
+            _emit((patch.to_dict() for patch in plan.patches), output_format, args.output)
+        if args.write is not None:
+            config.dump(args.write, plan.view(config.certificate_templates))
+            LOGGER.info("Wrote hardened configuration to %s", args.write)
+        LOGGER.info("Planned %d hardening actions (dry run; no templates modified)", len(plan.patches))
+        return 0
+
+    if output_format == "table":
+        count = len(hardener.apply(only=args.only))
+    else:
+        count = _emit((action.__dict__ for action in hardener.iter_apply(only=args.only)), output_format, args.output)
+    if args.write is not None:
+        config.dump(args.write)
+        LOGGER.info("Wrote hardened configuration to %s", args.write)
+    LOGGER.info("Applied %d hardening actions", count)
     return 0
 
 
+def _handle_paths(args: argparse.Namespace) -> int:
+    try:
+        config = _load_configuration(args.config, use_cache=not args.no_cache, workers=args.load_workers)
+    except (FileNotFoundError, ValueError) as exc:
+        LOGGER.error("Unable to load configuration: %s", exc)
+        return 3
+
+    from adcs_lab.graph import EscalationGraph
+
+    if args.principal:
+        missing = [name for name in args.principal if config.principal_by_name(name) is None]
+        if missing:
+            LOGGER.error("Principal %s not found in configuration", ", ".join(missing))
+            return 1
+
+    graph = EscalationGraph.from_configuration(config)
+    paths = graph.escalation_paths(args.principal)
+    output_format = _output_format(args)
+    if output_format == "jsonl":
+        _emit((path.to_dict() for path in paths), output_format, args.output)
+    elif output_format == "json":
+        report = {
+            "summary": {
+                "nodes": graph.node_count,
+                "edges": graph.edge_count,
+                "principals_with_paths": len(paths),
+            },
+            "paths": [path.to_dict() for path in paths],
+        }
+        with _open_output(args.output) as handle:
+            handle.write(json.dumps(report, indent=2) + "\n")
+    elif paths:
+        from rich.table import Table
+
+        from adcs_lab.rendering import get_console
+
+        table = Table(title="Privilege Escalation Paths")
+        table.add_column("Principal")
+        table.add_column("Hops")
+        table.add_column("Path")
+        for path in paths:
+            table.add_row(path.principal, str(len(path.hops) - 1), path.describe())
+        get_console().print(table)
+    LOGGER.info("%d principals can reach domain authentication", len(paths))
+    return 0 if paths else 2
+
+
+def _handle_dashboard(args: argparse.Namespace) -> int:
+    try:
+        config = _load_configuration(args.config, use_cache=not args.no_cache, workers=args.load_workers)
+    except (FileNotFoundError, ValueError) as exc:
+        LOGGER.error("Unable to load configuration: %s", exc)
+        return 3
+
+    from adcs_lab.dashboard import build_dashboard, write_dashboard
+    from adcs_lab.detection import TemplateAnalyzer
+
+    analyzer = TemplateAnalyzer(config, issuable_only=args.issuable_only)
+    document = build_dashboard(config, analyzer.iter_findings(workers=args.workers))
+    write_dashboard(args.output, document)
+    LOGGER.info(
+        "Wrote dashboard feed revision %s (%d templates, %d detections) to %s",
+        document["revision"],
+        len(document["templates"]),
+        len(document["detections"]),
+        args.output,
+    )
+    return 0
+
+
+def _handle_serve(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from adcs_lab.attack_simulator import DEFAULT_CACHE_SIZE
+    from adcs_lab.server import LabServer
+
+    cache_size = DEFAULT_CACHE_SIZE if args.simulation_cache_size is None else args.simulation_cache_size
+    if cache_size < 1:
+        LOGGER.error("--simulation-cache-size must be at least 1")
+        return 1
+    server = LabServer(
+        args.config,
+        use_cache=not args.no_cache,
+        poll_interval=args.poll_interval,
+        simulation_cache_size=cache_size,
+        dashboard_origin=args.dashboard_origin,
+    )
+    try:
+        server.load()
+    except (FileNotFoundError, ValueError) as exc:
+        LOGGER.error("Unable to load configuration: %s", exc)
+        return 3
+    try:
+        asyncio.run(server.serve(host=args.host, port=args.port, unix_socket=args.socket))
+    except KeyboardInterrupt:
+        LOGGER.info("Server stopped")
+    return 0
+
+
+def _print_plan(plan: "HardeningPlan") -> None:
+    """Render a hardening plan as a field-level diff table."""
+
+    from rich.table import Table
+
+    from adcs_lab.rendering import get_console
+
+    table = Table(title="Hardening Plan (dry run)")
+    table.add_column("Template")
+    table.add_column("Field")
+    table.add_column("Before")
+    table.add_column("After")
+    for patch in plan.patches:
+        for change in patch.diff():
+            table.add_row(patch.template, change["field"], str(change["before"]), str(change["after"]))
+    get_console().print(table)
+
+
+def _forest_spec(args: argparse.Namespace) -> Any:
+    from adcs_lab.synthetic import ForestSpec
+
+    return ForestSpec(
+        cas=args.cas,
+        templates=args.templates,
+        principals=args.principals,
+        groups=args.groups,
+        nesting_depth=args.nesting_depth,
+        vulnerable_ratio=args.vulnerable_ratio,
+        seed=args.seed,
+    )
+
+
+def _handle_generate(args: argparse.Namespace) -> int:
+    from adcs_lab.synthetic import generate_forest, write_forest
+
+    try:
+        spec = _forest_spec(args)
+    except ValueError as exc:
+        LOGGER.error("%s", exc)
+        return 1
+    write_forest(args.output, generate_forest(spec))
+    LOGGER.info("Wrote synthetic configuration (%s) to %s", spec, args.output)
+    return 0
+
+
+def _handle_bench(args: argparse.Namespace) -> int:
+    import tempfile
+
+    from adcs_lab.bench import BenchmarkReport, compare, run_benchmarks
+    from adcs_lab.synthetic import generate_forest, write_forest
+
+    baseline = None
+    if args.baseline is not None:
+        try:
+            baseline = BenchmarkReport.from_dict(json.loads(args.baseline.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as exc:
+            LOGGER.error("Unable to read benchmark baseline %s: %s", args.baseline, exc)
+            return 1
+
+    try:
+        if args.from_config:
+            report = run_benchmarks(args.config, stages=args.stages, repeat=args.repeat)
+        else:
+            spec = _forest_spec(args)
+            with tempfile.TemporaryDirectory(prefix="adcs-lab-forest-") as workdir:
+                config_path = write_forest(Path(workdir) / "forest.yaml", generate_forest(spec))
+                report = run_benchmarks(config_path, stages=args.stages, repeat=args.repeat, forest=spec.to_dict())
+    except FileNotFoundError as exc:
+        LOGGER.error("Unable to load configuration: %s", exc)
+        return 3
+    except ValueError as exc:
+        LOGGER.error("%s", exc)
+        return 3 if args.from_config else 1
+
+    regressions = [] if baseline is None else compare(report, baseline, tolerance=args.tolerance)
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(report.to_dict(), indent=2) + "\n", encoding="utf-8")
+        LOGGER.info("Saved benchmark baseline to %s", args.save_baseline)
+
+    if args.format == "table":
+        from rich.table import Table
+
+        from adcs_lab.rendering import get_console
+
+        table = Table(title="ADCS Lab Benchmark")
+        for column in ("Stage", "Items", "Seconds", "Items/s", "Peak MiB"):
+            table.add_column(column)
+        for result in report.stages:
+            table.add_row(
+                result.stage,
+                str(result.items),
+                f"{result.seconds:.4f}",
+                f"{result.throughput:,.0f}",
+                f"{result.peak_bytes / 2**20:.1f}",
+            )
+        get_console().print(table)
+        for regression in regressions:
+            LOGGER.warning(
+                "Regression in %s %s: %.3g -> %.3g (x%.2f)",
+                regression.stage,
+                regression.metric,
+                regression.baseline,
+                regression.current,
+                regression.ratio,
+            )
+    else:
+        document = {**report.to_dict(), "regressions": [regression.to_dict() for regression in regressions]}
+        with _open_output(args.output) as handle:
+            handle.write(json.dumps(document, indent=2) + "\n")
+    return 4 if regressions else 0
+
+
+def _rule_list(value: str) -> list[str]:
+    """Parse and validate a comma-separated list of detection rule ids."""
+
+    from adcs_lab.rules import select_rules
+
+    rule_ids = [item.strip() for item in value.split(",") if item.strip()]
+    try:
+        select_rules(rule_ids)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    return rule_ids
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser, noun: str) -> None:
+    """Register the shared ``--output-json``/``--format``/``--output`` options."""
+
+    parser.add_argument("--output-json", action="store_true", help=f"Emit JSON {noun} (same as --format json)")
+    parser.add_argument(
+        "--format",
+        choices=("table", "json", "jsonl"),
+        default="table",
+        help=f"Output format for {noun}; jsonl streams one compact record per line",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write records to a file (gzip when ending in .gz)")
+
+
+def _add_issuable_argument(parser: argparse.ArgumentParser) -> None:
+    """Register ``--issuable-only``, which skips templates no NTAuth-chained CA publishes."""
+
+    parser.add_argument(
+        "--issuable-only",
+        action="store_true",
+        help="Only consider templates published by a CA chained to an NTAuth-published CA",
+    )
+
+
+def _add_forest_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the synthetic forest size options shared by ``generate`` and ``bench``."""
+
+    parser.add_argument("--cas", type=int, default=3, help="Certificate authorities (one root, the rest subordinate)")
+    parser.add_argument("--templates", type=int, default=200, help="Certificate templates")
+    parser.add_argument("--principals", type=int, default=2000, help="Security principals")
+    parser.add_argument("--groups", type=int, default=100, help="Security groups")
+    parser.add_argument("--nesting-depth", type=int, default=3, help="Levels of nested group membership")
+    parser.add_argument("--vulnerable-ratio", type=float, default=0.1, help="Fraction of templates that are ESC1-prone")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; equal seeds give identical forests")
+
+
+def _stage_list(value: str) -> list[str]:
+    """Parse and validate a comma-separated list of benchmark stages."""
+
+    from adcs_lab.bench import STAGES
+
+    stages = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = sorted(set(stages).difference(STAGES))
+    if unknown:
+        raise argparse.ArgumentTypeError("Unknown benchmark stages: " + ", ".join(unknown))
+    return stages
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="ADCS Lab toolkit")
     parser.add_argument("--config", type=Path, default=Path("data/sample_templates.yaml"), help="Path to lab config")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore and do not write the compiled configuration snapshot"
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        default=None,
+        help="Validate configuration entities across this many processes (large exports)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=("table", "json"),
+        default=None,
+        help="Report per-stage wall time, calls, items and peak memory on stderr",
+    )
+    parser.add_argument("--profile-dump", type=Path, default=None, help="Write cProfile statistics (pstats) to a file")
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     simulate = subparsers.add_parser("simulate", help="Run safe attack simulations")
-    simulate.add_argument("--requester", required=True, help="Requester principal name")
+    targets = simulate.add_mutually_exclusive_group(required=True)
+    targets.add_argument("--requester", help="Requester principal name")
+    targets.add_argument("--all", action="store_true", help="Simulate every principal in the configuration")
+    simulate.add_argument("--workers", type=int, default=None, help="Process pool size for --all runs")
+    _add_issuable_argument(simulate)
+    _add_output_arguments(simulate, "simulation results")
     simulate.set_defaults(func=_handle_simulate)
 
     detect = subparsers.add_parser("detect", help="Scan certificate templates for issues")
-    detect.add_argument("--output-json", action="store_true", help="Emit JSON findings")
+    _add_output_arguments(detect, "findings")
+    detect.add_argument(
+        "--rules",
+        type=_rule_list,
+        default=None,
+        help="Comma-separated rule ids to run (e.g. ESC1,ESC4); ESC2, ESC3 and ESC4 only run when named",
+    )
+    detect.add_argument(
+        "--workers", type=int, default=None, help="Process pool size for sharded scans (per file with --configs)"
+    )
+    detect.add_argument(
+        "--configs",
+        default=None,
+        metavar="DIR_OR_GLOB",
+        help="Scan every configuration file in a directory or matching a glob; one consolidated report",
+    )
+    _add_issuable_argument(detect)
+    detect.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        help="Write Prometheus metrics for this scan (node_exporter textfile collector; use a .prom name)",
+    )
+    detect.add_argument(
+        "--state",
+        type=Path,
+        default=None,
+        help="Incremental scan state file; only added or changed templates are re-evaluated",
+    )
     detect.set_defaults(func=_handle_detect)
 
     harden = subparsers.add_parser("harden", help="Apply EKU and permission hardening")
-    harden.add_argument("--output-json", action="store_true", help="Emit JSON for applied actions")
+    _add_output_arguments(harden, "applied actions")
+    harden.add_argument("--dry-run", action="store_true", help="Plan changes and show a diff without applying them")
+    harden.add_argument(
+        "--only",
+        action="append",
+        default=None,
+        metavar="TEMPLATE",
+        help="Restrict hardening to a template (repeatable)",
+    )
+    harden.add_argument(
+        "--controls",
+        type=lambda value: [item.strip() for item in value.split(",") if item.strip()],
+        default=None,
+        help="Comma-separated controls to enforce: subject_name, manager_approval, smart_card_logon",
+    )
+    harden.add_argument(
+        "--write", type=Path, default=None, help="Write the hardened configuration (YAML, .json or .ndjson)"
+    )
     harden.set_defaults(func=_handle_harden)
 
+    paths = subparsers.add_parser("paths", help="Find privilege escalation paths to domain authentication")
+    _add_output_arguments(paths, "escalation paths")
+    paths.add_argument(
+        "--principal",
+        action="append",
+        default=None,
+        metavar="NAME",
+        help="Report paths for a principal only (repeatable)",
+    )
+    paths.set_defaults(func=_handle_paths)
+
+    dashboard = subparsers.add_parser("dashboard", help="Export the precomputed dashboard data feed")
+    dashboard.add_argument(
+        "--output", type=Path, default=Path("dashboard/dashboard.json"), help="Feed file read by the dashboard"
+    )
+    dashboard.add_argument("--workers", type=int, default=None, help="Process pool size for the detection scan")
+    _add_issuable_argument(dashboard)
+    dashboard.set_defaults(func=_handle_dashboard)
+
+    serve = subparsers.add_parser("serve", help="Serve queries over HTTP, reloading the config when it changes")
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    serve.add_argument("--port", type=int, default=8080, help="TCP port to listen on")
+    serve.add_argument("--socket", type=Path, default=None, help="Listen on a Unix socket instead of TCP")
+    serve.add_argument(
+        "--poll-interval", type=float, default=1.0, help="Seconds between configuration file change checks"
+    )
+    serve.add_argument(
+        "--simulation-cache-size",
+        type=int,
+        default=None,
+        help="Effective group masks whose simulation results are memoised between reloads (default: 4096)",
+    )
+    serve.add_argument(
+        "--dashboard-origin",
+        default=None,
+        help="Origin (e.g. http://localhost:3000) allowed to read /dashboard cross-origin; other endpoints never are",
+    )
+    serve.set_defaults(func=_handle_serve)
+
+    generate = subparsers.add_parser("generate", help="Write a deterministic synthetic configuration")
+    generate.add_argument("--output", type=Path, required=True, help="Destination file (YAML, .json or .ndjson)")
+    _add_forest_arguments(generate)
+    generate.set_defaults(func=_handle_generate)
+
+    bench = subparsers.add_parser("bench", help="Benchmark load/simulate/detect/harden on a synthetic forest")
+    bench.add_argument(
+        "--format", choices=("table", "json"), default="table", help="Output format for the benchmark report"
+    )
+    bench.add_argument("--output", type=Path, default=None, help="Write the JSON report to a file")
+    _add_forest_arguments(bench)
+    bench.add_argument(
+        "--from-config", action="store_true", help="Benchmark the --config file instead of a synthetic forest"
+    )
+    bench.add_argument("--stages", type=_stage_list, default=None, help="Comma-separated stages to run (default: all)")
+    bench.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the fastest is reported")
+    bench.add_argument("--baseline", type=Path, default=None, help="Compare against a saved benchmark report")
+    bench.add_argument("--save-baseline", type=Path, default=None, help="Save this run's report as a baseline")
+    bench.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown or memory growth per item before a stage counts as a regression (0.25 = 25%%)",
+    )
+    bench.set_defaults(func=_handle_bench)
+
     return parser
 
 
@@ -95,7 +735,55 @@ def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
     handler: Callable[[argparse.Namespace], int] = args.func
-    return handler(args)
+    if args.profile is None and args.profile_dump is None:
+        return handler(args)
+    return _run_profiled(handler, args)
+
+
+def _run_profiled(handler: Callable[[argparse.Namespace], int], args: argparse.Namespace) -> int:
+    """Run a command under the stage profiler and/or cProfile and report the results."""
+
+    from adcs_lab.profiling import Profiler
+
+    profiler = Profiler(memory=args.profile is not None)
+    code_profile = None
+    if args.profile_dump is not None:
+        import cProfile
+
+        code_profile = cProfile.Profile()
+    with profiler:
+        with profiler.stage(f"cli.{args.command}"):
+            if code_profile is not None:
+                code_profile.enable()
+            try:
+                exit_code = handler(args)
+            finally:
+                if code_profile is not None:
+                    code_profile.disable()
+    if code_profile is not None:
+        code_profile.dump_stats(str(args.profile_dump))
+        LOGGER.info("Wrote cProfile statistics to %s (inspect with python -m pstats)", args.profile_dump)
+    if args.profile == "json":
+        sys.stderr.write(json.dumps(profiler.to_dict(), indent=2) + "\n")
+    elif args.profile == "table":
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="Stage Profile")
+        for column in ("Stage", "Calls", "Seconds", "Items", "Items/s", "Peak MiB"):
+            table.add_column(column)
+        for stats in profiler.report():
+            rate = f"{stats.items / stats.seconds:,.0f}" if stats.items and stats.seconds else "-"
+            table.add_row(
+                stats.name,
+                str(stats.calls),
+                f"{stats.seconds:.4f}",
+                str(stats.items),
+                rate,
+                f"{stats.peak_bytes / 2**20:.1f}",
+            )
+        Console(stderr=True).print(table)
+    return exit_code
 
 
 if __name__ == "__main__":
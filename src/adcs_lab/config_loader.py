@@ -8,51 +8,132 @@ high-level ADCS concepts without attempting to modify real directory services.
 
 from __future__ import annotations
 
+import itertools
 import logging
-from dataclasses import dataclass
+import weakref
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
-import yaml
+from adcs_lab import eku as eku_registry
+from adcs_lab import profiling
+
+if TYPE_CHECKING:
+    from adcs_lab.validation import ValidationIssue
 
 logger = logging.getLogger(__name__)
 
+REQUIRED_SECTIONS = frozenset({"certificate_templates", "certificate_authorities", "security_principals"})
+OPTIONAL_SECTIONS = frozenset({"security_groups"})
+SECTIONS = REQUIRED_SECTIONS | OPTIONAL_SECTIONS
 
-@dataclass
+PERMISSIVE_GROUPS = frozenset({"domain users", "authenticated users", "everyone"})
+
+# Shared by every configuration, so an index generation never repeats across instances.
+_index_generations = itertools.count(1)
+# Every live configuration, so templates changed in place can be re-indexed wherever they are held.
+_configurations: "weakref.WeakSet[LabConfiguration]" = weakref.WeakSet()
+
+
+@dataclass(slots=True)
 class CertificateTemplate:
-    """Represents a certificate template in the simulated lab."""
+    """Represents a certificate template in the simulated lab.
+
+    Entities are slotted and hold their string collections as tuples of
+    interned strings, so the EKUs and group names repeated across thousands
+    of templates are stored once.
+    """
 
     name: str
-    eku: List[str]
-    enrollment_rights: List[str]
+    eku: Tuple[str, ...]
+    enrollment_rights: Tuple[str, ...]
     manager_approval_required: bool
     subject_name_editable: bool
-    superseded_templates: List[str]
+    superseded_templates: Tuple[str, ...]
     validity_days: int
     owner: str
 
 
-@dataclass
+@dataclass(slots=True)
 class CertificateAuthority:
-    """Represents a CA definition in the lab."""
+    """Represents a CA definition in the lab.
+
+    ``published_templates`` lists the templates the CA issues. When no CA in a
+    configuration declares it, every CA is treated as issuing every template.
+    """
 
     name: str
     role: str
     location: str
     nt_auth_published: bool
-    eku: List[str]
+    eku: Tuple[str, ...]
     parent: str | None = None
+    published_templates: Tuple[str, ...] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SecurityPrincipal:
     """Represents a user or group with enrollment permissions."""
 
     name: str
-    groups: List[str]
+    groups: Tuple[str, ...]
     can_edit_subject: bool
 
 
+@dataclass(slots=True)
+class SecurityGroup:
+    """Represents a directory group and the groups it is nested in."""
+
+    name: str
+    member_of: Tuple[str, ...]
+
+
+@dataclass
+class RawEntity:
+    """A single, not yet validated, entity read from a configuration section."""
+
+    section: str
+    index: int
+    line: int
+    data: Dict[str, Any]
+
+    @property
+    def location(self) -> str:
+        """Where the entity was declared: its source line, or its position for sources without lines."""
+
+        return f"line {self.line}" if self.line else f"{self.section}[{self.index}]"
+
+
+@dataclass(frozen=True)
+class TemplateFlags:
+    """Precomputed risk characteristics of a certificate template."""
+
+    esc1_prone: bool
+    permissive: bool
+    logon_capable: bool
+    issuable: bool = True
+
+    @classmethod
+    def for_template(
+        cls, template: CertificateTemplate, permissive_groups: FrozenSet[str] = PERMISSIVE_GROUPS
+    ) -> "TemplateFlags":
+        """Derive flags from the current state of a template."""
+
+        return cls(
+            esc1_prone=template.subject_name_editable and not template.manager_approval_required,
+            permissive=any(right.casefold() in permissive_groups for right in template.enrollment_rights),
+            logon_capable=eku_registry.eku_mask(template.eku) & eku_registry.LOGON == eku_registry.LOGON,
+        )
+
+
+def templates_changed(templates: Iterable[CertificateTemplate]) -> None:
+    """Refresh the indexes of every configuration holding one of ``templates`` after in-place changes."""
+
+    changed = list(templates)
+    for configuration in list(_configurations):
+        configuration.refresh_templates(changed)
+
+
 class LabConfiguration:
     """Loads and stores lab configuration data.
 
@@ -61,53 +142,235 @@ class LabConfiguration:
     hardening recommendations.
     """
 
-    def __init__(self, config_path: str | Path) -> None:
+    def __init__(self, config_path: str | Path, *, cache_dir: str | Path | None = None) -> None:
         self.config_path = Path(config_path)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.loaded_from_cache = False
+        self.load_source = ""
+        self.index_generation = 0
         self.data: Dict[str, Any] = {}
         self.certificate_templates: List[CertificateTemplate] = []
         self.certificate_authorities: List[CertificateAuthority] = []
         self.security_principals: List[SecurityPrincipal] = []
-
-    def load(self) -> None:
-        """Load YAML configuration from disk with validation.
+        self.security_groups: List[SecurityGroup] = []
+        self._templates_by_name: Dict[str, CertificateTemplate] = {}
+        self._authorities_by_name: Dict[str, CertificateAuthority] = {}
+        self._principals_by_name: Dict[str, SecurityPrincipal] = {}
+        self._template_flags: Dict[str, TemplateFlags] = {}
+        self._group_closures: Dict[str, FrozenSet[str]] = {}
+        self._principal_groups: Dict[str, FrozenSet[str]] = {}
+        self._permissive_groups: FrozenSet[str] = PERMISSIVE_GROUPS
+        self._group_bits: Dict[str, int] = {}
+        self._enrollment_masks: Dict[str, int] = {}
+        self._permissive_mask = 0
+        self._ca_chains: Dict[str, Tuple[str, ...]] = {}
+        self._trusted_authorities: FrozenSet[str] = frozenset()
+        self._publishers: Optional[Dict[str, Tuple[CertificateAuthority, ...]]] = None
+        _configurations.add(self)
+
+    def load(self, *, streaming: bool = False, use_cache: bool = False, workers: Optional[int] = None) -> None:
+        """Load YAML, JSON or NDJSON configuration from disk with validation.
 
         The loader enforces presence and type correctness for the expected
         collections so that downstream modules can rely on structured data.
+        The input format is detected by extension or by sniffing the file
+        (see :mod:`adcs_lab.json_input`); NDJSON is always streamed.
+
+        Parameters
+        ----------
+        streaming: bool
+            Parse the file event by event and build each entity as it is read
+            instead of materialising the whole YAML document first. The raw
+            ``data`` mapping is not retained in this mode and validation errors
+            carry the line number of the offending entity. JSON documents are
+            always decoded whole.
+        use_cache: bool
+            Reuse a compiled snapshot of a previous load when the source file
+            is unchanged, skipping parsing and validation, and refresh the
+            snapshot after a full load. See :mod:`adcs_lab.snapshot`.
+        workers: Optional[int]
+            Validate entities in chunks across this many processes (see
+            :mod:`adcs_lab.validation`). Every invalid entity is reported in
+            one :class:`~adcs_lab.validation.ConfigurationError` either way.
         """
 
         if not self.config_path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
 
-        try:
-            with self.config_path.open("r", encoding="utf-8") as handle:
-                loaded = yaml.safe_load(handle)
-        except yaml.YAMLError as exc:
-            raise ValueError(f"YAML parsing error in {self.config_path}: {exc}") from exc
+        self.loaded_from_cache = False
+        self.load_source = ""
+        from adcs_lab import snapshot
+        from adcs_lab.json_input import sniff_format
+
+        with profiling.stage("load") as record:
+            if not (use_cache and self._load_snapshot()):
+                source = snapshot.source_fingerprint(self.config_path) if use_cache else None
+                config_format, document = sniff_format(self.config_path)
+                self.load_source = config_format
+                if config_format == "ndjson" or (streaming and config_format == "yaml"):
+                    self._load_streaming(config_format, workers)
+                else:
+                    self._load_document(config_format, workers, document)
+                if source is not None:
+                    snapshot.write_snapshot(
+                        self.config_path, self._entity_types(), self._sections(), self.cache_dir, source=source
+                    )
+            record.count(sum(map(len, self._sections().values())))
+
+    def _load_document(self, config_format: str = "yaml", workers: Optional[int] = None, document: Any = None) -> None:
+        """Parse the whole YAML or JSON document, unless it was already decoded, then build each section."""
+
+        with profiling.stage("load.parse"):
+            if document is not None:
+                loaded = document
+            else:
+                loaded = self._parse_json() if config_format == "json" else self._parse_yaml()
 
         if loaded is None:
-            raise ValueError("Configuration file is empty; expected YAML content.")
+            raise ValueError(f"Configuration file is empty; expected {config_format.upper()} content.")
         if not isinstance(loaded, dict):
             raise ValueError("Configuration root must be a mapping/dictionary.")
 
-        required_root_keys = {"certificate_templates", "certificate_authorities", "security_principals"}
-        if not required_root_keys.issubset(loaded):
-            missing = required_root_keys.difference(loaded)
+        if not REQUIRED_SECTIONS.issubset(loaded):
+            missing = REQUIRED_SECTIONS.difference(loaded)
             raise ValueError("Configuration is missing required sections: " + ", ".join(sorted(missing)))
 
         self.data = loaded
-        self.certificate_templates = [
-            self._build_template(template) for template in self._validate_collection(loaded, "certificate_templates")
-        ]
-        self._ensure_unique_names(self.certificate_templates, "certificate template")
-        self.certificate_authorities = [
-            self._build_ca(ca) for ca in self._validate_collection(loaded, "certificate_authorities")
-        ]
-        self._ensure_unique_names(self.certificate_authorities, "certificate authority")
-        self.security_principals = [
-            self._build_principal(principal) for principal in self._validate_collection(loaded, "security_principals")
-        ]
-        self._ensure_unique_names(self.security_principals, "security principal")
-        self._validate_ca_relationships()
+        from adcs_lab.validation import document_chunks, validate_entities
+
+        collections = {section: list(self._validate_collection(loaded, section)) for section in self._sections()}
+        with profiling.stage("load.build") as record:
+            self._install_sections(*validate_entities(document_chunks(collections), workers=workers))
+            record.count(sum(map(len, self._sections().values())))
+        self._finalise()
+
+    def _install_sections(self, sections: Dict[str, List[Any]], issues: Sequence["ValidationIssue"]) -> None:
+        """Adopt validated entity lists, or raise one error listing every invalid entity."""
+
+        from adcs_lab.validation import ConfigurationError
+
+        if issues:
+            raise ConfigurationError(self.config_path, issues)
+        self.certificate_templates = sections["certificate_templates"]
+        self.certificate_authorities = sections["certificate_authorities"]
+        self.security_principals = sections["security_principals"]
+        self.security_groups = sections["security_groups"]
+
+    def _parse_yaml(self) -> Any:
+        import yaml
+
+        from adcs_lab.streaming import safe_loader
+
+        try:
+            with self.config_path.open("r", encoding="utf-8") as handle:
+                return yaml.load(handle, Loader=safe_loader())
+        except yaml.YAMLError as exc:
+            raise ValueError(f"YAML parsing error in {self.config_path}: {exc}") from exc
+
+    def _parse_json(self) -> Any:
+        from adcs_lab.json_input import load_json_document
+
+        return load_json_document(self.config_path)
+
+    def _load_snapshot(self) -> bool:
+        """Populate entities from a compiled snapshot; return ``False`` on a miss."""
+
+        from adcs_lab import snapshot
+
+        with profiling.stage("load.snapshot"):
+            sections = snapshot.load_snapshot(self.config_path, self._entity_types(), self.cache_dir)
+        if sections is None:
+            return False
+        self.data = {}
+        self.certificate_templates = sections["certificate_templates"]
+        self.certificate_authorities = sections["certificate_authorities"]
+        self.security_principals = sections["security_principals"]
+        self.security_groups = sections["security_groups"]
+        self.loaded_from_cache = True
+        self.load_source = "snapshot"
+        self.reindex()
+        logger.info(
+            "Loaded configuration snapshot: %d templates, %d CAs, %d principals",
+            len(self.certificate_templates),
+            len(self.certificate_authorities),
+            len(self.security_principals),
+        )
+        return True
+
+    @staticmethod
+    def _entity_types() -> Dict[str, type]:
+        """Map each configuration section to the data class it is built into."""
+
+        return {
+            "certificate_templates": CertificateTemplate,
+            "certificate_authorities": CertificateAuthority,
+            "security_principals": SecurityPrincipal,
+            "security_groups": SecurityGroup,
+        }
+
+    def _sections(self) -> Dict[str, List[Any]]:
+        """Return the loaded entity lists keyed by section name."""
+
+        return {
+            "certificate_templates": self.certificate_templates,
+            "certificate_authorities": self.certificate_authorities,
+            "security_principals": self.security_principals,
+            "security_groups": self.security_groups,
+        }
+
+    def _load_streaming(self, config_format: str = "yaml", workers: Optional[int] = None) -> None:
+        """Build entities straight from the YAML event stream or NDJSON lines."""
+
+        self.data = {}
+        with profiling.stage("load.stream") as record:
+            from adcs_lab.validation import validate_stream
+
+            self._install_sections(*validate_stream(self._iter_raw(None, config_format), workers=workers))
+            record.count(sum(map(len, self._sections().values())))
+        self._finalise()
+
+    def iter_section(self, section: str) -> Iterator[Any]:
+        """Lazily yield validated entities for one configuration section.
+
+        Entities are built as the file is parsed and are not stored on the
+        configuration, which keeps memory flat when a caller only needs a
+        single pass over, for example, every security principal.
+        """
+
+        if section not in SECTIONS:
+            raise ValueError(f"Unknown configuration section: {section}")
+        if not self.config_path.exists():
+            raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
+        from adcs_lab.validation import ConfigurationError, validate_entity
+
+        for raw in self._iter_raw({section}):
+            entity, issues = validate_entity(raw)
+            if issues:
+                raise ConfigurationError(self.config_path, issues)
+            yield entity
+
+    def _iter_raw(self, sections: Optional[set[str]], config_format: Optional[str] = None) -> Iterator[RawEntity]:
+        """Yield unvalidated entities from the configuration file in ``config_format``, detected when not given."""
+
+        from adcs_lab.json_input import detect_format, iter_json_entities, iter_ndjson_entities
+
+        if config_format is None:
+            config_format = detect_format(self.config_path)
+        if config_format == "ndjson":
+            return iter_ndjson_entities(self.config_path, sections)
+        if config_format == "json":
+            return iter_json_entities(self.config_path, sections)
+        from adcs_lab.streaming import iter_yaml_entities
+
+        return iter_yaml_entities(self.config_path, sections)
+
+    def _finalise(self) -> None:
+        """Run cross-entity validation once every section has been built."""
+
+        with profiling.stage("load.validate") as record:
+            self.reindex()
+            self._validate_ca_relationships()
+            record.count(sum(map(len, self._sections().values())))
 
         logger.info(
             "Loaded configuration: %d templates, %d CAs, %d principals",
@@ -116,21 +379,337 @@ class LabConfiguration:
             len(self.security_principals),
         )
 
+    def reindex(self) -> None:
+        """Rebuild the name, enrollment, and template flag indexes from the entity lists.
+
+        Call this after mutating entities or replacing the lists directly
+        (:meth:`refresh_templates` is enough for templates changed in place);
+        :meth:`add_template`, :meth:`remove_template` and :meth:`rename_template`
+        keep the indexes current on their own. Each of these starts a new
+        ``index_generation``, a process-wide unique number that callers caching
+        derived results (such as :class:`~adcs_lab.attack_simulator.SimulationCache`)
+        compare to detect changes.
+        """
+
+        self.index_generation = next(_index_generations)
+        self._templates_by_name = self._ensure_unique_names(self.certificate_templates, "certificate template")
+        self._authorities_by_name = self._ensure_unique_names(self.certificate_authorities, "certificate authority")
+        self._principals_by_name = self._ensure_unique_names(self.security_principals, "security principal")
+        self._ensure_unique_names(self.security_groups, "security group")
+        self._group_closures = _group_closures(
+            {group.name.casefold(): [parent.casefold() for parent in group.member_of] for group in self.security_groups}
+        )
+        self._principal_groups = {}
+        self._permissive_groups = frozenset().union(
+            *(self._group_closures.get(group, frozenset({group})) for group in PERMISSIVE_GROUPS)
+        )
+        self._group_bits = {}
+        self._permissive_mask = self._number_groups(self._permissive_groups)
+        self._index_authorities()
+        self._template_flags = {}
+        self._enrollment_masks = {}
+        for template in self.certificate_templates:
+            self._index_template(template)
+
+    def refresh_templates(self, templates: Iterable[CertificateTemplate]) -> bool:
+        """Re-index templates of this configuration that were modified in place.
+
+        Templates this configuration does not hold are ignored. Returns whether
+        any template was re-indexed, in which case a new ``index_generation``
+        starts.
+        """
+
+        refreshed = False
+        for template in templates:
+            if self._templates_by_name.get(template.name.casefold()) is template:
+                self._index_template(template)
+                refreshed = True
+        if refreshed:
+            self.index_generation = next(_index_generations)
+        return refreshed
+
+    def _index_template(self, template: CertificateTemplate) -> None:
+        """Add a template to the flag and enrollment mask indexes."""
+
+        key = template.name.casefold()
+        enrollment_mask = self._number_groups(template.enrollment_rights)
+        self._enrollment_masks[key] = enrollment_mask
+        self._template_flags[key] = TemplateFlags(
+            esc1_prone=template.subject_name_editable and not template.manager_approval_required,
+            permissive=bool(enrollment_mask & self._permissive_mask),
+            logon_capable=eku_registry.eku_mask(template.eku) & eku_registry.LOGON == eku_registry.LOGON,
+            issuable=self.is_issuable(template),
+        )
+
+    def _index_authorities(self) -> None:
+        """Precompute CA chains, NTAuth trust, and which CAs publish each template."""
+
+        parents = {
+            ca.name.casefold(): ca.parent.casefold() if ca.parent else None for ca in self.certificate_authorities
+        }
+        self._ca_chains = _ca_chains(parents)
+        self._trusted_authorities = frozenset(
+            name
+            for name, chain in self._ca_chains.items()
+            if any(self._authorities_by_name[member].nt_auth_published for member in chain)
+        )
+        declared = [ca for ca in self.certificate_authorities if ca.published_templates is not None]
+        if not declared:
+            self._publishers = None
+            return
+        publishers: Dict[str, List[CertificateAuthority]] = {}
+        for ca in declared:
+            for name in ca.published_templates or ():
+                publishers.setdefault(name.casefold(), []).append(ca)
+        self._publishers = {name: tuple(authorities) for name, authorities in publishers.items()}
+
+    def _unindex_template(self, template: CertificateTemplate) -> None:
+        """Drop a template from the flag and enrollment mask indexes."""
+
+        key = template.name.casefold()
+        self._template_flags.pop(key, None)
+        self._enrollment_masks.pop(key, None)
+
+    def template_flags(self, template: CertificateTemplate) -> TemplateFlags:
+        """Return the precomputed flags for a loaded template."""
+
+        flags = self._template_flags.get(template.name.casefold())
+        if flags is None:
+            flags = replace(
+                TemplateFlags.for_template(template, self._permissive_groups), issuable=self.is_issuable(template)
+            )
+        return flags
+
+    def ca_chain(self, ca: CertificateAuthority) -> List[CertificateAuthority]:
+        """Return the CA followed by its ancestors up to the root, from the precomputed chains."""
+
+        chain = self._ca_chains.get(ca.name.casefold())
+        return [self._authorities_by_name[name] for name in chain] if chain else [ca]
+
+    def issuing_authorities(self, template: CertificateTemplate) -> List[CertificateAuthority]:
+        """Return the CAs that publish a template, in configuration order.
+
+        Without any ``published_templates`` declarations every CA counts as
+        publishing every template.
+        """
+
+        if self._publishers is None:
+            return list(self.certificate_authorities)
+        return list(self._publishers.get(template.name.casefold(), ()))
+
+    def chains_to_ntauth(self, ca: CertificateAuthority) -> bool:
+        """Return whether the CA or one of its ancestors is published to NTAuth."""
+
+        return ca.name.casefold() in self._trusted_authorities
+
+    def is_issuable(self, template: CertificateTemplate) -> bool:
+        """Return whether a CA chained to an NTAuth-published CA publishes the template."""
+
+        return any(self.chains_to_ntauth(ca) for ca in self.issuing_authorities(template))
+
+    def _number_groups(self, groups: Iterable[str]) -> int:
+        """Return the bitset of groups, numbering groups not seen since :meth:`reindex`."""
+
+        mask = 0
+        bits = self._group_bits
+        for group in groups:
+            key = group.casefold()
+            bit = bits.get(key)
+            if bit is None:
+                bit = bits[key] = 1 << len(bits)
+            mask |= bit
+        return mask
+
+    def group_mask(self, groups: Iterable[str]) -> int:
+        """Return the bitset of groups (case-insensitive) in this configuration's group numbering.
+
+        Only groups named in enrollment rights or nesting a broad domain group are
+        numbered; other groups cannot grant enrollment and contribute no bit. The
+        numbering is reset by :meth:`reindex`, so masks are only comparable within
+        one index generation.
+        """
+
+        mask = 0
+        bits = self._group_bits
+        for group in groups:
+            mask |= bits.get(group.casefold(), 0)
+        return mask
+
+    def enrollment_mask(self, template: CertificateTemplate) -> int:
+        """Return the bitset of groups granted enrollment on a loaded template."""
+
+        mask = self._enrollment_masks.get(template.name.casefold())
+        return mask if mask is not None else self.group_mask(template.enrollment_rights)
+
+    def effective_group_mask(self, principal: SecurityPrincipal) -> int:
+        """Return the bitset of a principal's effective groups; see :meth:`effective_groups`."""
+
+        return self.group_mask(self.effective_groups(principal))
+
+    def effective_groups(self, principal: SecurityPrincipal) -> FrozenSet[str]:
+        """Return the case-folded groups a principal belongs to, including nested membership.
+
+        The transitive closure of ``security_groups`` nesting is computed once per
+        :meth:`reindex`; the per-principal union is memoised on first use.
+        """
+
+        key = principal.name.casefold()
+        groups = self._principal_groups.get(key)
+        if groups is None:
+            groups = frozenset().union(
+                *(
+                    self._group_closures.get(group.casefold(), frozenset({group.casefold()}))
+                    for group in principal.groups
+                )
+            )
+            self._principal_groups[key] = groups
+        return groups
+
+    def permissive_groups(self) -> FrozenSet[str]:
+        """Return case-folded groups that transitively contain a broad domain group.
+
+        Granting enrollment to any of these groups is as permissive as granting it
+        to ``Domain Users``, ``Authenticated Users`` or ``Everyone`` directly.
+        """
+
+        return self._permissive_groups
+
+    def templates_for_group(self, group: str) -> List[CertificateTemplate]:
+        """Return templates granting enrollment to a group (case-insensitive), in configuration order."""
+
+        return self._templates_matching(self._group_bits.get(group.casefold(), 0))
+
+    def templates_enrollable_by(self, principal: SecurityPrincipal) -> List[CertificateTemplate]:
+        """Return templates the principal may enroll in through any effective group, in configuration order."""
+
+        return self._templates_matching(self.effective_group_mask(principal))
+
+    def _templates_matching(self, group_mask: int) -> List[CertificateTemplate]:
+        """Return templates whose enrollment mask intersects ``group_mask``."""
+
+        if not group_mask:
+            return []
+        enrollment_mask = self.enrollment_mask
+        return [template for template in self.certificate_templates if enrollment_mask(template) & group_mask]
+
+    def to_dict(self, templates: Optional[Sequence[CertificateTemplate]] = None) -> Dict[str, Any]:
+        """Return the configuration in its file layout.
+
+        ``templates`` substitutes the certificate template section, for example
+        with a hardening plan's copy-on-write view.
+        """
+
+        from dataclasses import asdict
+
+        def entity(item: Any) -> Dict[str, Any]:
+            return {
+                key: list(value) if isinstance(value, (list, tuple)) else value
+                for key, value in asdict(item).items()
+                if value is not None
+            }
+
+        data: Dict[str, Any] = {
+            "certificate_authorities": [entity(ca) for ca in self.certificate_authorities],
+            "certificate_templates": [
+                entity(template) for template in (self.certificate_templates if templates is None else templates)
+            ],
+            "security_principals": [entity(principal) for principal in self.security_principals],
+        }
+        if self.security_groups:
+            data["security_groups"] = [entity(group) for group in self.security_groups]
+        return data
+
+    def dump(self, path: str | Path, templates: Optional[Sequence[CertificateTemplate]] = None) -> None:
+        """Write the configuration to ``path`` as JSON (``.json``), NDJSON (``.ndjson``/``.jsonl``) or YAML."""
+
+        import json
+
+        from adcs_lab.json_input import NDJSON_SUFFIXES
+
+        target = Path(path)
+        data = self.to_dict(templates)
+        suffix = target.suffix.lower()
+        with target.open("w", encoding="utf-8") as handle:
+            if suffix == ".json":
+                json.dump(data, handle, indent=2)
+                handle.write("\n")
+            elif suffix in NDJSON_SUFFIXES:
+                for section, entities in data.items():
+                    for item in entities:
+                        handle.write(json.dumps({"kind": section, **item}, separators=(",", ":")) + "\n")
+            else:
+                import yaml
+
+                yaml.safe_dump(data, handle, sort_keys=False)
+
     def template_by_name(self, name: str) -> CertificateTemplate | None:
         """Retrieve a certificate template by name."""
 
-        for template in self.certificate_templates:
-            if template.name.lower() == name.lower():
-                return template
-        return None
+        return self._templates_by_name.get(name.casefold())
 
     def principal_by_name(self, name: str) -> Optional[SecurityPrincipal]:
         """Retrieve a security principal by name."""
 
-        for principal in self.security_principals:
-            if principal.name.lower() == name.lower():
-                return principal
-        return None
+        return self._principals_by_name.get(name.casefold())
+
+    def ca_by_name(self, name: str) -> Optional[CertificateAuthority]:
+        """Retrieve a certificate authority by name."""
+
+        return self._authorities_by_name.get(name.casefold())
+
+    def add_template(self, template: CertificateTemplate) -> None:
+        """Register an additional certificate template, rejecting duplicate names."""
+
+        key = template.name.casefold()
+        if not key:
+            raise ValueError("Certificate Template name cannot be empty")
+        if key in self._templates_by_name:
+            raise ValueError(f"Duplicate certificate template name detected: {template.name}")
+        self.certificate_templates.append(template)
+        self._templates_by_name[key] = template
+        self._index_template(template)
+        self.index_generation = next(_index_generations)
+
+    def remove_template(self, name: str) -> CertificateTemplate:
+        """Remove and return a certificate template by name."""
+
+        template = self._templates_by_name.pop(name.casefold(), None)
+        if template is None:
+            raise KeyError(name)
+        self._unindex_template(template)
+        self.certificate_templates.remove(template)
+        self.index_generation = next(_index_generations)
+        return template
+
+    def rename_template(self, name: str, new_name: str) -> CertificateTemplate:
+        """Rename a certificate template while keeping the name index consistent.
+
+        CAs that publish the template are updated to publish it under the new name.
+        """
+
+        template = self.template_by_name(name)
+        if template is None:
+            raise KeyError(name)
+        new_key = new_name.casefold()
+        if not new_key:
+            raise ValueError("Certificate Template name cannot be empty")
+        existing = self._templates_by_name.get(new_key)
+        if existing is not None and existing is not template:
+            raise ValueError(f"Duplicate certificate template name detected: {new_name}")
+        old_key = template.name.casefold()
+        self._unindex_template(template)
+        del self._templates_by_name[old_key]
+        template.name = new_name
+        self._templates_by_name[new_key] = template
+        for ca in self.certificate_authorities:
+            if ca.published_templates is not None:
+                ca.published_templates = tuple(
+                    new_name if published.casefold() == old_key else published for published in ca.published_templates
+                )
+        self._index_authorities()
+        self._index_template(template)
+        self.index_generation = next(_index_generations)
+        return template
 
     @staticmethod
     def _validate_collection(data: Dict[str, Any], key: str) -> Iterable[Dict[str, Any]]:
@@ -155,94 +734,23 @@ class LabConfiguration:
         return collection
 
     @staticmethod
-    def _build_template(template: Dict[str, Any]) -> CertificateTemplate:
-        """Construct a certificate template with validation."""
-
-        required_fields = [
-            "name",
-            "eku",
-            "enrollment_rights",
-            "manager_approval_required",
-            "subject_name_editable",
-            "superseded_templates",
-            "validity_days",
-            "owner",
-        ]
-        LabConfiguration._ensure_required(template, required_fields, "certificate template")
-        return CertificateTemplate(
-            name=str(template["name"]),
-            eku=LabConfiguration._ensure_list_of_strings(template["eku"], "eku"),
-            enrollment_rights=LabConfiguration._ensure_list_of_strings(
-                template["enrollment_rights"], "enrollment_rights"
-            ),
-            manager_approval_required=bool(template["manager_approval_required"]),
-            subject_name_editable=bool(template["subject_name_editable"]),
-            superseded_templates=LabConfiguration._ensure_list_of_strings(
-                template.get("superseded_templates", []), "superseded_templates"
-            ),
-            validity_days=int(template["validity_days"]),
-            owner=str(template["owner"]),
-        )
-
-    @staticmethod
-    def _build_ca(ca: Dict[str, Any]) -> CertificateAuthority:
-        """Construct a certificate authority with validation."""
-
-        required_fields = ["name", "role", "location", "nt_auth_published", "eku"]
-        LabConfiguration._ensure_required(ca, required_fields, "certificate authority")
-        return CertificateAuthority(
-            name=str(ca["name"]),
-            role=str(ca["role"]),
-            location=str(ca["location"]),
-            nt_auth_published=bool(ca["nt_auth_published"]),
-            eku=LabConfiguration._ensure_list_of_strings(ca["eku"], "eku"),
-            parent=str(ca.get("parent")) if ca.get("parent") else None,
-        )
-
-    @staticmethod
-    def _build_principal(principal: Dict[str, Any]) -> SecurityPrincipal:
-        """Construct a security principal with validation."""
-
-        required_fields = ["name", "groups", "can_edit_subject"]
-        LabConfiguration._ensure_required(principal, required_fields, "security principal")
-        return SecurityPrincipal(
-            name=str(principal["name"]),
-            groups=LabConfiguration._ensure_list_of_strings(principal["groups"], "groups"),
-            can_edit_subject=bool(principal["can_edit_subject"]),
-        )
-
-    @staticmethod
-    def _ensure_required(data: Dict[str, Any], keys: List[str], label: str) -> None:
-        """Ensure all required keys exist in a dictionary."""
-
-        missing = [key for key in keys if key not in data]
-        if missing:
-            raise ValueError(f"Missing keys in {label}: {', '.join(missing)}")
-
-    @staticmethod
-    def _ensure_list_of_strings(value: Any, field: str) -> List[str]:
-        """Ensure a field is a list of strings."""
-
-        if not isinstance(value, list):
-            raise ValueError(f"Field '{field}' must be a list of strings")
-        converted = [str(item) for item in value]
-        return converted
-
-    @staticmethod
-    def _ensure_unique_names(items: List[Any], label: str) -> None:
+    def _ensure_unique_names(items: List[Any], label: str) -> Dict[str, Any]:
         """Ensure that dataclass-like objects have unique case-insensitive names.
 
         Unique naming prevents ambiguous lookups and reporting in simulation output.
+        The case-folded name index built during the check is returned for reuse
+        by the lookup helpers.
         """
 
-        seen: set[str] = set()
+        index: Dict[str, Any] = {}
         for item in items:
-            name = getattr(item, "name", "").lower()
+            name = getattr(item, "name", "").casefold()
             if not name:
                 raise ValueError(f"{label.title()} name cannot be empty")
-            if name in seen:
+            if name in index:
                 raise ValueError(f"Duplicate {label} name detected: {getattr(item, 'name', '')}")
-            seen.add(name)
+            index[name] = item
+        return index
 
     def _validate_ca_relationships(self) -> None:
         """Validate that certificate authority parent references are consistent."""
@@ -254,3 +762,95 @@ class LabConfiguration:
                     raise ValueError(f"Certificate authority '{ca.name}' references missing parent '{ca.parent}'")
                 if ca.parent == ca.name:
                     raise ValueError("Certificate authority cannot be its own parent")
+        for ca in self.certificate_authorities:
+            root = self._authorities_by_name[self._ca_chains[ca.name.casefold()][-1]]
+            if root.parent:
+                raise ValueError(f"Certificate authority '{ca.name}' has a cyclic parent chain through '{root.name}'")
+            for name in ca.published_templates or ():
+                if name.casefold() not in self._templates_by_name:
+                    raise ValueError(f"Certificate authority '{ca.name}' publishes missing template '{name}'")
+
+
+def _ca_chains(parents: Mapping[str, Optional[str]]) -> Dict[str, Tuple[str, ...]]:
+    """Return each CA's ancestry (itself first) from a CA -> parent mapping.
+
+    Every CA is walked at most once; chains stop at a root, at a parent that is
+    not defined, or where the walk would revisit a CA (a parent cycle), so the
+    last element of a cyclic chain still names a parent.
+    """
+
+    chains: Dict[str, Tuple[str, ...]] = {}
+    for start in parents:
+        path: List[str] = []
+        seen = set()
+        node: Optional[str] = start
+        while node is not None and node in parents and node not in chains and node not in seen:
+            path.append(node)
+            seen.add(node)
+            node = parents[node]
+        tail = chains.get(node, ()) if node is not None and node not in seen else ()
+        for position in range(len(path) - 1, -1, -1):
+            tail = (path[position],) + tail
+            chains[path[position]] = tail
+    return chains
+
+
+def _group_closures(member_of: Mapping[str, Sequence[str]]) -> Dict[str, FrozenSet[str]]:
+    """Return each group's transitive ``member_of`` closure, including the group itself.
+
+    Strongly connected components are collapsed with an iterative Tarjan pass,
+    so cyclic nesting terminates, every group in a cycle shares one closure set,
+    and deep hierarchies do not hit the recursion limit.
+    """
+
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: set[str] = set()
+    closures: Dict[str, FrozenSet[str]] = {}
+
+    def visit(node: str) -> None:
+        index_of[node] = lowlink[node] = len(index_of)
+        stack.append(node)
+        on_stack.add(node)
+
+    for root in member_of:
+        if root in index_of:
+            continue
+        visit(root)
+        work = [(root, iter(member_of.get(root, ())))]
+        while work:
+            node, parents = work[-1]
+            descended = False
+            for parent in parents:
+                if parent not in index_of:
+                    visit(parent)
+                    work.append((parent, iter(member_of.get(parent, ()))))
+                    descended = True
+                    break
+                if parent in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[parent])
+            if descended:
+                continue
+            work.pop()
+            if work:
+                caller = work[-1][0]
+                lowlink[caller] = min(lowlink[caller], lowlink[node])
+            if lowlink[node] != index_of[node]:
+                continue
+            component: List[str] = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == node:
+                    break
+            reach = set(component)
+            for member in component:
+                for parent in member_of.get(member, ()):
+                    if parent not in reach:
+                        reach |= closures[parent]
+            closure = frozenset(reach)
+            for member in component:
+                closures[member] = closure
+    return closures
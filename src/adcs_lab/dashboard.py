@@ -0,0 +1,92 @@
+"""Precomputed data feed for the static dashboard.
+
+:func:`build_dashboard` condenses a loaded configuration and its detection
+findings into the compact JSON document rendered by ``dashboard/pki_graph.js``:
+the CA hierarchy with each CA's children, every template with its highest
+finding severity as its risk, the detection feed (template and rule id, with
+each rule's severity and message stored once), and the hardening score.
+All aggregation happens here so the browser only paginates and renders.
+
+The document carries a ``revision`` digest of its content (excluding the
+generation timestamp). The dashboard polls the feed and skips re-rendering
+while the revision is unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from adcs_lab._fsutil import atomic_write
+from adcs_lab.config_loader import LabConfiguration
+from adcs_lab.detection import Finding, TemplateAnalyzer
+
+SEVERITY_RANK = {"none": 0, "low": 1, "medium": 2, "high": 3}
+
+
+def build_dashboard(configuration: LabConfiguration, findings: Optional[Iterable[Finding]] = None) -> Dict[str, Any]:
+    """Return the dashboard document; ``findings`` defaults to a full scan with every rule."""
+
+    if findings is None:
+        findings = TemplateAnalyzer(configuration).iter_findings()
+
+    risk: Dict[str, str] = {template.name: "none" for template in configuration.certificate_templates}
+    rules: Dict[str, Dict[str, str]] = {}
+    detections: List[Dict[str, str]] = []
+    for finding in findings:
+        rules.setdefault(finding.rule, {"severity": finding.severity, "message": finding.description})
+        detections.append({"template": finding.template, "rule": finding.rule})
+        if SEVERITY_RANK.get(finding.severity, 0) > SEVERITY_RANK[risk.get(finding.template, "none")]:
+            risk[finding.template] = finding.severity
+
+    children: Dict[str, List[str]] = {ca.name: [] for ca in configuration.certificate_authorities}
+    for ca in configuration.certificate_authorities:
+        parent = configuration.ca_by_name(ca.parent) if ca.parent else None
+        if parent is not None:
+            children[parent.name].append(ca.name)
+
+    templates = [
+        {
+            "name": template.name,
+            "eku": list(template.eku),
+            "risk": risk[template.name],
+            "issuable": configuration.template_flags(template).issuable,
+        }
+        for template in configuration.certificate_templates
+    ]
+    hardened = sum(1 for template in templates if template["risk"] != "high")
+    document: Dict[str, Any] = {
+        "cas": [
+            {
+                "name": ca.name,
+                "role": ca.role,
+                "parent": ca.parent,
+                "children": children[ca.name],
+                "ntAuth": ca.nt_auth_published,
+            }
+            for ca in configuration.certificate_authorities
+        ],
+        "templates": templates,
+        "rules": rules,
+        "detections": detections,
+        "score": {
+            "hardened": hardened,
+            "total": len(templates),
+            "percentage": round(100 * hardened / len(templates)) if templates else 100,
+        },
+    }
+    document["revision"] = hashlib.sha256(json.dumps(document, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    document["generatedAt"] = int(time.time())
+    return document
+
+
+def write_dashboard(path: str | Path, document: Dict[str, Any]) -> Path:
+    """Atomically write a dashboard document as compact JSON, so polling readers never see a partial file."""
+
+    path = Path(path)
+    with atomic_write(path) as handle:
+        json.dump(document, handle, separators=(",", ":"))
+    return path
@@ -4,15 +4,16 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import List
-
-from rich.console import Console
-from rich.table import Table
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from adcs_lab import profiling
 from adcs_lab.config_loader import CertificateTemplate, LabConfiguration
+from adcs_lab.rendering import get_console
+from adcs_lab.rules import Rule, evaluate, select_rules
 
 logger = logging.getLogger(__name__)
-console = Console()
+
+SCAN_CHUNK_SIZE = 4096
 
 
 @dataclass
@@ -23,79 +24,137 @@ class Finding:
     severity: str
     description: str
     recommendation: str
+    rule: str = ""
 
+    @classmethod
+    def from_rule(cls, template: str, rule: Rule) -> "Finding":
+        """Create a finding that shares the rule's severity and message strings."""
+
+        return cls(
+            template=template,
+            severity=rule.severity,
+            description=rule.description,
+            recommendation=rule.recommendation,
+            rule=rule.id,
+        )
 
-class TemplateAnalyzer:
-    """Analyze certificate templates for common ESC conditions."""
 
-    def __init__(self, configuration: LabConfiguration) -> None:
+class TemplateAnalyzer:
+    """Analyze certificate templates for common ESC conditions.
+
+    Checks are declared in :mod:`adcs_lab.rules`; ``rules`` restricts the scan
+    to the given rule ids so unrelated columns are never computed. With
+    ``issuable_only`` templates that no NTAuth-chained CA publishes are skipped.
+    """
+
+    def __init__(
+        self,
+        configuration: LabConfiguration,
+        *,
+        rules: Optional[Iterable[str]] = None,
+        issuable_only: bool = False,
+    ) -> None:
         self.configuration = configuration
+        self.rules = select_rules(rules)
+        self.issuable_only = issuable_only
 
     def evaluate_template(self, template: CertificateTemplate) -> List[Finding]:
         """Return a list of findings for a template."""
 
-        findings: List[Finding] = []
-        if template.subject_name_editable and not template.manager_approval_required:
-            findings.append(
-                Finding(
-                    template=template.name,
-                    severity="high",
-                    description="Subject name is editable without manager approval (ESC1 risk).",
-                    recommendation="Disable subject editing or require manager approval.",
-                )
-            )
-        if "Client Authentication" in template.eku and "Smart Card Logon" in template.eku:
-            findings.append(
-                Finding(
-                    template=template.name,
-                    severity="medium",
-                    description="Template issues certificates usable for interactive logon.",
-                    recommendation="Restrict EKUs to intended purposes and enforce approvals.",
-                )
-            )
-        if self._has_overly_permissive_rights(template.enrollment_rights):
-            findings.append(
-                Finding(
-                    template=template.name,
-                    severity="medium",
-                    description="Enrollment rights allow broad domain groups (potential privilege escalation).",
-                    recommendation="Restrict enrollment to dedicated security groups and require approvals.",
-                )
-            )
-        if template.validity_days > 365:
-            findings.append(
-                Finding(
-                    template=template.name,
-                    severity="low",
-                    description="Certificate lifetime exceeds 1 year.",
-                    recommendation="Shorten lifetime to reduce exposure.",
-                )
-            )
-        return findings
-
-    def run(self, *, show_table: bool = True) -> List[Finding]:
+        return self.evaluate_templates([template])
+
+    def run(self, *, show_table: bool = True, workers: Optional[int] = None) -> List[Finding]:
         """Evaluate all templates and optionally print a summary table."""
 
-        all_findings: List[Finding] = []
-        table = Table(title="Template Misconfiguration Scan")
-        table.add_column("Template")
-        table.add_column("Severity")
-        table.add_column("Description")
-        for template in self.configuration.certificate_templates:
-            findings = self.evaluate_template(template)
-            all_findings.extend(findings)
-            for finding in findings:
-                table.add_row(finding.template, finding.severity, finding.description)
+        all_findings = list(self.iter_findings(workers=workers))
         if all_findings:
             if show_table:
-                console.print(table)
+                from rich.table import Table
+
+                table = Table(title="Template Misconfiguration Scan")
+                table.add_column("Template")
+                table.add_column("Severity")
+                table.add_column("Description")
+                for finding in all_findings:
+                    table.add_row(finding.template, finding.severity, finding.description)
+                get_console().print(table)
         else:
             logger.info("No misconfigurations identified in loaded templates.")
         return all_findings
 
-    @staticmethod
-    def _has_overly_permissive_rights(enrollment_rights: List[str]) -> bool:
-        """Flag templates that include broad domain groups in enrollment rights."""
-
-        permissive_groups = {"domain users", "authenticated users", "everyone"}
-        return any(right.lower() in permissive_groups for right in enrollment_rights)
+    def iter_findings(self, *, workers: Optional[int] = None) -> Iterator[Finding]:
+        """Yield findings in template, then rule, order as they are produced.
+
+        Serial scans sweep the templates in chunks of :data:`SCAN_CHUNK_SIZE`,
+        so the first findings are available long before a large scan ends and
+        only one chunk's findings are held at a time. With ``workers`` greater
+        than one the templates are split into contiguous shards evaluated
+        across a process pool and merged so the output matches a serial scan
+        exactly.
+        """
+
+        templates = self.templates_in_scope()
+        if workers and workers > 1 and len(templates) > 1:
+            yield from self._evaluate_sharded(templates, workers)
+            return
+        for offset in range(0, len(templates), SCAN_CHUNK_SIZE):
+            yield from self._evaluate(templates[offset : offset + SCAN_CHUNK_SIZE])
+
+    def templates_in_scope(self) -> Sequence[CertificateTemplate]:
+        """Return the configuration's templates that a full scan evaluates."""
+
+        return self._in_scope(self.configuration.certificate_templates)
+
+    def evaluate_templates(self, templates: Sequence[CertificateTemplate]) -> List[Finding]:
+        """Resolve the selected rules over ``templates`` in one columnar sweep."""
+
+        return self._evaluate(self._in_scope(templates))
+
+    def _in_scope(self, templates: Sequence[CertificateTemplate]) -> Sequence[CertificateTemplate]:
+        """Drop templates excluded by the issuability filter."""
+
+        if not self.issuable_only:
+            return templates
+        return [template for template in templates if self.configuration.template_flags(template).issuable]
+
+    def _evaluate(self, templates: Sequence[CertificateTemplate]) -> List[Finding]:
+        """Evaluate templates that are already in scope."""
+
+        with profiling.stage("detect.evaluate") as record:
+            hits = evaluate(templates, self.rules, self.configuration.permissive_groups())
+            record.count(len(templates))
+        return [
+            Finding.from_rule(templates[template_index].name, self.rules[rule_index])
+            for template_index, rule_index in hits
+        ]
+
+    def _evaluate_sharded(self, templates: Sequence[CertificateTemplate], workers: int) -> List[Finding]:
+        """Evaluate template shards in a process pool and merge hits deterministically."""
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        shard_size = -(-len(templates) // workers)
+        rule_ids = [rule.id for rule in self.rules]
+        permissive_groups = self.configuration.permissive_groups()
+        shards = [
+            (offset, templates[offset : offset + shard_size], rule_ids, permissive_groups)
+            for offset in range(0, len(templates), shard_size)
+        ]
+        logger.info("Scanning %d templates in %d shards", len(templates), len(shards))
+        with profiling.stage("detect.sharded") as record, ProcessPoolExecutor(max_workers=workers) as pool:
+            hits = sorted(hit for shard_hits in pool.map(_evaluate_shard, shards) for hit in shard_hits)
+            record.count(len(templates))
+        return [
+            Finding.from_rule(templates[template_index].name, self.rules[rule_index])
+            for template_index, rule_index in hits
+        ]
+
+
+def _evaluate_shard(
+    shard: Tuple[int, Sequence[CertificateTemplate], List[str], FrozenSet[str]],
+) -> List[Tuple[int, int]]:
+    """Pool entry point returning ``(template index, rule index)`` hits for one shard."""
+
+    offset, templates, rule_ids, permissive_groups = shard
+    hits = evaluate(templates, select_rules(rule_ids), permissive_groups)
+    return [(offset + template_index, rule_index) for template_index, rule_index in hits]
@@ -0,0 +1,102 @@
+"""Integer-coded Extended Key Usage registry.
+
+Every EKU is assigned a small integer ID so a template's EKU list can be held
+as a bitset and capability checks become bitwise operations. Friendly names
+(case-insensitive) and dotted OIDs of the well-known usages resolve to the same
+ID, so ``"Smart Card Logon"`` and ``"1.3.6.1.4.1.311.20.2.2"`` are treated as
+one usage. Usages outside the registry are assigned IDs on first sight; those
+IDs are stable within a process, while the well-known IDs are stable
+everywhere, so masks can be compared across pool workers for the registered
+usages.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+# (friendly name, OID) pairs; a usage's ID is its position in this tuple.
+KNOWN_EKUS: Tuple[Tuple[str, str], ...] = (
+    ("Any Purpose", "2.5.29.37.0"),
+    ("Server Authentication", "1.3.6.1.5.5.7.3.1"),
+    ("Client Authentication", "1.3.6.1.5.5.7.3.2"),
+    ("Code Signing", "1.3.6.1.5.5.7.3.3"),
+    ("Secure Email", "1.3.6.1.5.5.7.3.4"),
+    ("Time Stamping", "1.3.6.1.5.5.7.3.8"),
+    ("OCSP Signing", "1.3.6.1.5.5.7.3.9"),
+    ("Smart Card Logon", "1.3.6.1.4.1.311.20.2.2"),
+    ("Certificate Request Agent", "1.3.6.1.4.1.311.20.2.1"),
+    ("PKINIT Client Authentication", "1.3.6.1.5.2.3.4"),
+    ("Encrypting File System", "1.3.6.1.4.1.311.10.3.4"),
+    ("Key Recovery Agent", "1.3.6.1.4.1.311.21.6"),
+)
+
+# Additional spellings seen in template exports.
+ALIASES: Dict[str, str] = {
+    "smartcard logon": "Smart Card Logon",
+    "enrollment agent": "Certificate Request Agent",
+    "any": "Any Purpose",
+}
+
+_names: List[str] = [name for name, _ in KNOWN_EKUS]
+_ids: Dict[str, int] = {key: index for index, (name, oid) in enumerate(KNOWN_EKUS) for key in (name.casefold(), oid)}
+_ids.update({alias: _ids[name.casefold()] for alias, name in ALIASES.items()})
+
+# Masks keyed by EKU tuple; cleared when it reaches the limit so distinct EKU
+# lists accumulated over many reloads cannot grow it without bound.
+_MASK_CACHE_LIMIT = 4096
+_mask_cache: Dict[Tuple[str, ...], int] = {}
+# Serialises registration of unknown usages, e.g. by ``adcs-lab serve`` reload threads.
+_register_lock = threading.Lock()
+
+
+def eku_id(usage: str) -> int:
+    """Return the integer ID for an EKU friendly name or OID, registering unknown usages."""
+
+    key = usage.strip().casefold()
+    usage_id = _ids.get(key)
+    if usage_id is None:
+        with _register_lock:
+            usage_id = _ids.get(key)
+            if usage_id is None:
+                _names.append(usage.strip())
+                usage_id = _ids[key] = len(_names) - 1
+    return usage_id
+
+
+def eku_bit(usage: str) -> int:
+    """Return the single-bit mask for an EKU friendly name or OID."""
+
+    return 1 << eku_id(usage)
+
+
+def eku_name(usage: str) -> str:
+    """Return the canonical friendly name for an EKU name, alias, or OID."""
+
+    return _names[eku_id(usage)]
+
+
+def eku_mask(usages: Iterable[str]) -> int:
+    """Return the bitset of a template's EKUs.
+
+    Masks are memoised by EKU tuple value, so templates listing the same usages
+    share one entry and most lookups are a single dictionary hit.
+    """
+
+    key = usages if isinstance(usages, tuple) else tuple(usages)
+    mask = _mask_cache.get(key)
+    if mask is None:
+        mask = 0
+        for usage in key:
+            mask |= eku_bit(usage)
+        if len(_mask_cache) >= _MASK_CACHE_LIMIT:
+            _mask_cache.clear()
+        _mask_cache[key] = mask
+    return mask
+
+
+ANY_PURPOSE = eku_bit("Any Purpose")
+CLIENT_AUTHENTICATION = eku_bit("Client Authentication")
+SMART_CARD_LOGON = eku_bit("Smart Card Logon")
+CERTIFICATE_REQUEST_AGENT = eku_bit("Certificate Request Agent")
+LOGON = CLIENT_AUTHENTICATION | SMART_CARD_LOGON
@@ -0,0 +1,264 @@
+"""Privilege-escalation path graph across principals, groups, templates and CAs.
+
+The graph links every principal to its groups, groups to the groups they are
+nested in and to the templates they may enroll in, abusable templates to the
+certificate authorities that publish them, each CA to its parent, and CAs
+published to NTAuth to a single ``NTAuth`` node representing domain
+authentication, so paths only run through CAs chained to NTAuth. A template
+is abusable when it is ESC1-prone (requester-supplied subject without manager
+approval) and issues certificates usable for authentication.
+
+Adjacency is stored in compressed sparse row form: an ``offsets`` array with
+one entry per node and a flat ``targets`` array of edge endpoints, both
+:mod:`array` instances of machine integers. Questions such as "which
+principals can reach domain authentication" are answered by one multi-source
+breadth-first search over the reversed edges rather than a loop per
+principal; the search also records each node's next hop, so every principal's
+shortest path falls out of the same traversal.
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from adcs_lab import eku as eku_registry
+from adcs_lab.config_loader import CertificateTemplate, LabConfiguration
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL = "principal"
+GROUP = "group"
+TEMPLATE = "template"
+CA = "ca"
+NTAUTH = "ntauth"
+
+KINDS = (PRINCIPAL, GROUP, TEMPLATE, CA, NTAUTH)
+NTAUTH_NAME = "NTAuth"
+
+# EKUs that let a certificate authenticate a user to the domain.
+AUTHENTICATION_EKUS = (
+    eku_registry.CLIENT_AUTHENTICATION
+    | eku_registry.SMART_CARD_LOGON
+    | eku_registry.eku_bit("PKINIT Client Authentication")
+    | eku_registry.ANY_PURPOSE
+)
+
+_UNREACHED = -1
+
+
+@dataclass
+class EscalationPath:
+    """Shortest chain of nodes from a principal to domain authentication."""
+
+    principal: str
+    hops: List[Tuple[str, str]]
+
+    def to_dict(self) -> Dict[str, object]:
+        """Return a JSON-serialisable representation of the path."""
+
+        return {
+            "principal": self.principal,
+            "length": len(self.hops) - 1,
+            "path": [{"kind": kind, "name": name} for kind, name in self.hops],
+        }
+
+    def describe(self) -> str:
+        """Return the path as a single arrow-separated line."""
+
+        return " -> ".join(name for _, name in self.hops)
+
+
+class EscalationGraph:
+    """Directed graph of enrollment and trust relationships in CSR form."""
+
+    def __init__(
+        self, kinds: Sequence[str], names: Sequence[str], sources: Sequence[int], destinations: Sequence[int]
+    ) -> None:
+        self.kinds = array("B", (KINDS.index(kind) for kind in kinds))
+        self.names = list(names)
+        self._ids: Dict[Tuple[str, str], int] = {
+            (kind, name.casefold()): node for node, (kind, name) in enumerate(zip(kinds, names))
+        }
+        self.offsets, self.targets = _compress(len(self.names), sources, destinations)
+        self._reverse: Optional[Tuple[array, array]] = None
+
+    @classmethod
+    def from_configuration(cls, configuration: LabConfiguration) -> "EscalationGraph":
+        """Build the escalation graph for a loaded configuration."""
+
+        builder = _Builder()
+        sink = builder.node(NTAUTH, NTAUTH_NAME)
+        for ca in configuration.certificate_authorities:
+            node = builder.node(CA, ca.name)
+            if ca.nt_auth_published:
+                builder.edge(node, sink)
+            if ca.parent:
+                builder.edge(node, builder.node(CA, ca.parent))
+        for template in configuration.certificate_templates:
+            node = builder.node(TEMPLATE, template.name)
+            for group in template.enrollment_rights:
+                builder.edge(builder.node(GROUP, group), node)
+            if _is_abusable(configuration, template):
+                for ca in configuration.issuing_authorities(template):
+                    builder.edge(node, builder.node(CA, ca.name))
+        for security_group in configuration.security_groups:
+            node = builder.node(GROUP, security_group.name)
+            for parent in security_group.member_of:
+                builder.edge(node, builder.node(GROUP, parent))
+        for principal in configuration.security_principals:
+            node = builder.node(PRINCIPAL, principal.name)
+            for group in principal.groups:
+                builder.edge(node, builder.node(GROUP, group))
+
+        graph = cls(builder.kinds, builder.names, builder.sources, builder.destinations)
+        logger.info("Built escalation graph with %d nodes and %d edges", graph.node_count, graph.edge_count)
+        return graph
+
+    @property
+    def node_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def node_id(self, kind: str, name: str) -> Optional[int]:
+        """Return the node for a kind and name (case-insensitive), or ``None``."""
+
+        return self._ids.get((kind, name.casefold()))
+
+    def kind(self, node: int) -> str:
+        return KINDS[self.kinds[node]]
+
+    def successors(self, node: int) -> Sequence[int]:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def predecessors(self, node: int) -> Sequence[int]:
+        offsets, targets = self._reversed()
+        return targets[offsets[node] : offsets[node + 1]]
+
+    def distances_to(self, targets: Iterable[int]) -> Tuple[array, array]:
+        """Run one reverse BFS from ``targets``.
+
+        Returns per-node ``distance`` (``-1`` when the targets are unreachable)
+        and ``next_hop`` arrays; following ``next_hop`` from any reached node
+        walks a shortest path to the nearest target.
+        """
+
+        offsets, reverse_targets = self._reversed()
+        distance = array("i", [_UNREACHED]) * self.node_count
+        next_hop = array("i", [_UNREACHED]) * self.node_count
+        frontier = []
+        for target in targets:
+            if distance[target] == _UNREACHED:
+                distance[target] = 0
+                frontier.append(target)
+        depth = 0
+        while frontier:
+            depth += 1
+            following = []
+            for node in frontier:
+                for predecessor in reverse_targets[offsets[node] : offsets[node + 1]]:
+                    if distance[predecessor] == _UNREACHED:
+                        distance[predecessor] = depth
+                        next_hop[predecessor] = node
+                        following.append(predecessor)
+            frontier = following
+        return distance, next_hop
+
+    def escalation_paths(self, principals: Optional[Iterable[str]] = None) -> List[EscalationPath]:
+        """Return the shortest path to NTAuth for every principal that has one.
+
+        ``principals`` restricts the report to the named principals; all
+        principals are resolved by the same single traversal either way.
+        """
+
+        sink = self.node_id(NTAUTH, NTAUTH_NAME)
+        if sink is None:
+            return []
+        distance, next_hop = self.distances_to([sink])
+        if principals is None:
+            nodes = [node for node in range(self.node_count) if self.kinds[node] == KINDS.index(PRINCIPAL)]
+        else:
+            nodes = [node for node in (self.node_id(PRINCIPAL, name) for name in principals) if node is not None]
+        paths = []
+        for node in nodes:
+            if distance[node] == _UNREACHED:
+                continue
+            chain = [node]
+            while chain[-1] != sink:
+                chain.append(next_hop[chain[-1]])
+            paths.append(EscalationPath(self.names[node], [(self.kind(hop), self.names[hop]) for hop in chain]))
+        return paths
+
+    def shortest_path(self, source: int, target: int) -> Optional[List[int]]:
+        """Return the shortest node sequence from ``source`` to ``target``, or ``None``."""
+
+        distance, next_hop = self.distances_to([target])
+        if distance[source] == _UNREACHED:
+            return None
+        chain = [source]
+        while chain[-1] != target:
+            chain.append(next_hop[chain[-1]])
+        return chain
+
+    def _reversed(self) -> Tuple[array, array]:
+        """Return the reversed adjacency, building it on first use."""
+
+        if self._reverse is None:
+            sources = array("i")
+            for node in range(self.node_count):
+                sources.extend([node] * (self.offsets[node + 1] - self.offsets[node]))
+            self._reverse = _compress(self.node_count, self.targets, sources)
+        return self._reverse
+
+
+class _Builder:
+    """Accumulates nodes and edges, deduplicating nodes by kind and case-folded name."""
+
+    def __init__(self) -> None:
+        self.kinds: List[str] = []
+        self.names: List[str] = []
+        self.sources = array("i")
+        self.destinations = array("i")
+        self._ids: Dict[Tuple[str, str], int] = {}
+
+    def node(self, kind: str, name: str) -> int:
+        key = (kind, name.casefold())
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self.names)
+            self.kinds.append(kind)
+            self.names.append(name)
+        return node
+
+    def edge(self, source: int, destination: int) -> None:
+        self.sources.append(source)
+        self.destinations.append(destination)
+
+
+def _is_abusable(configuration: LabConfiguration, template: CertificateTemplate) -> bool:
+    """Return whether enrolling in ``template`` yields a certificate for impersonated authentication."""
+
+    if not configuration.template_flags(template).esc1_prone:
+        return False
+    return not template.eku or bool(eku_registry.eku_mask(template.eku) & AUTHENTICATION_EKUS)
+
+
+def _compress(node_count: int, sources: Sequence[int], destinations: Sequence[int]) -> Tuple[array, array]:
+    """Return CSR ``offsets`` and ``targets`` arrays for the given edge list (counting sort)."""
+
+    offsets = array("i", [0]) * (node_count + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for node in range(node_count):
+        offsets[node + 1] += offsets[node]
+    cursor = array("i", offsets[:-1])
+    targets = array("i", [0]) * len(sources)
+    for source, destination in zip(sources, destinations):
+        targets[cursor[source]] = destination
+        cursor[source] += 1
+    return offsets, targets
@@ -1,17 +1,26 @@
-"""Hardening helpers for simulated ADCS templates."""
+"""Hardening helpers for simulated ADCS templates.
+
+Hardening is computed as a :class:`HardeningPlan` of per-template patches
+without touching the templates, so several candidate plans can be compared
+against the same loaded configuration. Plans are applied in place, optionally
+to a subset of templates, or projected onto a copy-on-write view that only
+copies the templates they change.
+"""
 
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
-from typing import List
-
-from rich.console import Console
+from dataclasses import dataclass, field, replace
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from adcs_lab.config_loader import CertificateTemplate
+from adcs_lab import profiling
+from adcs_lab.config_loader import CertificateTemplate, LabConfiguration, templates_changed
+from adcs_lab.eku import LOGON, SMART_CARD_LOGON, eku_bit, eku_mask
+from adcs_lab.rendering import get_console
 
 logger = logging.getLogger(__name__)
-console = Console()
+
+CONTROLS = ("subject_name", "manager_approval", "smart_card_logon")
 
 
 @dataclass
@@ -22,33 +31,161 @@ class HardeningAction:
     changes: List[str]
 
 
+@dataclass
+class TemplatePatch:
+    """Planned field updates for one template, with the values they replace."""
+
+    template: str
+    changes: List[str]
+    before: Dict[str, Any] = field(default_factory=dict)
+    after: Dict[str, Any] = field(default_factory=dict)
+
+    def diff(self) -> List[Dict[str, Any]]:
+        """Return the patch as a list of ``field``/``before``/``after`` records."""
+
+        return [{"field": name, "before": self.before[name], "after": value} for name, value in self.after.items()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable representation of the patch."""
+
+        return {"template": self.template, "changes": self.changes, "diff": self.diff()}
+
+
+@dataclass
+class HardeningPlan:
+    """An ordered set of template patches that has not been applied yet."""
+
+    patches: List[TemplatePatch]
+
+    def select(self, templates: Optional[Collection[str]] = None) -> "HardeningPlan":
+        """Return a plan restricted to the named templates (case-insensitive)."""
+
+        if templates is None:
+            return self
+        wanted = {name.casefold() for name in templates}
+        return HardeningPlan([patch for patch in self.patches if patch.template.casefold() in wanted])
+
+    def view(self, templates: Sequence[CertificateTemplate]) -> List[CertificateTemplate]:
+        """Project the plan onto ``templates`` without mutating them.
+
+        Patched templates are replaced by updated copies; every other entry is
+        the original object, so evaluating a plan costs one copy per change.
+        """
+
+        patches = {patch.template: patch for patch in self.patches}
+        return [
+            replace(template, **patches[template.name].after) if template.name in patches else template
+            for template in templates
+        ]
+
+    def iter_apply(
+        self, templates: Sequence[CertificateTemplate], configuration: Optional[LabConfiguration] = None
+    ) -> Iterator[HardeningAction]:
+        """Apply the patches in place, yielding an action per patched template.
+
+        The indexes of every configuration holding a patched template are
+        refreshed once the generator finishes or is closed, so partially
+        consumed runs never leave stale flags behind. ``configuration`` is
+        only kept for compatibility; it is refreshed like any other.
+        """
+
+        by_name = {template.name: template for template in templates}
+        pairs = ((by_name[patch.template], patch) for patch in self.patches if patch.template in by_name)
+        return _apply_patches(pairs)
+
+
 class EkuHardener:
-    """Apply opinionated EKU and permission hardening to templates."""
+    """Apply opinionated EKU and permission hardening to templates.
 
-    def __init__(self, templates: List[CertificateTemplate]) -> None:
+    ``controls`` selects which of :data:`CONTROLS` the hardener enforces; all
+    of them by default. Applying patches refreshes the indexes of every loaded
+    configuration holding the templates, whether or not ``configuration`` is
+    passed.
+    """
+
+    def __init__(
+        self,
+        templates: List[CertificateTemplate],
+        *,
+        configuration: Optional[LabConfiguration] = None,
+        controls: Optional[Iterable[str]] = None,
+    ) -> None:
         self.templates = templates
+        self.configuration = configuration
+        self.controls = CONTROLS if controls is None else tuple(controls)
+        unknown = set(self.controls).difference(CONTROLS)
+        if unknown:
+            raise ValueError("Unknown hardening controls: " + ", ".join(sorted(unknown)))
+
+    def plan(self) -> HardeningPlan:
+        """Compute hardening patches for every template without modifying any of them."""
+
+        with profiling.stage("harden.plan") as record:
+            patches = [patch for patch in map(self.patch_for, self.templates) if patch is not None]
+            record.count(len(self.templates))
+        return HardeningPlan(patches)
+
+    def patch_for(self, template: CertificateTemplate) -> Optional[TemplatePatch]:
+        """Return the patch that would harden ``template``, or ``None`` if it is compliant."""
+
+        patch = TemplatePatch(template=template.name, changes=[])
+        if "subject_name" in self.controls and template.subject_name_editable:
+            _set(patch, template, "subject_name_editable", False, "Disabled subject name editing")
+        if "manager_approval" in self.controls and not template.manager_approval_required:
+            _set(patch, template, "manager_approval_required", True, "Enabled manager approval requirement")
+        if "smart_card_logon" in self.controls and eku_mask(template.eku) & LOGON == LOGON:
+            eku = tuple(usage for usage in template.eku if eku_bit(usage) != SMART_CARD_LOGON)
+            _set(patch, template, "eku", eku, "Removed Smart Card Logon EKU")
+        return patch if patch.changes else None
 
-    def apply(self) -> List[HardeningAction]:
+    def apply(self, *, only: Optional[Collection[str]] = None) -> List[HardeningAction]:
         """Enforce safer defaults for EKU and enrollment permissions."""
 
-        actions: List[HardeningAction] = []
-        for template in self.templates:
-            changes: List[str] = []
-            if template.subject_name_editable:
-                template.subject_name_editable = False
-                changes.append("Disabled subject name editing")
-            if not template.manager_approval_required:
-                template.manager_approval_required = True
-                changes.append("Enabled manager approval requirement")
-            if "Smart Card Logon" in template.eku and "Client Authentication" in template.eku:
-                template.eku.remove("Smart Card Logon")
-                changes.append("Removed Smart Card Logon EKU")
-            if changes:
-                actions.append(HardeningAction(template=template.name, changes=changes))
-                logger.info("Hardened template %s: %s", template.name, "; ".join(changes))
+        actions = list(self.iter_apply(only=only))
         if not actions:
             logger.info("No templates required changes; already hardened.")
         else:
+            console = get_console()
             for action in actions:
                 console.log(f"Template {action.template} hardened", action.changes)
         return actions
+
+    def iter_apply(self, *, only: Optional[Collection[str]] = None) -> Iterator[HardeningAction]:
+        """Harden templates one at a time, yielding each action as it is applied.
+
+        ``only`` restricts hardening to the named templates.
+        """
+
+        wanted = None if only is None else {name.casefold() for name in only}
+        pairs = (
+            (template, patch)
+            for template in self.templates
+            if wanted is None or template.name.casefold() in wanted
+            for patch in (self.patch_for(template),)
+            if patch is not None
+        )
+        return profiling.profile_iter("harden.apply", _apply_patches(pairs))
+
+
+def _apply_patches(pairs: Iterable[Tuple[CertificateTemplate, TemplatePatch]]) -> Iterator[HardeningAction]:
+    """Write patches onto their templates, refreshing the holding configurations' indexes once at the end."""
+
+    changed: List[CertificateTemplate] = []
+    try:
+        for template, patch in pairs:
+            for name, value in patch.after.items():
+                setattr(template, name, value)
+            changed.append(template)
+            logger.info("Hardened template %s: %s", patch.template, "; ".join(patch.changes))
+            yield HardeningAction(template=patch.template, changes=list(patch.changes))
+    finally:
+        if changed:
+            templates_changed(changed)
+
+
+def _set(patch: TemplatePatch, template: CertificateTemplate, name: str, value: Any, change: str) -> None:
+    """Record one field update on a patch."""
+
+    patch.before[name] = getattr(template, name)
+    patch.after[name] = value
+    patch.changes.append(change)
@@ -0,0 +1,173 @@
+"""Incremental template scanning backed by a local state file.
+
+Each certificate template is fingerprinted from its field values. The state
+file records the fingerprint and findings of every template from the previous
+run, so the next run only evaluates added or changed templates, drops findings
+for removed ones, and reports which findings are new, resolved, or unchanged.
+A change to the selected rules or their definitions (see
+:meth:`~adcs_lab.rules.Rule.signature`), to the effective set of permissive
+groups, or to the issuability filter invalidates every stored result and
+triggers a full scan; with the filter enabled, a template whose issuability changed is
+re-evaluated like an edited one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from adcs_lab._fsutil import atomic_write
+from adcs_lab.config_loader import CertificateTemplate
+from adcs_lab.detection import Finding, TemplateAnalyzer
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+
+@dataclass
+class IncrementalScanResult:
+    """Outcome of an incremental scan compared with the previous run."""
+
+    findings: List[Finding]
+    new: List[Finding] = field(default_factory=list)
+    resolved: List[Finding] = field(default_factory=list)
+    unchanged: List[Finding] = field(default_factory=list)
+    evaluated_templates: List[str] = field(default_factory=list)
+    removed_templates: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, int]:
+        """Return counts suitable for logging and JSON reports."""
+
+        return {
+            "findings": len(self.findings),
+            "new": len(self.new),
+            "resolved": len(self.resolved),
+            "unchanged": len(self.unchanged),
+            "evaluated_templates": len(self.evaluated_templates),
+            "removed_templates": len(self.removed_templates),
+        }
+
+
+def template_fingerprint(template: CertificateTemplate) -> str:
+    """Return a stable SHA-256 fingerprint of a template's field values."""
+
+    encoded = json.dumps(asdict(template), sort_keys=True, separators=(",", ":"), default=list)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class IncrementalScanner:
+    """Re-evaluate only templates that changed since the last recorded scan."""
+
+    def __init__(self, analyzer: TemplateAnalyzer, state_path: str | Path) -> None:
+        self.analyzer = analyzer
+        self.state_path = Path(state_path)
+
+    def run(self) -> IncrementalScanResult:
+        """Scan added and changed templates, persist the new state, and return the diff."""
+
+        context = self._context_fingerprint()
+        previous = self._load_state(context)
+        templates = self.analyzer.configuration.certificate_templates
+
+        fingerprints: Dict[str, str] = {}
+        changed: List[CertificateTemplate] = []
+        configuration = self.analyzer.configuration
+        for template in templates:
+            fingerprint = template_fingerprint(template)
+            if self.analyzer.issuable_only and not configuration.template_flags(template).issuable:
+                fingerprint += ":not-issuable"
+            fingerprints[template.name] = fingerprint
+            entry = previous.get(template.name)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                changed.append(template)
+
+        fresh: Dict[str, List[Finding]] = {template.name: [] for template in changed}
+        for finding in self.analyzer.evaluate_templates(changed):
+            fresh[finding.template].append(finding)
+
+        result = IncrementalScanResult(findings=[], evaluated_templates=[template.name for template in changed])
+        state: Dict[str, Dict[str, Any]] = {}
+        for template in templates:
+            name = template.name
+            before = [Finding(**item) for item in previous[name]["findings"]] if name in previous else []
+            if name in fresh:
+                after = fresh[name]
+                _diff(before, after, result)
+            else:
+                after = before
+                result.unchanged.extend(after)
+            result.findings.extend(after)
+            state[name] = {"fingerprint": fingerprints[name], "findings": [finding.__dict__ for finding in after]}
+
+        for name, entry in previous.items():
+            if name not in fingerprints:
+                result.removed_templates.append(name)
+                result.resolved.extend(Finding(**item) for item in entry["findings"])
+
+        self._write_state(context, state)
+        logger.info(
+            "Incremental scan evaluated %d of %d templates: %d new, %d resolved, %d unchanged findings",
+            len(changed),
+            len(templates),
+            len(result.new),
+            len(result.resolved),
+            len(result.unchanged),
+        )
+        return result
+
+    def _context_fingerprint(self) -> str:
+        """Fingerprint scan inputs other than the templates themselves."""
+
+        context = {
+            "rules": [[rule.id, rule.signature()] for rule in self.analyzer.rules],
+            "permissive_groups": sorted(self.analyzer.configuration.permissive_groups()),
+            "issuable_only": self.analyzer.issuable_only,
+        }
+        return hashlib.sha256(json.dumps(context, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _load_state(self, context: str) -> Dict[str, Dict[str, Any]]:
+        """Return per-template state from the previous run, or nothing if unusable."""
+
+        try:
+            with self.state_path.open("r", encoding="utf-8") as handle:
+                state = json.load(handle)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable scan state %s: %s", self.state_path, exc)
+            return {}
+        if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+            logger.warning("Ignoring scan state %s with unsupported version", self.state_path)
+            return {}
+        if state.get("context") != context:
+            logger.info("Detection rules or group context changed; running a full scan")
+            return {}
+        templates = state.get("templates")
+        return templates if isinstance(templates, dict) else {}
+
+    def _write_state(self, context: str, templates: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically persist the state for the next run."""
+
+        with atomic_write(self.state_path) as handle:
+            json.dump({"version": STATE_VERSION, "context": context, "templates": templates}, handle)
+
+
+def _diff(before: List[Finding], after: List[Finding], result: IncrementalScanResult) -> None:
+    """Classify one template's findings as new, resolved, or unchanged."""
+
+    before_keys = {_finding_key(finding) for finding in before}
+    after_keys = {_finding_key(finding) for finding in after}
+    for finding in after:
+        (result.unchanged if _finding_key(finding) in before_keys else result.new).append(finding)
+    result.resolved.extend(finding for finding in before if _finding_key(finding) not in after_keys)
+
+
+def _finding_key(finding: Finding) -> Tuple[str, str, str]:
+    """Identify a finding across runs."""
+
+    return finding.template, finding.rule, finding.description
@@ -0,0 +1,159 @@
+"""JSON and line-delimited JSON (NDJSON) configuration input.
+
+Directory collectors commonly export JSON, so :class:`LabConfiguration`
+reads it natively instead of requiring a conversion to YAML. Two layouts are
+accepted:
+
+* a JSON document with the same root sections as the YAML format;
+* NDJSON with one entity per line, each carrying a ``kind`` field naming its
+  section (``certificate_template``, ``certificate_authority``,
+  ``security_principal`` or ``security_group``, or the plural section name).
+  Lines are decoded one at a time, so memory stays flat regardless of file
+  size. Sections without any lines are empty.
+
+The format is chosen by extension (``.json``; ``.ndjson`` or ``.jsonl``) and
+otherwise sniffed from the file. A leading ``{`` or ``[`` is also valid YAML
+flow style, so an extensionless file is only treated as JSON when it decodes
+as JSON and is read as YAML otherwise; :func:`sniff_format` hands that decoded
+document back so the loader does not decode the file twice. Documents are decoded with ``orjson``
+when it is installed (``pip install adcs-lab[fast]``) and the standard
+library :mod:`json` otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, Iterator, Optional, Tuple
+
+from adcs_lab.config_loader import REQUIRED_SECTIONS, SECTIONS, RawEntity
+
+YAML_SUFFIXES = frozenset({".yaml", ".yml"})
+JSON_SUFFIXES = frozenset({".json"})
+NDJSON_SUFFIXES = frozenset({".ndjson", ".jsonl"})
+
+KIND_SECTIONS: Dict[str, str] = {
+    **{section: section for section in SECTIONS},
+    "certificate_template": "certificate_templates",
+    "certificate_authority": "certificate_authorities",
+    "security_principal": "security_principals",
+    "security_group": "security_groups",
+}
+
+_SNIFF_LIMIT = 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def json_decoder() -> Callable[[Any], Any]:
+    """Return ``orjson.loads`` when available, else :func:`json.loads`; both accept bytes."""
+
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+def detect_format(path: Path) -> str:
+    """Return ``"yaml"``, ``"json"`` or ``"ndjson"`` for a configuration file (see :func:`sniff_format`)."""
+
+    return sniff_format(path)[0]
+
+
+def sniff_format(path: Path) -> Tuple[str, Any]:
+    """Return the format of a configuration file and its JSON document when sniffing decoded it.
+
+    Without a known extension, a first line that is a JSON object with a
+    ``kind`` field means NDJSON; otherwise a file starting with ``{`` or ``[``
+    is decoded whole and counts as JSON only if that succeeds. The document is
+    ``None`` unless that decode happened.
+    """
+
+    suffix = path.suffix.lower()
+    if suffix in YAML_SUFFIXES:
+        return "yaml", None
+    if suffix in JSON_SUFFIXES:
+        return "json", None
+    if suffix in NDJSON_SUFFIXES:
+        return "ndjson", None
+    with path.open("rb") as handle:
+        first_line = handle.readline(_SNIFF_LIMIT).lstrip(b"\xef\xbb\xbf \t\r\n")
+        if not first_line.startswith((b"{", b"[")):
+            return "yaml", None
+        try:
+            record = json_decoder()(first_line)
+        except ValueError:
+            record = None
+        if isinstance(record, dict) and "kind" in record:
+            return "ndjson", None
+    try:
+        return "json", json_decoder()(path.read_bytes())
+    except ValueError:
+        return "yaml", None
+
+
+def load_json_document(path: Path) -> Any:
+    """Decode a whole JSON configuration document."""
+
+    data = path.read_bytes()
+    if not data.strip():
+        raise ValueError("Configuration file is empty; expected JSON content.")
+    try:
+        return json_decoder()(data)
+    except ValueError as exc:
+        raise ValueError(f"JSON parsing error in {path}: {exc}") from exc
+
+
+def iter_json_entities(path: Path, sections: Optional[Collection[str]] = None) -> Iterator[RawEntity]:
+    """Yield entity mappings from a JSON configuration document, in document order."""
+
+    document = load_json_document(path)
+    if not isinstance(document, dict):
+        raise ValueError("Configuration root must be a mapping/dictionary.")
+    missing = REQUIRED_SECTIONS.difference(document)
+    if missing:
+        raise ValueError("Configuration is missing required sections: " + ", ".join(sorted(missing)))
+    for section in document:
+        if section not in SECTIONS or (sections is not None and section not in sections):
+            continue
+        elements = document[section]
+        if elements is None:
+            continue
+        if not isinstance(elements, list):
+            raise ValueError(f"Expected list for '{section}' but received {type(elements).__name__}")
+        for index, element in enumerate(elements):
+            if not isinstance(element, dict):
+                raise ValueError(
+                    f"Each item in '{section}' must be a mapping; received {type(element).__name__} "
+                    f"({section}[{index}])"
+                )
+            yield RawEntity(section=section, index=index, line=0, data=element)
+
+
+def iter_ndjson_entities(path: Path, sections: Optional[Collection[str]] = None) -> Iterator[RawEntity]:
+    """Yield entity mappings from an NDJSON file one line at a time."""
+
+    decode = json_decoder()
+    counts: Dict[str, int] = {}
+    with path.open("rb") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = decode(line)
+            except ValueError as exc:
+                raise ValueError(f"JSON parsing error in {path}, line {line_number}: {exc}") from exc
+            if not isinstance(record, dict):
+                raise ValueError(
+                    f"Each line must be a JSON object; received {type(record).__name__} (line {line_number})"
+                )
+            kind = record.pop("kind", None)
+            section = KIND_SECTIONS.get(kind) if isinstance(kind, str) else None
+            if section is None:
+                raise ValueError(f"Unknown entity kind {kind!r} (line {line_number})")
+            if sections is not None and section not in sections:
+                continue
+            index = counts.get(section, 0)
+            counts[section] = index + 1
+            yield RawEntity(section=section, index=index, line=line_number, data=record)
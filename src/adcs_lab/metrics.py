@@ -0,0 +1,258 @@
+"""Prometheus text-format metrics for configuration loads and detection scans.
+
+:class:`MetricsRegistry` keeps counters, gauges and histograms in memory and
+renders them in the Prometheus text exposition format (version 0.0.4), which
+OpenMetrics scrapers also accept. ``adcs-lab detect --metrics-file`` writes
+one scan's metrics for the node_exporter textfile collector, and
+``adcs-lab serve`` exposes its running totals at ``/metrics``.
+
+Exported series:
+
+``adcs_lab_config_load_seconds{source}``
+    Histogram of configuration load time; ``source`` is ``snapshot`` or the
+    parsed format (``yaml``, ``json`` or ``ndjson``).
+``adcs_lab_config_cache_hits_total`` / ``adcs_lab_config_cache_misses_total``
+    Snapshot cache lookups (only counted when the cache is enabled).
+``adcs_lab_scan_duration_seconds``
+    Histogram of detection scan time.
+``adcs_lab_scans_total``, ``adcs_lab_templates_scanned_total``
+    Completed scans and the templates they evaluated.
+``adcs_lab_findings_total{rule,severity}``
+    Findings raised across all scans.
+``adcs_lab_last_scan_findings{severity}``, ``adcs_lab_last_scan_timestamp_seconds``
+    Posture of the most recent scan, for drift alerts.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from adcs_lab._fsutil import atomic_write
+from adcs_lab.detection import Finding
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SEVERITIES = ("high", "medium", "low")
+
+Labels = Tuple[str, ...]
+
+
+class _Metric:
+    """A named metric family with samples keyed by label values.
+
+    Updates and sample snapshots hold a per-metric lock, so a metric may be
+    updated from worker threads while it is being rendered.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Unlabelled series are exported from the start, as zero.
+        self.values: Dict[Labels, float] = {} if self.labelnames else {(): 0.0}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Labels:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}; received {tuple(labels)}")
+        return tuple(labels)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        with self._lock:
+            values = sorted(self.values.items())
+        for labels, value in values:
+            yield self.name, self.labelnames, labels, value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, labels: Sequence[str] = ()) -> None:
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} cannot decrease")
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, labels: Sequence[str] = ()) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.counts: Dict[Labels, List[int]] = {} if self.labelnames else {(): [0] * len(self.buckets)}
+        self.sums: Dict[Labels, float] = {} if self.labelnames else {(): 0.0}
+
+    def observe(self, value: float, labels: Sequence[str] = ()) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self.counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self.sums[key] = self.sums.get(key, 0.0) + value
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        bucket_names = self.labelnames + ("le",)
+        with self._lock:
+            series = [(labels, list(counts), self.sums[labels]) for labels, counts in sorted(self.counts.items())]
+        for labels, counts, total in series:
+            for bound, count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", bucket_names, labels + (_format_bound(bound),), count
+            yield f"{self.name}_sum", self.labelnames, labels, total
+            yield f"{self.name}_count", self.labelnames, labels, counts[-1]
+
+
+_M = TypeVar("_M", bound=_Metric)
+
+
+class MetricsRegistry:
+    """Operational metrics for loads and scans, rendered in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self.load_seconds = self.histogram(
+            "adcs_lab_config_load_seconds", "Time spent loading the lab configuration.", ("source",)
+        )
+        self.cache_hits = self.counter("adcs_lab_config_cache_hits_total", "Loads served from the snapshot cache.")
+        self.cache_misses = self.counter(
+            "adcs_lab_config_cache_misses_total", "Loads that missed the snapshot cache and parsed the source file."
+        )
+        self.scan_seconds = self.histogram("adcs_lab_scan_duration_seconds", "Time spent scanning templates.")
+        self.scans = self.counter("adcs_lab_scans_total", "Detection scans completed.")
+        self.templates_scanned = self.counter("adcs_lab_templates_scanned_total", "Templates evaluated by scans.")
+        self.findings = self.counter(
+            "adcs_lab_findings_total", "Findings raised by detection scans.", ("rule", "severity")
+        )
+        self.last_scan_findings = self.gauge(
+            "adcs_lab_last_scan_findings", "Findings in the most recent scan by severity.", ("severity",)
+        )
+        self.last_scan_timestamp = self.gauge(
+            "adcs_lab_last_scan_timestamp_seconds", "Unix time the most recent scan completed."
+        )
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames))
+
+    def _register(self, metric: "_M") -> "_M":
+        if any(existing.name == metric.name for existing in self._metrics):
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics.append(metric)
+        return metric
+
+    def observe_load(self, seconds: float, source: str, *, from_cache: Optional[bool] = None) -> None:
+        """Record one configuration load.
+
+        ``source`` is the configuration's ``load_source`` (``snapshot`` or the
+        parsed format); ``from_cache`` is ``None`` when the snapshot cache was
+        not used.
+        """
+
+        self.load_seconds.observe(seconds, (source,))
+        if from_cache is True:
+            self.cache_hits.inc()
+        elif from_cache is False:
+            self.cache_misses.inc()
+
+    def observe_scan(self, counts: Mapping[Tuple[str, str], int], *, templates: int, seconds: float) -> None:
+        """Record a completed scan from its finding counts by ``(rule, severity)`` (see :func:`count_findings`)."""
+
+        by_severity = dict.fromkeys(SEVERITIES, 0)
+        for (rule, severity), count in counts.items():
+            self.findings.inc(count, (rule, severity))
+            by_severity[severity] = by_severity.get(severity, 0) + count
+        for severity, count in by_severity.items():
+            self.last_scan_findings.set(count, (severity,))
+        self.scans.inc()
+        self.templates_scanned.inc(templates)
+        self.scan_seconds.observe(seconds)
+        self.last_scan_timestamp.set(time.time())
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labelnames, labels, value in metric.samples():
+                rendered = ",".join(f'{key}="{_escape_label(item)}"' for key, item in zip(labelnames, labels))
+                lines.append(
+                    f"{name}{{{rendered}}} {_format_value(value)}" if rendered else f"{name} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def count_findings(findings: Iterable[Finding]) -> Dict[Tuple[str, str], int]:
+    """Count findings by ``(rule, severity)``."""
+
+    counts: Dict[Tuple[str, str], int] = {}
+    for _ in tally(findings, counts):
+        pass
+    return counts
+
+
+def tally(findings: Iterable[Finding], counts: Dict[Tuple[str, str], int]) -> Iterator[Finding]:
+    """Yield findings unchanged while counting them into ``counts``, so streamed scans need not keep them."""
+
+    for finding in findings:
+        key = (finding.rule, finding.severity)
+        counts[key] = counts.get(key, 0) + 1
+        yield finding
+
+
+def write_textfile(path: str | Path, registry: MetricsRegistry) -> Path:
+    """Atomically write metrics for the node_exporter textfile collector (which reads ``*.prom``)."""
+
+    target = Path(path)
+    # The collector only reads *.prom, so the ".tmp" suffix keeps partial files out of a scrape.
+    with atomic_write(target) as handle:
+        handle.write(registry.render())
+    return target
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
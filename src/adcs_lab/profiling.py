@@ -0,0 +1,216 @@
+"""Per-stage timing and memory instrumentation.
+
+The load, simulate, detect and harden hot paths mark their stages with
+:func:`stage` (or :func:`profile_iter` for generators). While no
+:class:`Profiler` is active, :func:`stage` returns a shared no-op context
+manager, so the instrumentation costs one function call per stage and can
+stay in place for production runs.
+
+Inside ``with Profiler():`` every stage records its call count, wall time,
+the number of items it processed and the peak memory it allocated, as
+measured by :mod:`tracemalloc` (which slows allocation-heavy stages down, so
+use ``adcs-lab bench`` for clean timings). Stages may nest; a nested stage's
+allocations count towards its parent's peak as well.
+
+Stage names used by the package:
+
+``load``, ``load.parse``, ``load.build``, ``load.validate``, ``load.stream``, ``load.snapshot``
+    :meth:`LabConfiguration.load` and its phases (items: entities).
+``simulate.run``, ``simulate.run_many``
+    :class:`Esc1Simulation` (items: principals).
+``detect.evaluate``, ``detect.sharded``
+    :class:`TemplateAnalyzer` rule sweeps (items: templates).
+``harden.plan``, ``harden.apply``
+    :class:`EkuHardener` (items: templates planned, actions applied).
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_active: Optional["Profiler"] = None
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements for one stage name."""
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    items: int = 0
+    peak_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class _DisabledStage:
+    """Shared no-op stage returned while profiling is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_DisabledStage":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def count(self, items: int) -> None:
+        return None
+
+
+_DISABLED = _DisabledStage()
+
+
+class _ActiveStage:
+    """One entry into a stage while a profiler is active."""
+
+    __slots__ = ("profiler", "stats", "count_call", "started", "start_bytes", "peak_bytes")
+
+    def __init__(self, profiler: "Profiler", stats: StageStats, count_call: bool) -> None:
+        self.profiler = profiler
+        self.stats = stats
+        self.count_call = count_call
+        self.started = 0.0
+        self.start_bytes = 0
+        self.peak_bytes = 0
+
+    def __enter__(self) -> "_ActiveStage":
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.profiler._exit(self)
+
+    def count(self, items: int) -> None:
+        """Record ``items`` processed by this stage."""
+
+        self.stats.items += items
+
+
+class Profiler:
+    """Collect stage measurements while installed with ``with Profiler() as profiler:``."""
+
+    def __init__(self, *, memory: bool = True) -> None:
+        self.memory = memory
+        self.stats: Dict[str, StageStats] = {}
+        self._stack: List[_ActiveStage] = []
+        self._started_tracing = False
+        self._previous: Optional[Profiler] = None
+
+    def __enter__(self) -> "Profiler":
+        global _active
+        if self.memory:
+            import tracemalloc
+
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        global _active
+        _active = self._previous
+        if self._started_tracing:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def stage(self, name: str, *, count_call: bool = True) -> _ActiveStage:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = StageStats(name)
+        return _ActiveStage(self, stats, count_call)
+
+    def report(self) -> List[StageStats]:
+        """Return stage measurements in the order each stage was first entered."""
+
+        return list(self.stats.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stages": [stats.to_dict() for stats in self.report()]}
+
+    def _enter(self, frame: _ActiveStage) -> None:
+        if self.memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_bytes = max(parent.peak_bytes, peak)
+            tracemalloc.reset_peak()
+            frame.start_bytes = frame.peak_bytes = current
+        self._stack.append(frame)
+        frame.started = time.perf_counter()
+
+    def _exit(self, frame: _ActiveStage) -> None:
+        elapsed = time.perf_counter() - frame.started
+        stats = frame.stats
+        stats.seconds += elapsed
+        if frame.count_call:
+            stats.calls += 1
+        if self._stack and self._stack[-1] is frame:
+            self._stack.pop()
+        elif frame in self._stack:
+            self._stack.remove(frame)
+        if self.memory:
+            import tracemalloc
+
+            _, peak = tracemalloc.get_traced_memory()
+            frame.peak_bytes = max(frame.peak_bytes, peak)
+            stats.peak_bytes = max(stats.peak_bytes, frame.peak_bytes - frame.start_bytes)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_bytes = max(parent.peak_bytes, frame.peak_bytes)
+            tracemalloc.reset_peak()
+
+
+def stage(name: str) -> Any:
+    """Return a context manager measuring one pass through stage ``name``.
+
+    The returned object has a ``count(items)`` method for recording how many
+    items the stage processed; it is a shared no-op while profiling is off.
+    """
+
+    profiler = _active
+    if profiler is None:
+        return _DISABLED
+    return profiler.stage(name)
+
+
+def profile_iter(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    """Measure the time spent producing items of ``iterable`` as one call to stage ``name``.
+
+    Time the consumer spends between items is excluded. While profiling is
+    off the iterator is returned unwrapped.
+    """
+
+    profiler = _active
+    if profiler is None:
+        return iter(iterable)
+    return _timed_iter(profiler, name, iter(iterable))
+
+
+def _timed_iter(profiler: Profiler, name: str, iterator: Iterator[T]) -> Iterator[T]:
+    first = True
+    try:
+        while True:
+            with profiler.stage(name, count_call=first) as record:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                record.count(1)
+            first = False
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
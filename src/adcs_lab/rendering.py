@@ -0,0 +1,23 @@
+"""Deferred access to the ``rich`` console used for human-readable output.
+
+``rich`` is only imported, and the console only constructed, the first time a
+table or log line is actually rendered, keeping JSON and batch runs free of
+its import cost.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@lru_cache(maxsize=None)
+def get_console() -> "Console":
+    """Return the shared console, creating it on first use."""
+
+    from rich.console import Console
+
+    return Console()
@@ -0,0 +1,204 @@
+"""Declarative detection rules evaluated over columnar template data.
+
+Each :class:`Rule` names the template columns it depends on and a predicate
+over those columns. Columns are Python integers used as bitsets, where bit
+``i`` describes the ``i``-th template in the scan. Each column is built once
+per scan, and each rule then resolves every template at once with bitwise
+operations, so adding rules does not add passes and rule selection only
+builds the columns the selected rules need. Templates are
+evaluated in blocks of ``COLUMN_BLOCK_SIZE`` so the bitsets stay small. EKU
+columns are read from the integer-coded masks of :mod:`adcs_lab.eku`, so OIDs
+and friendly names match alike.
+
+The ``ESC2``, ``ESC3`` and ``ESC4`` rules are opt-in: they only run when
+selected by id, and scans without a rule selection run :data:`DEFAULT_RULES`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from adcs_lab.config_loader import PERMISSIVE_GROUPS, CertificateTemplate
+from adcs_lab.eku import ANY_PURPOSE, CERTIFICATE_REQUEST_AGENT, LOGON, eku_mask
+
+ColumnBuilder = Callable[[CertificateTemplate, FrozenSet[str]], bool]
+Predicate = Callable[[Mapping[str, int], int], int]
+
+COLUMNS: Dict[str, ColumnBuilder] = {
+    "subject_editable": lambda template, _: template.subject_name_editable,
+    "manager_approval": lambda template, _: template.manager_approval_required,
+    "logon_eku": lambda template, _: eku_mask(template.eku) & LOGON == LOGON,
+    "any_purpose_eku": lambda template, _: not template.eku or bool(eku_mask(template.eku) & ANY_PURPOSE),
+    "agent_eku": lambda template, _: bool(eku_mask(template.eku) & CERTIFICATE_REQUEST_AGENT),
+    "permissive_enrollment": lambda template, groups: any(
+        right.casefold() in groups for right in template.enrollment_rights
+    ),
+    "permissive_owner": lambda template, groups: template.owner.casefold() in groups,
+    "long_validity": lambda template, _: template.validity_days > 365,
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A detection rule resolved over template columns."""
+
+    id: str
+    severity: str
+    description: str
+    recommendation: str
+    columns: Tuple[str, ...]
+    predicate: Predicate
+    # Bump when the rule's meaning changes without its code changing, e.g. through a column it reads.
+    version: int = 1
+    # Run when no rules are selected explicitly.
+    default: bool = True
+
+    def signature(self) -> str:
+        """Return a digest of the rule's definition: metadata, version, predicate and column builder code.
+
+        Stored scan results are only reusable while the signature is unchanged.
+        Code is compared as marshalled bytecode, so upgrading Python also
+        changes the signature.
+        """
+
+        import hashlib
+        import marshal
+
+        digest = hashlib.sha256()
+        for text in (self.id, str(self.version), self.severity, self.description, self.recommendation):
+            digest.update(text.encode("utf-8") + b"\0")
+        digest.update(marshal.dumps(self.predicate.__code__))
+        for name in self.columns:
+            digest.update(name.encode("utf-8") + b"\0")
+            digest.update(marshal.dumps(COLUMNS[name].__code__))
+        return digest.hexdigest()
+
+
+RULES: Tuple[Rule, ...] = (
+    Rule(
+        id="ESC1",
+        severity="high",
+        description="Subject name is editable without manager approval (ESC1 risk).",
+        recommendation="Disable subject editing or require manager approval.",
+        columns=("subject_editable", "manager_approval"),
+        predicate=lambda c, full: c["subject_editable"] & ~c["manager_approval"] & full,
+    ),
+    Rule(
+        id="LOGON-EKU",
+        severity="medium",
+        description="Template issues certificates usable for interactive logon.",
+        recommendation="Restrict EKUs to intended purposes and enforce approvals.",
+        columns=("logon_eku",),
+        predicate=lambda c, full: c["logon_eku"],
+    ),
+    Rule(
+        id="BROAD-ENROLLMENT",
+        severity="medium",
+        description="Enrollment rights allow broad domain groups (potential privilege escalation).",
+        recommendation="Restrict enrollment to dedicated security groups and require approvals.",
+        columns=("permissive_enrollment",),
+        predicate=lambda c, full: c["permissive_enrollment"],
+    ),
+    Rule(
+        id="LONG-VALIDITY",
+        severity="low",
+        description="Certificate lifetime exceeds 1 year.",
+        recommendation="Shorten lifetime to reduce exposure.",
+        columns=("long_validity",),
+        predicate=lambda c, full: c["long_validity"],
+    ),
+    Rule(
+        id="ESC2",
+        severity="high",
+        description="Template allows any purpose (Any Purpose or no EKU) without manager approval (ESC2 risk).",
+        recommendation="Define explicit EKUs or require manager approval.",
+        columns=("any_purpose_eku", "manager_approval"),
+        predicate=lambda c, full: c["any_purpose_eku"] & ~c["manager_approval"] & full,
+        default=False,
+    ),
+    Rule(
+        id="ESC3",
+        severity="high",
+        description="Template issues enrollment agent certificates without manager approval (ESC3 risk).",
+        recommendation="Require manager approval and restrict enrollment agents with CA agent restrictions.",
+        columns=("agent_eku", "manager_approval"),
+        predicate=lambda c, full: c["agent_eku"] & ~c["manager_approval"] & full,
+        default=False,
+    ),
+    Rule(
+        id="ESC4",
+        severity="high",
+        description="Template is owned by a broad domain group that can rewrite its settings (ESC4 risk).",
+        recommendation="Assign template ownership to a dedicated PKI administration group.",
+        columns=("permissive_owner",),
+        predicate=lambda c, full: c["permissive_owner"],
+        default=False,
+    ),
+)
+
+RULES_BY_ID: Dict[str, Rule] = {rule.id: rule for rule in RULES}
+DEFAULT_RULES: Tuple[Rule, ...] = tuple(rule for rule in RULES if rule.default)
+
+# Templates per bitset; small enough that setting and clearing bits stays cheap.
+COLUMN_BLOCK_SIZE = 256
+
+
+def select_rules(rule_ids: Optional[Iterable[str]] = None) -> Tuple[Rule, ...]:
+    """Return rules by id (case-insensitive) in registry order; :data:`DEFAULT_RULES` when ``rule_ids`` is ``None``."""
+
+    if rule_ids is None:
+        return DEFAULT_RULES
+    wanted = {rule_id.strip().upper() for rule_id in rule_ids if rule_id.strip()}
+    unknown = wanted.difference(RULES_BY_ID)
+    if unknown:
+        raise ValueError("Unknown detection rules: " + ", ".join(sorted(unknown)))
+    return tuple(rule for rule in RULES if rule.id in wanted)
+
+
+def build_columns(
+    templates: Sequence[CertificateTemplate],
+    names: Iterable[str],
+    permissive_groups: FrozenSet[str] = PERMISSIVE_GROUPS,
+) -> Dict[str, int]:
+    """Build each requested column, once, as a bitset over ``templates``."""
+
+    builders = [(name, COLUMNS[name]) for name in dict.fromkeys(names)]
+    columns: Dict[str, int] = {}
+    for name, builder in builders:
+        mask = 0
+        for index, template in enumerate(templates):
+            if builder(template, permissive_groups):
+                mask |= 1 << index
+        columns[name] = mask
+    return columns
+
+
+def evaluate(
+    templates: Sequence[CertificateTemplate],
+    rules: Sequence[Rule],
+    permissive_groups: FrozenSet[str] = PERMISSIVE_GROUPS,
+) -> List[Tuple[int, int]]:
+    """Return ``(template index, rule index)`` hits ordered by template, then rule."""
+
+    names = [name for rule in rules for name in rule.columns]
+    hits: List[Tuple[int, int]] = []
+    for offset in range(0, len(templates), COLUMN_BLOCK_SIZE):
+        block = templates[offset : offset + COLUMN_BLOCK_SIZE]
+        columns = build_columns(block, names, permissive_groups)
+        full = (1 << len(block)) - 1
+        for rule_index, rule in enumerate(rules):
+            hits.extend((offset + index, rule_index) for index in set_bits(rule.predicate(columns, full)))
+    hits.sort()
+    return hits
+
+
+def set_bits(mask: int) -> List[int]:
+    """Return the positions of the set bits in ``mask``, lowest first."""
+
+    positions = []
+    while mask:
+        lowest = mask & -mask
+        positions.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return positions
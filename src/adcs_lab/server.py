@@ -0,0 +1,400 @@
+"""Long-running query server with configuration hot reload.
+
+``adcs-lab serve`` keeps one loaded :class:`LabConfiguration`, with all of its
+indexes, in memory and answers read-only queries over a small HTTP/1.1 API on
+a TCP port or a Unix socket, so callers skip interpreter startup and parsing
+on every request. A polling watcher compares the configuration file's size
+and modification time; when either changes, the file is loaded into a fresh
+``LabConfiguration`` in a worker thread and swapped in with a single
+assignment. Requests in flight keep the configuration they started with, and
+a reload that fails validation leaves the previous configuration serving.
+Simulation, detection, hardening and dashboard queries also run in worker
+threads, so the event loop keeps accepting connections and answering
+``/health`` and ``/metrics`` while they scan; the state those threads share
+(the simulation cache, metrics and the EKU registry) is guarded by locks.
+
+Endpoints (``GET`` only; responses are JSON in the same shape as the CLI's
+``--format json`` output, with the configuration generation in the
+``X-ADCS-Lab-Generation`` header):
+
+``/health``
+    Liveness, configuration generation, entity counts and simulation cache statistics.
+``/simulate?requester=NAME&issuable_only=1``
+    ESC1 simulation for one principal, or every principal without ``requester``.
+    Results are memoised per effective group mask in a
+    :class:`~adcs_lab.attack_simulator.SimulationCache` that is cleared on reload.
+``/detect?rules=ESC1,ESC4&issuable_only=1``
+    Template findings.
+``/harden?only=NAME&controls=subject_name``
+    Dry-run hardening plan; the served configuration is never modified.
+``/dashboard``
+    Dashboard feed (see :mod:`adcs_lab.dashboard`), cached per generation.
+    This is the only endpoint that may be read cross-origin, and only by
+    ``dashboard_origin`` when one is configured.
+``/metrics``
+    Prometheus text-format metrics (see :mod:`adcs_lab.metrics`): load and
+    scan histograms, cache hits, findings by rule and severity, reload
+    failures and requests per endpoint. Served even before a configuration
+    has loaded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from adcs_lab.attack_simulator import DEFAULT_CACHE_SIZE, Esc1Simulation, SimulationCache
+from adcs_lab.config_loader import LabConfiguration
+from adcs_lab.detection import TemplateAnalyzer
+from adcs_lab.hardening import EkuHardener
+from adcs_lab.metrics import MetricsRegistry, count_findings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+_MAX_HEADER_LINES = 100
+# Longest request or header line accepted, in bytes.
+_MAX_LINE_LENGTH = 8192
+# Endpoints whose handlers scan the configuration and run in a worker thread.
+_THREADED_ENDPOINTS = frozenset({"/simulate", "/detect", "/harden", "/dashboard"})
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+
+Response = Tuple[int, Any]
+
+
+class RequestError(Exception):
+    """A client error reported with an HTTP status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class LabServer:
+    """Serve simulate/detect/harden queries against a hot-reloaded configuration."""
+
+    def __init__(
+        self,
+        config_path: str | Path,
+        *,
+        use_cache: bool = True,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        simulation_cache_size: int = DEFAULT_CACHE_SIZE,
+        dashboard_origin: Optional[str] = None,
+    ) -> None:
+        self.config_path = Path(config_path)
+        self.use_cache = use_cache
+        self.poll_interval = poll_interval
+        self.simulation_cache = SimulationCache(simulation_cache_size)
+        self.dashboard_origin = dashboard_origin
+        self.configuration: Optional[LabConfiguration] = None
+        self.generation = 0
+        self.loaded_at = 0.0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._dashboard: Optional[Tuple[LabConfiguration, Dict[str, Any]]] = None
+        self.metrics = MetricsRegistry()
+        self._requests = self.metrics.counter(
+            "adcs_lab_http_requests_total", "HTTP requests answered by endpoint and status.", ("endpoint", "status")
+        )
+        self._reload_failures = self.metrics.counter(
+            "adcs_lab_config_reload_failures_total", "Configuration reloads rejected by validation."
+        )
+        self._generation = self.metrics.gauge("adcs_lab_config_generation", "Generation of the served configuration.")
+
+    def load(self) -> None:
+        """Load the configuration synchronously; errors propagate to the caller."""
+
+        signature = self._stat()
+        configuration, seconds = self._load_configuration()
+        self._install(configuration, signature, seconds)
+
+    async def reload_if_changed(self) -> bool:
+        """Reload the configuration when the file changed; return whether a new one was installed."""
+
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            configuration, seconds = await asyncio.to_thread(self._load_configuration)
+        except (OSError, ValueError) as exc:
+            self._signature = signature
+            self._reload_failures.inc()
+            logger.error("Keeping generation %d; reload of %s failed: %s", self.generation, self.config_path, exc)
+            return False
+        self._install(configuration, signature, seconds)
+        return True
+
+    async def watch(self) -> None:
+        """Poll the configuration file for changes until cancelled.
+
+        Unexpected errors are logged and polling continues, so one bad reload
+        cannot stop the server from picking up later fixes.
+        """
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.reload_if_changed()
+            except Exception:
+                logger.exception("Keeping generation %d; checking %s failed", self.generation, self.config_path)
+
+    async def start(
+        self, *, host: str = "127.0.0.1", port: int = 8080, unix_socket: Optional[Path] = None
+    ) -> asyncio.Server:
+        """Start listening and return the asyncio server; the file watcher is not started."""
+
+        if unix_socket is not None:
+            return await asyncio.start_unix_server(
+                self._handle_connection, path=str(unix_socket), limit=_MAX_LINE_LENGTH
+            )
+        return await asyncio.start_server(self._handle_connection, host=host, port=port, limit=_MAX_LINE_LENGTH)
+
+    async def serve(self, *, host: str = "127.0.0.1", port: int = 8080, unix_socket: Optional[Path] = None) -> None:
+        """Listen and watch the configuration file until cancelled."""
+
+        server = await self.start(host=host, port=port, unix_socket=unix_socket)
+        where = unix_socket or ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        logger.info("Serving %s on %s", self.config_path, where)
+        watcher = asyncio.create_task(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+    async def handle(self, method: str, target: str) -> Response:
+        """Answer one request like :meth:`dispatch`, running configuration scans in a worker thread."""
+
+        if (urlsplit(target).path.rstrip("/") or "/") in _THREADED_ENDPOINTS:
+            return await asyncio.to_thread(self.dispatch, method, target)
+        return self.dispatch(method, target)
+
+    def dispatch(self, method: str, target: str) -> Response:
+        """Answer one request, returning an HTTP status and a payload.
+
+        Payloads are JSON-serialisable, except for ``/metrics`` which returns
+        the Prometheus exposition text.
+        """
+
+        path = urlsplit(target).path.rstrip("/") or "/"
+        endpoint = path if path in _ROUTES or path == "/metrics" else "other"
+        status, payload = self._dispatch(method, target)
+        self._requests.inc(labels=(endpoint, str(int(status))))
+        return status, payload
+
+    def _dispatch(self, method: str, target: str) -> Response:
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Method {method} not allowed"}
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        path = url.path.rstrip("/") or "/"
+        if path == "/metrics":
+            return HTTPStatus.OK, self.metrics.render()
+        handler = _ROUTES.get(path)
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {url.path}"}
+        configuration = self.configuration
+        if configuration is None:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Configuration not loaded"}
+        try:
+            return HTTPStatus.OK, handler(self, configuration, query)
+        except RequestError as exc:
+            return exc.status, {"error": str(exc)}
+
+    def _health(self, configuration: LabConfiguration, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "config": str(self.config_path),
+            "generation": self.generation,
+            "loaded_at": self.loaded_at,
+            "templates": len(configuration.certificate_templates),
+            "certificate_authorities": len(configuration.certificate_authorities),
+            "principals": len(configuration.security_principals),
+            "simulation_cache": self.simulation_cache.stats(),
+        }
+
+    def _simulate(self, configuration: LabConfiguration, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        simulation = Esc1Simulation(
+            configuration, issuable_only=_flag(query, "issuable_only"), cache=self.simulation_cache
+        )
+        requester_name = _single(query, "requester")
+        if requester_name is None:
+            results = simulation.run_all()
+            return {
+                "summary": {
+                    "principals": len(results),
+                    "escalation_possible": sum(1 for result in results.values() if result.success),
+                },
+                "results": [{"requester": name, **result.__dict__} for name, result in results.items()],
+            }
+        requester = configuration.principal_by_name(requester_name)
+        if requester is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Requester {requester_name} not found in configuration")
+        result = simulation.run(requester, show_table=False)
+        return {"requester": requester.name, **result.__dict__}
+
+    def _detect(self, configuration: LabConfiguration, query: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        rules = _list(query, "rules")
+        try:
+            analyzer = TemplateAnalyzer(configuration, rules=rules, issuable_only=_flag(query, "issuable_only"))
+        except ValueError as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        started = time.perf_counter()
+        findings = list(analyzer.iter_findings())
+        self.metrics.observe_scan(
+            count_findings(findings),
+            templates=len(analyzer.templates_in_scope()),
+            seconds=time.perf_counter() - started,
+        )
+        return [finding.__dict__ for finding in findings]
+
+    def _harden(self, configuration: LabConfiguration, query: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        try:
+            hardener = EkuHardener(configuration.certificate_templates, controls=_list(query, "controls"))
+        except ValueError as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        plan = hardener.plan().select(query.get("only"))
+        return [patch.to_dict() for patch in plan.patches]
+
+    def _dashboard_feed(self, configuration: LabConfiguration, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        from adcs_lab.dashboard import build_dashboard
+
+        cached = self._dashboard
+        if cached is None or cached[0] is not configuration:
+            cached = self._dashboard = (configuration, build_dashboard(configuration))
+        return cached[1]
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read one HTTP request, answer it, and close the connection."""
+
+        sent = False
+        try:
+            status: int
+            cors = ""
+            try:
+                parts = await _read_request(reader)
+            except RequestError as exc:
+                status, payload = exc.status, {"error": str(exc)}
+            else:
+                status, payload = await self.handle(parts[0], parts[1])
+                if self.dashboard_origin and urlsplit(parts[1]).path.rstrip("/") == "/dashboard":
+                    cors = f"Access-Control-Allow-Origin: {self.dashboard_origin}\r\nVary: Origin\r\n"
+            response = self._response(status, payload, cors)
+            sent = True
+            writer.write(response)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as exc:
+            logger.debug("Client connection dropped: %s", exc)
+        except Exception:
+            logger.exception("Unhandled error while answering a request")
+            if not sent:
+                with contextlib.suppress(ConnectionError):
+                    writer.write(self._response(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}))
+                    await writer.drain()
+        finally:
+            writer.close()
+
+    def _response(self, status: int, payload: Any, cors: str = "") -> bytes:
+        """Encode one HTTP response; string payloads are sent as Prometheus text, others as JSON."""
+
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, content_type = json.dumps(payload, indent=2).encode("utf-8") + b"\n", "application/json"
+        reason = HTTPStatus(status).phrase
+        head = (
+            f"HTTP/1.1 {int(status)} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"{cors}"
+            f"Content-Length: {len(body)}\r\n"
+            f"X-ADCS-Lab-Generation: {self.generation}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        return head.encode("latin-1") + body
+
+    def _load_configuration(self) -> Tuple[LabConfiguration, float]:
+        """Load a fresh configuration, returning it with the seconds the load took."""
+
+        started = time.perf_counter()
+        configuration = LabConfiguration(self.config_path)
+        configuration.load(use_cache=self.use_cache)
+        return configuration, time.perf_counter() - started
+
+    def _install(self, configuration: LabConfiguration, signature: Optional[Tuple[int, int]], seconds: float) -> None:
+        """Record the load and swap in a fully loaded configuration."""
+
+        self.metrics.observe_load(
+            seconds,
+            configuration.load_source,
+            from_cache=configuration.loaded_from_cache if self.use_cache else None,
+        )
+        self.configuration = configuration
+        self.simulation_cache.clear()
+        self._signature = signature
+        self.generation += 1
+        self._generation.set(self.generation)
+        self.loaded_at = time.time()
+        logger.info("Serving configuration generation %d from %s", self.generation, self.config_path)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Return the file's (mtime, size) signature, or ``None`` while it is missing."""
+
+        try:
+            stat = os.stat(self.config_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+_ROUTES = {
+    "/health": LabServer._health,
+    "/simulate": LabServer._simulate,
+    "/detect": LabServer._detect,
+    "/harden": LabServer._harden,
+    "/dashboard": LabServer._dashboard_feed,
+}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> List[str]:
+    """Read the request line and skip the headers, rejecting oversized or malformed requests."""
+
+    try:
+        parts = (await reader.readline()).decode("latin-1").split()
+    except ValueError as exc:
+        raise RequestError(HTTPStatus.REQUEST_URI_TOO_LONG, "Request line too long") from exc
+    try:
+        for _ in range(_MAX_HEADER_LINES):
+            if (await reader.readline()) in (b"\r\n", b"\n", b""):
+                break
+    except ValueError as exc:
+        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request header too long") from exc
+    if len(parts) != 3:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    return parts
+
+
+def _single(query: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _flag(query: Dict[str, List[str]], name: str) -> bool:
+    value = _single(query, name)
+    return value is not None and value.strip().lower() in _TRUE_VALUES
+
+
+def _list(query: Dict[str, List[str]], name: str) -> Optional[List[str]]:
+    """Return comma-separated and repeated values of a parameter, or ``None`` when absent."""
+
+    values = query.get(name)
+    if values is None:
+        return None
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
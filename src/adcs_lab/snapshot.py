@@ -0,0 +1,201 @@
+"""Compiled snapshot cache for parsed lab configurations.
+
+Parsing and validating the same YAML on every CLI invocation is wasted work
+when configurations rarely change. After a successful load the built entities
+are written to a compact binary snapshot keyed on the source path. Subsequent
+loads reuse the snapshot when the source file's size and modification time
+match, falling back to a SHA-256 content comparison when only the timestamp
+moved. Snapshots carry a schema version and the entity field names and types,
+so any change to the data classes invalidates older files automatically.
+
+Snapshots are encoded with :mod:`marshal`, which only round-trips plain
+built-in values and never executes code on load. Strings interned when the
+entities were built are written as interned references and stay shared after
+loading.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import marshal
+import os
+import struct
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type
+
+from adcs_lab._fsutil import atomic_write
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SCHEMA_VERSION = 2
+CACHE_DIR_ENV = "ADCS_LAB_CACHE_DIR"
+
+_MAGIC = b"ADCSSNAP"
+_HEADER_LENGTH = struct.Struct(">I")
+_HASH_CHUNK = 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Return the snapshot directory, honouring ``ADCS_LAB_CACHE_DIR`` and ``XDG_CACHE_HOME``."""
+
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "adcs-lab"
+
+
+def snapshot_path(config_path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """Return the snapshot file used for a configuration path."""
+
+    key = hashlib.sha256(str(config_path.resolve()).encode("utf-8")).hexdigest()[:32]
+    return (cache_dir or default_cache_dir()) / f"{key}.snap"
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(config_path: Path) -> Dict[str, Any]:
+    """Return the size, modification time and SHA-256 digest identifying a source file's contents.
+
+    Take the fingerprint before parsing so a snapshot never pairs entities
+    with a fingerprint of a file that changed while it was being read.
+    """
+
+    stat = config_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_digest(config_path)}
+
+
+def schema_signature(entity_types: Dict[str, Type[Any]]) -> Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...]:
+    """Describe the field names and annotated types of the snapshotted entity classes."""
+
+    return tuple(
+        (section, tuple((field.name, str(field.type)) for field in fields(cls)))
+        for section, cls in sorted(entity_types.items())
+    )
+
+
+def load_snapshot(
+    config_path: Path, entity_types: Dict[str, Type[Any]], cache_dir: Optional[Path] = None
+) -> Optional[Dict[str, List[Any]]]:
+    """Return entities from a valid snapshot, or ``None`` on a cache miss.
+
+    Parameters
+    ----------
+    config_path: Path
+        Source configuration file the snapshot was compiled from.
+    entity_types: Dict[str, Type[Any]]
+        Mapping of section name to the data class used to rebuild entities.
+    cache_dir: Optional[Path]
+        Snapshot directory; defaults to :func:`default_cache_dir`.
+    """
+
+    path = snapshot_path(config_path, cache_dir)
+    try:
+        with path.open("rb") as handle:
+            header = _read_header(handle)
+            if header is None or header.get("schema") != schema_signature(entity_types):
+                return None
+            stat = config_path.stat()
+            if header.get("size") != stat.st_size:
+                return None
+            if header.get("mtime_ns") != stat.st_mtime_ns:
+                digest = file_digest(config_path)
+                if header.get("sha256") != digest:
+                    return None
+                header.update(mtime_ns=stat.st_mtime_ns)
+                stale_header = True
+            else:
+                stale_header = False
+            payload = marshal.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError, struct.error) as exc:
+        logger.debug("Ignoring unreadable snapshot %s: %s", path, exc)
+        return None
+
+    try:
+        sections = {section: [cls(*values) for values in payload[section]] for section, cls in entity_types.items()}
+    except (KeyError, TypeError) as exc:
+        logger.debug("Ignoring incompatible snapshot %s: %s", path, exc)
+        return None
+
+    if stale_header:
+        try:
+            _write(path, header, payload)
+        except OSError as exc:
+            logger.debug("Unable to refresh snapshot header %s: %s", path, exc)
+    return sections
+
+
+def write_snapshot(
+    config_path: Path,
+    entity_types: Dict[str, Type[Any]],
+    sections: Mapping[str, Sequence[Any]],
+    cache_dir: Optional[Path] = None,
+    *,
+    source: Mapping[str, Any],
+) -> Optional[Path]:
+    """Compile loaded entities into a snapshot; failures are logged, not raised.
+
+    ``source`` is the :func:`source_fingerprint` taken before the entities were
+    parsed. Nothing is written when the file's size or modification time no
+    longer match it, since the entities may then describe neither version.
+    """
+
+    path = snapshot_path(config_path, cache_dir)
+    try:
+        stat = config_path.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (source["size"], source["mtime_ns"]):
+            logger.info("Not writing snapshot %s; %s changed while it was loaded", path, config_path)
+            return None
+        header = {
+            "version": SNAPSHOT_SCHEMA_VERSION,
+            "schema": schema_signature(entity_types),
+            "source": str(config_path.resolve()),
+            "size": source["size"],
+            "mtime_ns": source["mtime_ns"],
+            "sha256": source["sha256"],
+        }
+        payload = {
+            section: [tuple(getattr(entity, field.name) for field in fields(cls)) for entity in sections[section]]
+            for section, cls in entity_types.items()
+        }
+        _write(path, header, payload)
+    except (OSError, ValueError) as exc:
+        logger.warning("Unable to write configuration snapshot %s: %s", path, exc)
+        return None
+    return path
+
+
+def _read_header(handle: Any) -> Optional[Dict[str, Any]]:
+    """Read and check the snapshot preamble, returning the header mapping."""
+
+    if handle.read(len(_MAGIC)) != _MAGIC:
+        return None
+    (length,) = _HEADER_LENGTH.unpack(handle.read(_HEADER_LENGTH.size))
+    header = marshal.loads(handle.read(length))
+    if not isinstance(header, dict) or header.get("version") != SNAPSHOT_SCHEMA_VERSION:
+        return None
+    return header
+
+
+def _write(path: Path, header: Dict[str, Any], payload: Dict[str, Any]) -> None:
+    """Atomically replace a snapshot file."""
+
+    encoded_header = marshal.dumps(header)
+    with atomic_write(path, "wb") as handle:
+        handle.write(_MAGIC)
+        handle.write(_HEADER_LENGTH.pack(len(encoded_header)))
+        handle.write(encoded_header)
+        marshal.dump(payload, handle)
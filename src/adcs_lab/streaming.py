@@ -0,0 +1,193 @@
+"""Event-driven YAML reader for large lab configuration exports.
+
+Forest-scale exports can hold hundreds of thousands of principals, so building
+the complete PyYAML document tree before validation dominates both memory and
+load time. The helpers here walk the parser event stream instead and hand back
+one entity mapping at a time together with the line it was declared on. Only
+the entity currently being read is held in memory.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, Optional
+
+import yaml
+
+from adcs_lab.config_loader import REQUIRED_SECTIONS, SECTIONS, RawEntity
+
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+# Stands in for a plain ``<<`` key, which has no constructor of its own.
+_MERGE_KEY = object()
+
+
+def safe_loader() -> Any:
+    """Return the libyaml-backed safe loader when available, else the pure-Python one."""
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def iter_yaml_entities(path: Path, sections: Optional[Collection[str]] = None) -> Iterator[RawEntity]:
+    """Yield entity mappings from a YAML configuration file as they are parsed.
+
+    Parameters
+    ----------
+    path: Path
+        YAML configuration file to read.
+    sections: Optional[Collection[str]]
+        Restrict output to these root sections. Other sections are skipped at
+        the event level without constructing Python objects.
+    """
+
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            loader = safe_loader()(handle)
+            try:
+                yield from _iter_document(loader, sections)
+            finally:
+                loader.dispose()
+    except yaml.YAMLError as exc:
+        raise ValueError(f"YAML parsing error in {path}: {exc}") from exc
+
+
+def _iter_document(loader: Any, sections: Optional[Collection[str]]) -> Iterator[RawEntity]:
+    """Walk the root mapping of a single YAML document."""
+
+    loader.get_event()  # StreamStartEvent
+    if loader.check_event(yaml.StreamEndEvent):
+        raise ValueError("Configuration file is empty; expected YAML content.")
+    loader.get_event()  # DocumentStartEvent
+    if not loader.check_event(yaml.MappingStartEvent):
+        value = _construct(loader, {})
+        if value is None:
+            raise ValueError("Configuration file is empty; expected YAML content.")
+        raise ValueError("Configuration root must be a mapping/dictionary.")
+    root = loader.get_event()
+
+    anchors: Dict[str, Any] = {}
+    seen: set[str] = set()
+    while not loader.check_event(yaml.MappingEndEvent):
+        line = _line(loader.peek_event())
+        key = _construct_key(loader, anchors, root)
+        if key not in SECTIONS:
+            _construct(loader, anchors)  # keeps anchors declared in auxiliary keys resolvable
+            continue
+        if key in seen:
+            raise ValueError(f"Duplicate configuration section '{key}' (line {line})")
+        seen.add(key)
+        if sections is not None and key not in sections:
+            _skip_node(loader, anchors)
+            continue
+        yield from _iter_section(loader, str(key), anchors)
+    loader.get_event()
+
+    missing = REQUIRED_SECTIONS.difference(seen)
+    if missing:
+        raise ValueError("Configuration is missing required sections: " + ", ".join(sorted(missing)))
+
+
+def _iter_section(loader: Any, key: str, anchors: Dict[str, Any]) -> Iterator[RawEntity]:
+    """Yield each mapping of a root-level sequence without materialising the list."""
+
+    if not loader.check_event(yaml.SequenceStartEvent):
+        value = _construct(loader, anchors)
+        if value is None:
+            return
+        raise ValueError(f"Expected list for '{key}' but received {type(value).__name__}")
+    loader.get_event()
+
+    index = 0
+    while not loader.check_event(yaml.SequenceEndEvent):
+        line = _line(loader.peek_event())
+        element = _construct(loader, anchors)
+        if not isinstance(element, dict):
+            raise ValueError(f"Each item in '{key}' must be a mapping; received {type(element).__name__} (line {line})")
+        yield RawEntity(section=key, index=index, line=line, data=element)
+        index += 1
+    loader.get_event()
+
+
+def _construct(loader: Any, anchors: Dict[str, Any]) -> Any:
+    """Build the Python value for the node starting at the next event."""
+
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise ValueError(f"Unknown YAML alias '*{event.anchor}' (line {_line(event)})")
+        return anchors[event.anchor]
+
+    value: Any
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        if tag == _MERGE_TAG:
+            value = _MERGE_KEY
+        else:
+            value = loader.construct_object(yaml.ScalarNode(tag, event.value, style=event.style))
+    elif isinstance(event, yaml.SequenceStartEvent):
+        value = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            value.append(_construct(loader, anchors))
+        loader.get_event()
+    elif isinstance(event, yaml.MappingStartEvent):
+        value = {}
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _construct_key(loader, anchors, event)
+            item = _construct(loader, anchors)
+            if key is _MERGE_KEY:
+                # Explicit keys win over merged ones, and earlier merged mappings over later ones.
+                for merged in item if isinstance(item, list) else (item,):
+                    if not isinstance(merged, dict):
+                        raise ValueError(f"Merge key values must be mappings (line {_line(event)})")
+                    for merged_key, merged_value in merged.items():
+                        value.setdefault(merged_key, merged_value)
+                continue
+            value[key] = item
+        loader.get_event()
+    else:
+        raise ValueError(f"Unexpected YAML event {type(event).__name__} (line {_line(event)})")
+
+    if getattr(event, "anchor", None):
+        anchors[event.anchor] = value
+    return value
+
+
+def _construct_key(loader: Any, anchors: Dict[str, Any], mapping: Any) -> Any:
+    """Build a mapping key, rejecting unhashable keys as the document loader does."""
+
+    event = loader.peek_event()
+    key = _construct(loader, anchors)
+    try:
+        hash(key)
+    except TypeError:
+        raise yaml.constructor.ConstructorError(
+            "while constructing a mapping", mapping.start_mark, "found unhashable key", event.start_mark
+        ) from None
+    return key
+
+
+def _skip_node(loader: Any, anchors: Dict[str, Any]) -> None:
+    """Consume the events for one node, constructing only anchored nodes so later aliases resolve."""
+
+    depth = 0
+    while True:
+        event = loader.peek_event()
+        if getattr(event, "anchor", None) and not isinstance(event, yaml.AliasEvent):
+            _construct(loader, anchors)
+        else:
+            loader.get_event()
+            if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+                depth += 1
+                continue
+            if isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+                depth -= 1
+        if depth == 0:
+            return
+
+
+def _line(event: Any) -> int:
+    """Return the 1-based source line an event starts on."""
+
+    mark = getattr(event, "start_mark", None)
+    return mark.line + 1 if mark is not None else 0
@@ -0,0 +1,164 @@
+"""Deterministic synthetic lab configurations for benchmarking.
+
+:func:`generate_forest` builds a configuration document of arbitrary size in
+the same shape as ``data/sample_templates.yaml``. The same parameters and seed
+always produce the same document, so benchmark runs on different machines or
+commits measure identical inputs.
+
+The generated forest has one NTAuth-published root CA with every other CA as
+a subordinate that publishes a round-robin share of the templates. Groups are
+arranged in ``nesting_depth`` levels below a set of top-level groups, each
+nested group being a member of one group on the level above it. Principals
+belong to one or two groups and templates grant enrollment to up to three.
+``vulnerable_ratio`` of the templates are ESC1-prone (subject editable, no
+manager approval, client authentication EKU).
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+_SAFE_EKUS = (
+    ("Client Authentication", "Server Authentication"),
+    ("Server Authentication",),
+    ("Code Signing",),
+    ("Secure Email", "Client Authentication"),
+)
+_VULNERABLE_EKUS = (
+    ("Client Authentication",),
+    ("Client Authentication", "Smart Card Logon"),
+)
+_BUILTIN_GROUPS = ("Domain Users", "Domain Computers")
+
+
+@dataclass(frozen=True)
+class ForestSpec:
+    """Size and shape of a synthetic configuration."""
+
+    cas: int = 3
+    templates: int = 200
+    principals: int = 2000
+    groups: int = 100
+    nesting_depth: int = 3
+    vulnerable_ratio: float = 0.1
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.cas < 1:
+            raise ValueError("A synthetic forest needs at least one certificate authority")
+        if min(self.templates, self.principals, self.groups, self.nesting_depth) < 0:
+            raise ValueError("Synthetic forest sizes must not be negative")
+        if not 0.0 <= self.vulnerable_ratio <= 1.0:
+            raise ValueError("vulnerable_ratio must be between 0 and 1")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def generate_forest(spec: ForestSpec = ForestSpec()) -> Dict[str, Any]:
+    """Return a configuration document for ``spec``."""
+
+    rng = random.Random(spec.seed)
+    groups = _generate_groups(spec, rng)
+    group_names = [group["name"] for group in groups] + list(_BUILTIN_GROUPS)
+    vulnerable = set(rng.sample(range(spec.templates), round(spec.templates * spec.vulnerable_ratio)))
+
+    templates: List[Dict[str, Any]] = []
+    for index in range(spec.templates):
+        is_vulnerable = index in vulnerable
+        templates.append(
+            {
+                "name": f"Template-{index:05d}",
+                "eku": list(rng.choice(_VULNERABLE_EKUS if is_vulnerable else _SAFE_EKUS)),
+                "enrollment_rights": rng.sample(group_names, min(len(group_names), rng.randint(1, 3))),
+                "manager_approval_required": not is_vulnerable and rng.random() < 0.5,
+                "subject_name_editable": is_vulnerable or rng.random() < 0.2,
+                "superseded_templates": [f"Template-{index - 1:05d}"] if index and rng.random() < 0.1 else [],
+                "validity_days": rng.choice((90, 180, 365, 730, 1825)),
+                "owner": "PKI Admins",
+            }
+        )
+
+    return {
+        "certificate_authorities": _generate_cas(spec, [template["name"] for template in templates]),
+        "certificate_templates": templates,
+        "security_principals": [
+            {
+                "name": f"user-{index:06d}",
+                "groups": rng.sample(group_names, min(len(group_names), rng.randint(1, 2))),
+                "can_edit_subject": rng.random() < 0.5,
+            }
+            for index in range(spec.principals)
+        ],
+        "security_groups": groups,
+    }
+
+
+def write_forest(path: str | Path, document: Dict[str, Any]) -> Path:
+    """Write a generated document as JSON (``.json``), NDJSON (``.ndjson``/``.jsonl``) or YAML."""
+
+    import json
+
+    from adcs_lab.json_input import NDJSON_SUFFIXES
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    suffix = target.suffix.lower()
+    with target.open("w", encoding="utf-8") as handle:
+        if suffix == ".json":
+            json.dump(document, handle)
+        elif suffix in NDJSON_SUFFIXES:
+            for section, entities in document.items():
+                for entity in entities:
+                    handle.write(json.dumps({"kind": section, **entity}, separators=(",", ":")) + "\n")
+        else:
+            import yaml
+
+            dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+            yaml.dump(document, handle, Dumper=dumper, sort_keys=False)
+    return target
+
+
+def _generate_cas(spec: ForestSpec, template_names: List[str]) -> List[Dict[str, Any]]:
+    """One NTAuth root CA; subordinates split the templates between them."""
+
+    root = {
+        "name": "SYN-ROOT-CA",
+        "role": "root",
+        "location": "SYN-DATA-CENTER",
+        "nt_auth_published": True,
+        "eku": ["Server Authentication", "Client Authentication"],
+    }
+    subordinates = spec.cas - 1
+    cas = [root]
+    for index in range(subordinates):
+        cas.append(
+            {
+                "name": f"SYN-SUB-CA-{index:03d}",
+                "role": "subordinate",
+                "parent": root["name"],
+                "location": "SYN-DATA-CENTER",
+                "nt_auth_published": False,
+                "eku": ["Server Authentication", "Client Authentication"],
+                "published_templates": template_names[index::subordinates],
+            }
+        )
+    return cas
+
+
+def _generate_groups(spec: ForestSpec, rng: random.Random) -> List[Dict[str, Any]]:
+    """Spread groups over ``nesting_depth + 1`` levels, each nested in one group of the level above."""
+
+    levels = spec.nesting_depth + 1
+    by_level: List[List[str]] = [[] for _ in range(levels)]
+    groups = []
+    for index in range(spec.groups):
+        level = index % levels
+        name = f"Group-{index:05d}"
+        parents = by_level[level - 1] if level else []
+        groups.append({"name": name, "member_of": [rng.choice(parents)] if parents else []})
+        by_level[level].append(name)
+    return groups
@@ -0,0 +1,375 @@
+"""Per-entity validation for lab configurations.
+
+Every configuration section has one :class:`EntityValidator`, built at import
+time from the section's field specification. The validator flattens the
+fields into a table of ``(name, converter, required, default)`` rows once, so
+a valid entity is converted in a single pass over that table instead of
+re-checking the field specification per entity. Only when that fast path
+fails does the validator walk the fields one by one to report every missing
+key and malformed field of the entity.
+
+:func:`validate_entities` runs the validators over chunks of entity mappings
+and collects every problem it finds, each with the entity's position and the
+offending field, instead of stopping at the first one. With ``workers``
+greater than one, chunks are converted across a process pool, with at most
+``2 * workers`` chunks in flight; entities are then constructed in the calling
+process. Pickling the chunks costs about as much as converting them, so the
+pool only pays off where conversion dominates, such as very large exports on
+hosts with many cores.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from adcs_lab.config_loader import (
+    SECTIONS,
+    CertificateAuthority,
+    CertificateTemplate,
+    RawEntity,
+    SecurityGroup,
+    SecurityPrincipal,
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+# Issues listed in a ConfigurationError message; all of them are kept on ``issues``.
+MAX_REPORTED_ISSUES = 20
+
+REQUIRED = object()
+
+
+@dataclass(frozen=True)
+class Field:
+    """One entity field: its converter, its default (``REQUIRED`` if none) and what a valid value is."""
+
+    name: str
+    convert: Callable[[Any], Any]
+    default: Any = REQUIRED
+    expected: str = ""
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    """One problem with one entity of a configuration."""
+
+    section: str
+    index: int
+    location: str
+    field: Optional[str]
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.message} ({self.location})"
+
+
+class ConfigurationError(ValueError):
+    """Raised with every validation issue found while loading one configuration."""
+
+    def __init__(self, path: str | Path, issues: Sequence[ValidationIssue]) -> None:
+        self.path = str(path)
+        self.issues = list(issues)
+        super().__init__(self._describe())
+
+    def _describe(self) -> str:
+        if len(self.issues) == 1:
+            issue = self.issues[0]
+            return f"{issue.message} ({self.path}, {issue.location})"
+        lines = [f"{len(self.issues)} validation errors in {self.path}:"]
+        lines.extend(f"  {issue}" for issue in self.issues[:MAX_REPORTED_ISSUES])
+        hidden = len(self.issues) - MAX_REPORTED_ISSUES
+        if hidden > 0:
+            lines.append(f"  ... and {hidden} more")
+        return "\n".join(lines)
+
+
+@dataclass
+class Chunk:
+    """Consecutive entity mappings of one section; ``lines`` is ``None`` for sources without lines."""
+
+    section: str
+    start: int
+    items: List[Dict[str, Any]]
+    lines: Optional[List[int]] = None
+
+    def location(self, offset: int) -> str:
+        line = self.lines[offset] if self.lines is not None else 0
+        return f"line {line}" if line else f"{self.section}[{self.start + offset}]"
+
+
+# The valid entities (or their field values) built from a chunk, and the issues found in it.
+ChunkResult = Tuple[List[Any], List[ValidationIssue]]
+
+
+def _strings(value: Any) -> Tuple[str, ...]:
+    """Return a list of strings as a tuple of interned strings."""
+
+    if not isinstance(value, list):
+        raise TypeError("expected a list")
+    return tuple(sys.intern(str(item)) for item in value)
+
+
+def _interned(value: Any) -> str:
+    return sys.intern(str(value))
+
+
+def _optional_text(value: Any) -> Optional[str]:
+    return str(value) if value else None
+
+
+def _optional_strings(value: Any) -> Optional[Tuple[str, ...]]:
+    return None if value is None else _strings(value)
+
+
+def _field_values(*values: Any) -> Tuple[Any, ...]:
+    return values
+
+
+_STRINGS = "must be a list of strings"
+
+
+class EntityValidator:
+    """Converts mappings of one entity kind, reporting every invalid field when conversion fails."""
+
+    __slots__ = ("label", "entity_type", "fields", "required", "_build", "_values")
+
+    def __init__(self, label: str, entity_type: type, fields: Sequence[Field]) -> None:
+        self.label = label
+        self.entity_type = entity_type
+        self.fields = tuple(fields)
+        self.required = tuple(field.name for field in self.fields if field.default is REQUIRED)
+        self._build = self._converter(self.entity_type)
+        self._values = self._converter(_field_values)
+
+    def _converter(self, constructor: Callable[..., Any]) -> Callable[[Dict[str, Any]], Any]:
+        """Return a function converting every field of a mapping and passing the values to ``constructor``.
+
+        Building with :func:`_field_values` returns the converted values as a
+        tuple, which pickles far more cheaply than slotted entities.
+        """
+
+        table = tuple((field.name, field.convert, field.default is REQUIRED, field.default) for field in self.fields)
+
+        def convert(data: Dict[str, Any]) -> Any:
+            return constructor(
+                *[
+                    convert_field(data[name] if required else data.get(name, default))
+                    for name, convert_field, required, default in table
+                ]
+            )
+
+        return convert
+
+    def build(self, data: Dict[str, Any]) -> Any:
+        """Return the entity built from ``data``, or ``None`` when the mapping is invalid."""
+
+        try:
+            return self._build(data)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def values(self, data: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        """Return the converted field values in declaration order, or ``None`` when the mapping is invalid."""
+
+        try:
+            return self._values(data)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def problems(self, data: Dict[str, Any]) -> List[Tuple[Optional[str], str]]:
+        """Return every problem with ``data`` as ``(field, message)`` pairs."""
+
+        problems: List[Tuple[Optional[str], str]] = [
+            (name, f"Missing key in {self.label}: {name}") for name in self.required if name not in data
+        ]
+        for field in self.fields:
+            if field.name not in data and field.default is REQUIRED:
+                continue
+            try:
+                field.convert(data.get(field.name, field.default))
+            except (TypeError, ValueError) as exc:
+                problems.append((field.name, f"Field '{field.name}' {field.expected or exc}"))
+        return problems
+
+
+VALIDATORS: Dict[str, EntityValidator] = {
+    "certificate_templates": EntityValidator(
+        "certificate template",
+        CertificateTemplate,
+        [
+            Field("name", str),
+            Field("eku", _strings, expected=_STRINGS),
+            Field("enrollment_rights", _strings, expected=_STRINGS),
+            Field("manager_approval_required", bool),
+            Field("subject_name_editable", bool),
+            Field("superseded_templates", _strings, expected=_STRINGS),
+            Field("validity_days", int, expected="must be an integer"),
+            Field("owner", _interned),
+        ],
+    ),
+    "certificate_authorities": EntityValidator(
+        "certificate authority",
+        CertificateAuthority,
+        [
+            Field("name", str),
+            Field("role", _interned),
+            Field("location", _interned),
+            Field("nt_auth_published", bool),
+            Field("eku", _strings, expected=_STRINGS),
+            Field("parent", _optional_text, None),
+            Field("published_templates", _optional_strings, None, expected=_STRINGS),
+        ],
+    ),
+    "security_principals": EntityValidator(
+        "security principal",
+        SecurityPrincipal,
+        [
+            Field("name", str),
+            Field("groups", _strings, expected=_STRINGS),
+            Field("can_edit_subject", bool),
+        ],
+    ),
+    "security_groups": EntityValidator(
+        "security group",
+        SecurityGroup,
+        [
+            Field("name", str),
+            Field("member_of", _strings, [], expected=_STRINGS),
+        ],
+    ),
+}
+
+
+def validate_chunk(chunk: Chunk, *, values: bool = False) -> ChunkResult:
+    """Build one chunk, collecting an issue for every problem of every invalid entity.
+
+    With ``values`` set, valid entities are returned as tuples of converted
+    field values rather than entities.
+    """
+
+    validator = VALIDATORS[chunk.section]
+    convert = validator.values if values else validator.build
+    built = []
+    issues: List[ValidationIssue] = []
+    for offset, data in enumerate(chunk.items):
+        entity = convert(data)
+        if entity is not None:
+            built.append(entity)
+            continue
+        issues.extend(_issues(validator, chunk.section, chunk.start + offset, chunk.location(offset), data))
+    return built, issues
+
+
+def validate_entity(raw: RawEntity) -> Tuple[Any, List[ValidationIssue]]:
+    """Build one entity, returning ``(None, issues)`` when it is invalid."""
+
+    validator = VALIDATORS[raw.section]
+    entity = validator.build(raw.data)
+    if entity is None:
+        return None, _issues(validator, raw.section, raw.index, raw.location, raw.data)
+    return entity, []
+
+
+def validate_stream(
+    raw_entities: Iterable[RawEntity], *, workers: Optional[int] = None
+) -> Tuple[Dict[str, List[Any]], List[ValidationIssue]]:
+    """Like :func:`validate_entities` for entities read one at a time; chunked only when ``workers`` is set."""
+
+    if workers and workers > 1:
+        return validate_entities(stream_chunks(raw_entities), workers=workers)
+    sections: Dict[str, List[Any]] = {section: [] for section in SECTIONS}
+    issues: List[ValidationIssue] = []
+    for raw in raw_entities:
+        entity, found = validate_entity(raw)
+        if found:
+            issues.extend(found)
+        else:
+            sections[raw.section].append(entity)
+    return sections, issues
+
+
+def _issues(
+    validator: EntityValidator, section: str, index: int, location: str, data: Dict[str, Any]
+) -> List[ValidationIssue]:
+    problems = validator.problems(data) or [(None, f"Invalid {validator.label}")]
+    return [ValidationIssue(section, index, location, field, message) for field, message in problems]
+
+
+def validate_entities(
+    chunks: Iterable[Chunk], *, workers: Optional[int] = None
+) -> Tuple[Dict[str, List[Any]], List[ValidationIssue]]:
+    """Build every entity, returning the entities by section and all issues found, in input order."""
+
+    sections: Dict[str, List[Any]] = {section: [] for section in SECTIONS}
+    issues: List[ValidationIssue] = []
+    ordered = iter(chunks)
+    if not workers or workers <= 1:
+        for chunk in ordered:
+            built, found = validate_chunk(chunk)
+            sections[chunk.section].extend(built)
+            issues.extend(found)
+        return sections, issues
+
+    for chunk, (converted, found) in _validate_in_pool(ordered, workers):
+        entity_type = VALIDATORS[chunk.section].entity_type
+        sections[chunk.section].extend([entity_type(*values) for values in converted])
+        issues.extend(found)
+    return sections, issues
+
+
+def document_chunks(sections: Mapping[str, List[Dict[str, Any]]], size: int = CHUNK_SIZE) -> Iterator[Chunk]:
+    """Split the entity lists of a parsed document, keyed by section, into chunks."""
+
+    for section, items in sections.items():
+        for start in range(0, len(items), size):
+            yield Chunk(section, start, items[start : start + size])
+
+
+def stream_chunks(raw_entities: Iterable[RawEntity], size: int = CHUNK_SIZE) -> Iterator[Chunk]:
+    """Group a stream of entities into chunks of consecutive entities from one section."""
+
+    section, start = "", 0
+    items: List[Dict[str, Any]] = []
+    lines: List[int] = []
+    for raw in raw_entities:
+        if items and (raw.section != section or len(items) >= size):
+            yield Chunk(section, start, items, lines)
+            items, lines = [], []
+        if not items:
+            section, start = raw.section, raw.index
+        items.append(raw.data)
+        lines.append(raw.line)
+    if items:
+        yield Chunk(section, start, items, lines)
+
+
+def _validate_in_pool(chunks: Iterator[Chunk], workers: int) -> Iterator[Tuple[Chunk, ChunkResult]]:
+    """Yield chunk results in input order, keeping at most ``2 * workers`` chunks in flight."""
+
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    window = 2 * workers
+    logger.info("Validating configuration entities across %d workers", workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: List[Tuple[Chunk, Future[ChunkResult]]] = []
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_convert_in_worker, chunk)))
+            if len(pending) >= window:
+                break
+        while pending:
+            chunk, future = pending.pop(0)
+            yield chunk, future.result()
+            following = next(chunks, None)
+            if following is not None:
+                pending.append((following, pool.submit(_convert_in_worker, following)))
+
+
+def _convert_in_worker(chunk: Chunk) -> ChunkResult:
+    """Pool entry point returning field values, which the caller turns into entities."""
+
+    return validate_chunk(chunk, values=True)
@@ -13,3 +13,63 @@ extra_paths = [root / "attacks", root / "defence", root / "detection"]
 for path in extra_paths:
     if path.exists():
         sys.path.insert(0, str(path))
+
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_snapshot_cache(tmp_path, monkeypatch):
+    """Keep compiled configuration snapshots out of the user's cache directory."""
+
+    monkeypatch.setenv("ADCS_LAB_CACHE_DIR", str(tmp_path / "snapshot-cache"))
+
+
+ISSUANCE_CONFIG = """certificate_authorities:
+  - name: ROOT
+    role: root
+    location: lab
+    nt_auth_published: true
+    eku: []
+  - name: ISSUING
+    role: subordinate
+    parent: ROOT
+    location: lab
+    nt_auth_published: false
+    eku: []
+    published_templates: ["Published"]
+  - name: OFFLINE
+    role: root
+    location: vault
+    nt_auth_published: false
+    eku: []
+    published_templates: ["Untrusted"]
+certificate_templates:
+{templates}
+security_principals:
+  - name: alice
+    groups: ["Domain Users"]
+    can_edit_subject: true
+"""
+
+ISSUANCE_TEMPLATE = """  - name: {name}
+    eku: ["Client Authentication"]
+    enrollment_rights: ["Domain Users"]
+    manager_approval_required: false
+    subject_name_editable: true
+    superseded_templates: []
+    validity_days: 90
+    owner: PKI Admins"""
+
+
+@pytest.fixture
+def issuance_config(tmp_path):
+    """Return a factory writing a configuration with CA template publication and an NTAuth chain."""
+
+    def write(names=("Published", "Untrusted", "Unpublished")):
+        config_file = tmp_path / "issuance.yaml"
+        templates = "\n".join(ISSUANCE_TEMPLATE.format(name=name) for name in names)
+        config_file.write_text(ISSUANCE_CONFIG.format(templates=templates), encoding="utf-8")
+        return config_file
+
+    return write
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from adcs_lab import Esc1Simulation, LabConfiguration
+from adcs_lab.bench import BenchmarkReport, StageResult, compare, run_benchmarks
+from adcs_lab.cli import main as cli_main
+from adcs_lab.synthetic import ForestSpec, generate_forest, write_forest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_synthetic_forest_is_deterministic_and_loads(tmp_path):
+    spec = ForestSpec(cas=3, templates=40, principals=200, groups=12, nesting_depth=2, vulnerable_ratio=0.25, seed=7)
+    document = generate_forest(spec)
+    assert document == generate_forest(spec)
+    assert document != generate_forest(ForestSpec(**{**spec.to_dict(), "seed": 8}))
+
+    config = LabConfiguration(write_forest(tmp_path / "forest.yaml", document))
+    config.load()
+    assert len(config.certificate_templates) == 40
+    assert len(config.security_principals) == 200
+    assert len(config.certificate_authorities) == 3
+    assert sum(config.template_flags(template).esc1_prone for template in config.certificate_templates) >= 10
+    assert all(config.is_issuable(template) for template in config.certificate_templates)
+    nested = config.effective_groups(config.principal_by_name("user-000000"))
+    assert len(nested) >= len(config.principal_by_name("user-000000").groups)
+    assert Esc1Simulation(config).run_all()
+
+
+def test_benchmark_report_round_trips_and_flags_regressions(tmp_path):
+    config_path = write_forest(tmp_path / "forest.json", generate_forest(ForestSpec(templates=20, principals=50)))
+    report = run_benchmarks(config_path, stages=["load", "detect", "harden"], repeat=1)
+    assert [result.stage for result in report.stages] == ["load", "detect", "harden"]
+    assert report.stage("detect").items == 20
+    assert all(result.seconds > 0 and result.peak_bytes > 0 for result in report.stages)
+    assert BenchmarkReport.from_dict(json.loads(json.dumps(report.to_dict()))).to_dict() == report.to_dict()
+
+    baseline = BenchmarkReport(config="", stages=[StageResult("load", 1.0, 100, 1000)])
+    faster = BenchmarkReport(config="", stages=[StageResult("load", 0.9, 100, 1100)])
+    slower = BenchmarkReport(config="", stages=[StageResult("load", 1.5, 100, 2000)])
+    assert compare(faster, baseline) == []
+    assert {regression.metric for regression in compare(slower, baseline)} == {
+        "seconds_per_item",
+        "peak_bytes_per_item",
+    }
+
+
+def test_cli_bench_compares_against_baseline(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    args = ["bench", "--templates", "10", "--principals", "20", "--groups", "4", "--repeat", "1"]
+    assert cli_main([*args, "--stages", "simulate", "--save-baseline", str(baseline)]) == 0
+    saved = json.loads(baseline.read_text(encoding="utf-8"))
+    saved["stages"][0]["peak_bytes"] = 1
+    baseline.write_text(json.dumps(saved), encoding="utf-8")
+    capsys.readouterr()
+
+    assert cli_main([*args, "--stages", "simulate", "--baseline", str(baseline), "--format", "json"]) == 4
+    report = json.loads(capsys.readouterr().out)
+    assert report["forest"]["templates"] == 10
+    assert report["regressions"][0]["metric"] == "peak_bytes_per_item"
+
+
+def test_entity_memory_benchmark_runs():
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    completed = subprocess.run(
+        [sys.executable, str(ROOT / "benchmarks" / "entity_memory.py"), "--count", "50"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    assert "bytes/entity" in completed.stdout
+    assert "reduction:" in completed.stdout
@@ -0,0 +1,483 @@
+import pytest
+
+from adcs_lab import LabConfiguration
+
+
+def test_streaming_load_matches_full_load():
+    full = LabConfiguration("data/sample_templates.yaml")
+    full.load()
+    streamed = LabConfiguration("data/sample_templates.yaml")
+    streamed.load(streaming=True)
+    assert streamed.certificate_templates == full.certificate_templates
+    assert streamed.certificate_authorities == full.certificate_authorities
+    assert streamed.security_principals == full.security_principals
+    assert streamed.data == {}
+
+
+ANCHORED_CONFIG = """certificate_authorities:
+  - name: ROOT
+    role: root
+    location: lab
+    nt_auth_published: true
+    eku: &auth_ekus ["Client Authentication"]
+security_principals:
+  - name: alice
+    groups: &staff ["Domain Users"]
+    can_edit_subject: true
+certificate_templates:
+  - &base
+    name: Base
+    eku: *auth_ekus
+    enrollment_rights: *staff
+    manager_approval_required: false
+    subject_name_editable: true
+    superseded_templates: []
+    validity_days: 90
+    owner: PKI Admins
+  - <<: [{name: Merged, validity_days: 30}, *base]
+    owner: Ops
+"""
+
+
+def test_streaming_resolves_anchors_like_full_load(tmp_path):
+    config_file = tmp_path / "anchored.yaml"
+    config_file.write_text(ANCHORED_CONFIG, encoding="utf-8")
+    full = LabConfiguration(config_file)
+    full.load()
+    streamed = LabConfiguration(config_file)
+    streamed.load(streaming=True)
+    assert streamed.certificate_templates == full.certificate_templates
+    assert streamed.security_principals == full.security_principals
+    assert [(t.name, t.validity_days, t.owner) for t in full.certificate_templates] == [
+        ("Base", 90, "PKI Admins"),
+        ("Merged", 30, "Ops"),
+    ]
+    # Anchors declared in sections skipped at the event level stay resolvable.
+    assert list(LabConfiguration(config_file).iter_section("certificate_templates")) == full.certificate_templates
+
+    duplicated = tmp_path / "duplicated.yaml"
+    duplicated.write_text(ANCHORED_CONFIG + "security_principals: []\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Duplicate configuration section 'security_principals' \\(line 23\\)"):
+        LabConfiguration(duplicated).load(streaming=True)
+
+
+def test_streaming_rejects_unhashable_keys_like_full_load(tmp_path):
+    for name, content in (
+        ("nested.yaml", "certificate_templates:\n  - ? [a, b]\n    : 1\n"),
+        ("root.yaml", "? {a: 1}\n: x\ncertificate_templates: []\n"),
+    ):
+        config_file = tmp_path / name
+        config_file.write_text(content, encoding="utf-8")
+        messages = []
+        for streaming in (False, True):
+            with pytest.raises(ValueError, match="found unhashable key") as exc:
+                LabConfiguration(config_file).load(streaming=streaming)
+            messages.append(str(exc.value))
+        assert messages[0] == messages[1], name
+
+
+def test_streaming_load_reports_line_numbers(tmp_path):
+    bad_file = tmp_path / "bad.yaml"
+    bad_file.write_text(
+        """certificate_authorities: []
+security_principals:
+  - name: alice
+    groups: ["Domain Users"]
+    can_edit_subject: true
+  - name: bob
+    can_edit_subject: false
+certificate_templates: []
+""",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError) as exc:
+        LabConfiguration(bad_file).load(streaming=True)
+    assert "Missing key in security principal: groups" in str(exc.value)
+    assert "line 6" in str(exc.value)
+
+
+def test_iter_section_yields_entities_lazily():
+    config = LabConfiguration("data/sample_templates.yaml")
+    names = [principal.name for principal in config.iter_section("security_principals")]
+    assert names == ["alice", "bob-admin", "pki-auditor"]
+    assert config.security_principals == []
+
+
+def _write_config(path, validity_days=180):
+    path.write_text(
+        f"""certificate_authorities: []
+security_principals: []
+certificate_templates:
+  - name: Cached
+    eku: ["Client Authentication"]
+    enrollment_rights: ["Domain Users"]
+    manager_approval_required: false
+    subject_name_editable: true
+    superseded_templates: []
+    validity_days: {validity_days}
+    owner: "PKI Admins"
+""",
+        encoding="utf-8",
+    )
+
+
+def test_snapshot_cache_reused_until_source_changes(tmp_path):
+    config_file = tmp_path / "lab.yaml"
+    _write_config(config_file)
+
+    first = LabConfiguration(config_file, cache_dir=tmp_path / "cache")
+    first.load(use_cache=True)
+    assert first.loaded_from_cache is False
+
+    second = LabConfiguration(config_file, cache_dir=tmp_path / "cache")
+    second.load(use_cache=True)
+    assert second.loaded_from_cache is True
+    assert second.certificate_templates == first.certificate_templates
+
+    _write_config(config_file, validity_days=1800)
+    third = LabConfiguration(config_file, cache_dir=tmp_path / "cache")
+    third.load(use_cache=True)
+    assert third.loaded_from_cache is False
+    assert third.certificate_templates[0].validity_days == 1800
+
+
+def test_snapshot_skipped_when_source_changes_during_load(tmp_path, monkeypatch):
+    from adcs_lab.snapshot import snapshot_path
+
+    config_file = tmp_path / "lab.yaml"
+    _write_config(config_file)
+    parse_yaml = LabConfiguration._parse_yaml
+
+    def parse_then_edit(self):
+        loaded = parse_yaml(self)
+        _write_config(config_file, validity_days=1800)
+        return loaded
+
+    monkeypatch.setattr(LabConfiguration, "_parse_yaml", parse_then_edit)
+    LabConfiguration(config_file, cache_dir=tmp_path).load(use_cache=True)
+    assert not snapshot_path(config_file, tmp_path).exists()
+
+    monkeypatch.setattr(LabConfiguration, "_parse_yaml", parse_yaml)
+    config = LabConfiguration(config_file, cache_dir=tmp_path)
+    config.load(use_cache=True)
+    assert config.certificate_templates[0].validity_days == 1800
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path):
+    from adcs_lab.snapshot import snapshot_path
+
+    config_file = tmp_path / "lab.yaml"
+    _write_config(config_file)
+    LabConfiguration(config_file, cache_dir=tmp_path).load(use_cache=True)
+    snapshot_path(config_file, tmp_path).write_bytes(b"ADCSSNAP\x00\x00\x00\x05junk")
+
+    config = LabConfiguration(config_file, cache_dir=tmp_path)
+    config.load(use_cache=True)
+    assert config.loaded_from_cache is False
+    assert config.template_by_name("cached") is not None
+
+
+def test_entities_are_slotted_with_interned_tuple_fields(tmp_path):
+    config = LabConfiguration("data/sample_templates.yaml")
+    config.load()
+    templates = config.certificate_templates
+    assert not hasattr(templates[0], "__dict__")
+    assert isinstance(templates[0].eku, tuple)
+    assert isinstance(config.security_principals[0].groups, tuple)
+    shared = [template.eku[0] for template in templates if template.eku[0] == "Client Authentication"]
+    assert len(shared) > 1 and all(value is shared[0] for value in shared)
+
+    config_file = tmp_path / "lab.yaml"
+    _write_config(config_file)
+    LabConfiguration(config_file, cache_dir=tmp_path).load(use_cache=True)
+    cached = LabConfiguration(config_file, cache_dir=tmp_path)
+    cached.load(use_cache=True)
+    assert cached.loaded_from_cache is True
+    assert isinstance(cached.certificate_templates[0].eku, tuple)
+
+
+def test_name_indexes_follow_template_changes(issuance_config):
+    from dataclasses import replace
+
+    config = LabConfiguration("data/sample_templates.yaml")
+    config.load()
+    assert config.ca_by_name("lab-sub-ca").name == "LAB-SUB-CA"
+
+    clone = replace(config.template_by_name("esc1-template"), name="Clone")
+    config.add_template(clone)
+    assert config.template_by_name("CLONE") is clone
+    with pytest.raises(ValueError):
+        config.add_template(replace(clone, name="clone"))
+
+    config.rename_template("clone", "Renamed")
+    assert config.template_by_name("clone") is None
+    assert config.template_by_name("renamed") is clone
+
+    config.remove_template("Renamed")
+    assert config.template_by_name("renamed") is None
+    assert clone not in config.certificate_templates
+
+    config = LabConfiguration(issuance_config())
+    config.load()
+    template = config.rename_template("published", "Reissued")
+    assert [ca.name for ca in config.issuing_authorities(template)] == ["ISSUING"]
+    assert config.ca_by_name("ISSUING").published_templates == ("Reissued",)
+    assert config.is_issuable(template) and config.template_flags(template).issuable
+    assert config.issuing_authorities(config.template_by_name("Untrusted"))[0].name == "OFFLINE"
+
+
+def test_enrollment_index_and_template_flags():
+    from adcs_lab import EkuHardener
+
+    config = LabConfiguration("data/sample_templates.yaml")
+    config.load()
+    alice = config.principal_by_name("alice")
+    assert [t.name for t in config.templates_enrollable_by(alice)] == ["UserAuthentication", "ESC1-Template"]
+    assert [t.name for t in config.templates_for_group("pki auditors")] == ["ESC1-Template"]
+
+    flags = config.template_flags(config.template_by_name("ESC1-Template"))
+    assert flags.esc1_prone and flags.permissive and flags.logon_capable
+
+    EkuHardener(config.certificate_templates, configuration=config).apply()
+    assert not config.template_flags(config.template_by_name("ESC1-Template")).esc1_prone
+
+
+def test_group_masks_match_enrollment_rights():
+    config = LabConfiguration("data/sample_templates.yaml")
+    config.load()
+    alice = config.principal_by_name("alice")
+    principal_mask = config.effective_group_mask(alice)
+    enrollable = [t.name for t in config.certificate_templates if config.enrollment_mask(t) & principal_mask]
+    assert enrollable == [t.name for t in config.templates_enrollable_by(alice)]
+    assert config.group_mask(["DOMAIN USERS"]) == config.group_mask(["domain users"])
+    assert config.group_mask(["No Such Group"]) == 0
+    assert config.effective_group_mask(alice) == principal_mask
+    assert config.templates_for_group("No Such Group") == []
+
+
+def test_nested_groups_resolve_transitively_with_cycles(tmp_path):
+    config_file = tmp_path / "nested.yaml"
+    config_file.write_text(
+        """certificate_authorities: []
+certificate_templates:
+  - name: StaffAuth
+    eku: ["Client Authentication"]
+    enrollment_rights: ["All Staff"]
+    manager_approval_required: false
+    subject_name_editable: true
+    superseded_templates: []
+    validity_days: 180
+    owner: "PKI Admins"
+security_groups:
+  - name: Helpdesk
+    member_of: ["IT Operations"]
+  - name: IT Operations
+    member_of: ["All Staff", "Helpdesk"]
+  - name: Domain Users
+    member_of: ["All Staff"]
+security_principals:
+  - name: carol
+    groups: ["helpdesk"]
+    can_edit_subject: true
+""",
+        encoding="utf-8",
+    )
+    config = LabConfiguration(config_file)
+    config.load()
+    carol = config.principal_by_name("carol")
+    assert config.effective_groups(carol) == {"helpdesk", "it operations", "all staff"}
+    assert [t.name for t in config.templates_enrollable_by(carol)] == ["StaffAuth"]
+    assert "all staff" in config.permissive_groups()
+    assert config.template_flags(config.template_by_name("StaffAuth")).permissive
+
+
+def test_ca_publication_chains_and_issuability(issuance_config):
+    config = LabConfiguration(issuance_config())
+    config.load()
+    issuing = config.ca_by_name("issuing")
+    assert [ca.name for ca in config.ca_chain(issuing)] == ["ISSUING", "ROOT"]
+    assert config.chains_to_ntauth(issuing) and not config.chains_to_ntauth(config.ca_by_name("OFFLINE"))
+    assert [ca.name for ca in config.issuing_authorities(config.template_by_name("published"))] == ["ISSUING"]
+    issuable = {t.name: config.template_flags(t).issuable for t in config.certificate_templates}
+    assert issuable == {"Published": True, "Untrusted": False, "Unpublished": False}
+
+    legacy = LabConfiguration("data/sample_templates.yaml")
+    legacy.load()
+    assert all(legacy.is_issuable(t) for t in legacy.certificate_templates)
+    assert len(legacy.issuing_authorities(legacy.certificate_templates[0])) == 2
+
+
+def test_ca_parent_cycles_and_missing_published_templates_are_rejected(issuance_config):
+    config_file = issuance_config()
+    text = config_file.read_text(encoding="utf-8")
+    config_file.write_text(text.replace("    location: vault", "    parent: ISSUING2\n    location: vault"), "utf-8")
+    with pytest.raises(ValueError, match="references missing parent"):
+        LabConfiguration(config_file).load()
+
+    cyclic = text.replace("  - name: ROOT\n    role: root\n", "  - name: ROOT\n    role: root\n    parent: ISSUING\n")
+    config_file.write_text(cyclic, encoding="utf-8")
+    with pytest.raises(ValueError, match="cyclic parent chain"):
+        LabConfiguration(config_file).load()
+
+    with pytest.raises(ValueError, match="publishes missing template 'Untrusted'"):
+        LabConfiguration(issuance_config(names=("Published",))).load()
+
+
+def test_json_and_ndjson_inputs_match_yaml(tmp_path):
+    reference = LabConfiguration("data/sample_templates.yaml")
+    reference.load()
+    reference.dump(tmp_path / "lab.json")
+    reference.dump(tmp_path / "lab.ndjson")
+    (tmp_path / "lab-export").write_bytes((tmp_path / "lab.ndjson").read_bytes())
+
+    for name in ("lab.json", "lab.ndjson", "lab-export"):
+        for streaming in (False, True):
+            config = LabConfiguration(tmp_path / name)
+            config.load(streaming=streaming)
+            assert config.certificate_templates == reference.certificate_templates, name
+            assert config.security_principals == reference.security_principals, name
+            assert config.certificate_authorities == reference.certificate_authorities, name
+    names = [
+        principal.name for principal in LabConfiguration(tmp_path / "lab.ndjson").iter_section("security_principals")
+    ]
+    assert names == ["alice", "bob-admin", "pki-auditor"]
+
+    from adcs_lab.json_input import detect_format
+
+    assert detect_format(tmp_path / "lab-export") == "ndjson"
+    (tmp_path / "lab-document").write_bytes((tmp_path / "lab.json").read_bytes())
+    assert detect_format(tmp_path / "lab-document") == "json"
+
+
+def test_extensionless_json_is_decoded_once(tmp_path, monkeypatch):
+    from adcs_lab import json_input
+
+    decode = json_input.json_decoder()
+    documents = []
+
+    def counting_decoder():
+        def loads(data):
+            documents.append(len(data))
+            return decode(data)
+
+        return loads
+
+    monkeypatch.setattr(json_input, "json_decoder", counting_decoder)
+    reference = LabConfiguration("data/sample_templates.yaml")
+    reference.load()
+    reference.dump(tmp_path / "lab.json")
+    document = tmp_path / "lab-document"
+    document.write_bytes((tmp_path / "lab.json").read_bytes())
+    config = LabConfiguration(document)
+    config.load()
+    assert config.load_source == "json"
+    assert len(config.certificate_templates) == 3
+    assert [size for size in documents if size == document.stat().st_size] == [document.stat().st_size]
+
+
+def test_ndjson_errors_carry_line_numbers(tmp_path):
+    bad_file = tmp_path / "bad.ndjson"
+    bad_file.write_text(
+        '{"kind": "security_principal", "name": "alice", "groups": [], "can_edit_subject": true}\n'
+        "\n"
+        '{"kind": "security_principal", "name": "bob", "can_edit_subject": false}\n',
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError, match="Missing key in security principal: groups .*line 3"):
+        LabConfiguration(bad_file).load()
+
+    bad_file.write_text('{"kind": "printer", "name": "lp0"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="Unknown entity kind 'printer' \\(line 1\\)"):
+        LabConfiguration(bad_file).load()
+
+    bad_json = tmp_path / "bad.json"
+    bad_json.write_text('{"certificate_templates": [', encoding="utf-8")
+    with pytest.raises(ValueError, match="JSON parsing error"):
+        LabConfiguration(bad_json).load()
+
+
+def test_extensionless_flow_style_yaml_is_not_read_as_json(tmp_path):
+    import json
+
+    reference = LabConfiguration("data/sample_templates.yaml")
+    reference.load()
+    data = reference.to_dict()
+    flow = tmp_path / "flow-config"
+    flow.write_text("{" + ", ".join(f"{key}: {json.dumps(value)}" for key, value in data.items()) + "}\n")
+    plain = tmp_path / "plain-config"
+    plain.write_text(json.dumps(data))
+
+    for path, source in ((flow, "yaml"), (plain, "json")):
+        config = LabConfiguration(path)
+        config.load()
+        assert config.load_source == source
+        assert config.certificate_templates == reference.certificate_templates
+
+    empty = tmp_path / "empty.json"
+    empty.write_text("null", encoding="utf-8")
+    with pytest.raises(ValueError, match="expected JSON content"):
+        LabConfiguration(empty).load()
+
+
+def test_json_input_falls_back_to_stdlib_decoder(tmp_path, monkeypatch):
+    import json
+    import sys
+
+    from adcs_lab.json_input import json_decoder
+
+    reference = LabConfiguration("data/sample_templates.yaml")
+    reference.load()
+    reference.dump(tmp_path / "lab.json")
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    json_decoder.cache_clear()
+    try:
+        assert json_decoder() is json.loads
+        config = LabConfiguration(tmp_path / "lab.json")
+        config.load()
+        assert config.certificate_templates == reference.certificate_templates
+    finally:
+        json_decoder.cache_clear()
+
+
+def test_load_reports_every_invalid_entity(tmp_path):
+    from adcs_lab.validation import ConfigurationError
+
+    bad_file = tmp_path / "bad.json"
+    bad_file.write_text(
+        """{"certificate_authorities": [],
+"certificate_templates": [
+  {"name": "NoRights", "manager_approval_required": false, "subject_name_editable": true,
+   "superseded_templates": [], "validity_days": "soon", "owner": "PKI"}
+],
+"security_principals": [
+  {"name": "alice", "groups": [], "can_edit_subject": true},
+  {"name": "bob", "groups": "Domain Users", "can_edit_subject": false}
+]}""",
+        encoding="utf-8",
+    )
+    for workers in (None, 2):
+        with pytest.raises(ConfigurationError) as exc:
+            LabConfiguration(bad_file).load(workers=workers)
+        issues = [(issue.section, issue.index, issue.field) for issue in exc.value.issues]
+        assert issues == [
+            ("certificate_templates", 0, "eku"),
+            ("certificate_templates", 0, "enrollment_rights"),
+            ("certificate_templates", 0, "validity_days"),
+            ("security_principals", 1, "groups"),
+        ]
+        assert "4 validation errors" in str(exc.value)
+        assert "Missing key in certificate template: enrollment_rights (certificate_templates[0])" in str(exc.value)
+
+    from adcs_lab.json_input import iter_json_entities
+    from adcs_lab.validation import stream_chunks, validate_entities
+
+    sections, found = validate_entities(stream_chunks(iter_json_entities(bad_file), size=1), workers=2)
+    assert [issue.location for issue in found] == ["certificate_templates[0]"] * 3 + ["security_principals[1]"]
+    assert [principal.name for principal in sections["security_principals"]] == ["alice"]
+
+    reference = LabConfiguration("data/sample_templates.yaml")
+    reference.load()
+    parallel = LabConfiguration("data/sample_templates.yaml")
+    parallel.load(workers=2)
+    assert parallel.certificate_templates == reference.certificate_templates
+    assert parallel.security_principals == reference.security_principals
@@ -0,0 +1,99 @@
+import json
+
+from adcs_lab import LabConfiguration
+from adcs_lab.cli import main as cli_main
+from adcs_lab.graph import CA, NTAUTH, NTAUTH_NAME, PRINCIPAL, TEMPLATE, EscalationGraph
+
+
+def load_graph():
+    config = LabConfiguration("data/sample_templates.yaml")
+    config.load()
+    return EscalationGraph.from_configuration(config)
+
+
+def test_escalation_paths_reach_ntauth_through_abusable_templates():
+    graph = load_graph()
+    paths = {path.principal: path for path in graph.escalation_paths()}
+    assert set(paths) == {"alice", "pki-auditor"}
+    hops = paths["pki-auditor"].hops
+    assert [kind for kind, _ in hops] == [PRINCIPAL, "group", TEMPLATE, CA, NTAUTH]
+    assert hops[2] == (TEMPLATE, "ESC1-Template")
+    assert graph.escalation_paths(["BOB-ADMIN"]) == []
+
+    sink = graph.node_id(NTAUTH, NTAUTH_NAME)
+    template = graph.node_id(TEMPLATE, "esc1-template")
+    assert graph.shortest_path(graph.node_id(PRINCIPAL, "alice"), template) is not None
+    assert graph.shortest_path(sink, template) is None
+    assert template in graph.successors(graph.node_id("group", "pki auditors"))
+    assert graph.node_id("group", "pki auditors") in graph.predecessors(template)
+
+
+def test_escalation_paths_follow_nested_groups(tmp_path):
+    config_file = tmp_path / "nested.yaml"
+    config_file.write_text(
+        """certificate_authorities:
+  - name: ISSUING
+    role: subordinate
+    location: lab
+    nt_auth_published: true
+    eku: ["Client Authentication"]
+certificate_templates:
+  - name: StaffAuth
+    eku: ["1.3.6.1.5.5.7.3.2"]
+    enrollment_rights: ["All Staff"]
+    manager_approval_required: false
+    subject_name_editable: true
+    superseded_templates: []
+    validity_days: 180
+    owner: "PKI Admins"
+  - name: CodeSigning
+    eku: ["Code Signing"]
+    enrollment_rights: ["Helpdesk"]
+    manager_approval_required: false
+    subject_name_editable: true
+    superseded_templates: []
+    validity_days: 180
+    owner: "PKI Admins"
+security_groups:
+  - name: Helpdesk
+    member_of: ["IT Operations"]
+  - name: IT Operations
+    member_of: ["All Staff", "Helpdesk"]
+security_principals:
+  - name: carol
+    groups: ["helpdesk"]
+    can_edit_subject: true
+""",
+        encoding="utf-8",
+    )
+    config = LabConfiguration(config_file)
+    config.load()
+    (path,) = EscalationGraph.from_configuration(config).escalation_paths()
+    assert [name for _, name in path.hops] == [
+        "carol",
+        "Helpdesk",
+        "IT Operations",
+        "All Staff",
+        "StaffAuth",
+        "ISSUING",
+        "NTAuth",
+    ]
+
+
+def test_cli_paths_reports_json(capsys):
+    exit_code = cli_main(["--config", "data/sample_templates.yaml", "paths", "--format", "json"])
+    assert exit_code == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["summary"]["principals_with_paths"] == 2
+    assert report["paths"][0]["path"][-1] == {"kind": "ntauth", "name": "NTAuth"}
+    assert cli_main(["paths", "--principal", "bob-admin"]) == 2
+    assert cli_main(["paths", "--principal", "nobody"]) == 1
+
+
+def test_escalation_paths_only_run_through_publishing_ca_chains(issuance_config):
+    config = LabConfiguration(issuance_config())
+    config.load()
+    graph = EscalationGraph.from_configuration(config)
+    (path,) = graph.escalation_paths()
+    assert [name for _, name in path.hops] == ["alice", "Domain Users", "Published", "ISSUING", "ROOT", "NTAuth"]
+    assert len(graph.successors(graph.node_id(TEMPLATE, "unpublished"))) == 0
@@ -0,0 +1,44 @@
+import json
+import pstats
+
+from adcs_lab import EkuHardener, LabConfiguration, profiling
+from adcs_lab.cli import main as cli_main
+
+
+def test_stages_are_shared_no_ops_without_a_profiler():
+    assert profiling.stage("load") is profiling.stage("detect.evaluate")
+    items = [1, 2, 3]
+    assert list(profiling.profile_iter("x", items)) == items
+
+
+def test_profiler_records_nested_stages_and_generators():
+    with profiling.Profiler() as profiler:
+        config = LabConfiguration("data/sample_templates.yaml")
+        config.load()
+        actions = list(EkuHardener(config.certificate_templates, configuration=config).iter_apply())
+        with profiling.stage("outer"):
+            with profiling.stage("inner") as record:
+                payload = [bytearray(1024) for _ in range(64)]
+                record.count(len(payload))
+    assert profiling.stage("outer") is profiling.stage("inner")
+
+    stats = {entry.name: entry for entry in profiler.report()}
+    assert {"load", "load.parse", "load.build", "load.validate", "harden.apply"} <= set(stats)
+    assert stats["load"].items == stats["load.build"].items == 8
+    assert stats["harden.apply"].calls == 1
+    assert stats["harden.apply"].items == len(actions) == 2
+    assert stats["inner"].items == 64
+    assert stats["outer"].peak_bytes >= stats["inner"].peak_bytes >= 64 * 1024
+    assert stats["load"].seconds >= stats["load.parse"].seconds
+
+
+def test_cli_profile_reports_on_stderr_and_dumps_pstats(tmp_path, capsys):
+    dump = tmp_path / "detect.prof"
+    argv = ["--profile", "json", "--profile-dump", str(dump), "--no-cache", "detect", "--format", "json"]
+    assert cli_main(argv) == 0
+    captured = capsys.readouterr()
+    assert isinstance(json.loads(captured.out), list)
+    stages = {entry["name"]: entry for entry in json.loads(captured.err)["stages"]}
+    assert stages["cli.detect"]["calls"] == 1
+    assert stages["detect.evaluate"]["items"] == 3
+    assert pstats.Stats(str(dump)).total_calls > 0
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+import shutil
+
+from adcs_lab.server import LabServer
+
+
+async def _get(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, body = raw.split(b"\r\n\r\n", 1)
+    status = int(head.split()[1])
+    generation = next(line for line in head.decode().splitlines() if line.startswith("X-ADCS-Lab-Generation"))
+    return status, int(generation.split(":")[1]), json.loads(body)
+
+
+def test_server_answers_queries_over_http():
+    server = LabServer("data/sample_templates.yaml")
+    server.load()
+
+    async def scenario():
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            health = await _get(port, "/health")
+            simulate = await _get(port, "/simulate?requester=alice")
+            await _get(port, "/simulate?requester=ALICE")
+            detect = await _get(port, "/detect?rules=esc1")
+            harden = await _get(port, "/harden?only=ESC1-Template")
+            missing = await _get(port, "/simulate?requester=nobody")
+            bad_rule = await _get(port, "/detect?rules=ESC99")
+            unknown = await _get(port, "/nope")
+            dashboard = await _get(port, "/dashboard")
+        return health, simulate, detect, harden, missing, bad_rule, unknown, dashboard
+
+    health, simulate, detect, harden, missing, bad_rule, unknown, dashboard = asyncio.run(scenario())
+    assert health[0] == 200 and health[2]["templates"] == 3 and health[1] == 1
+    assert simulate[2]["success"] is True and "ESC1-Template" in simulate[2]["impacted_templates"]
+    assert server.simulation_cache.stats()["hits"] == 1
+    assert {finding["template"] for finding in detect[2]} == {"UserAuthentication", "ESC1-Template"}
+    assert [patch["template"] for patch in harden[2]] == ["ESC1-Template"]
+    assert server.configuration.template_by_name("ESC1-Template").subject_name_editable is True
+    assert (missing[0], bad_rule[0], unknown[0]) == (404, 400, 404)
+    assert dashboard[2]["score"]["total"] == 3
+
+
+def test_server_reloads_changed_config_and_keeps_last_good(tmp_path):
+    config_file = tmp_path / "lab.yaml"
+    shutil.copy("data/sample_templates.yaml", config_file)
+    server = LabServer(config_file, poll_interval=0.01)
+    server.load()
+    original = server.configuration
+
+    async def reload():
+        return await server.reload_if_changed()
+
+    server.dispatch("GET", "/simulate?requester=alice")
+    assert len(server.simulation_cache) == 1
+    assert asyncio.run(reload()) is False
+
+    text = config_file.read_text(encoding="utf-8")
+    config_file.write_text(text.replace('name: "bob-admin"', 'name: "bob"'), encoding="utf-8")
+    os.utime(config_file, ns=(1, 1))
+    assert asyncio.run(reload()) is True
+    assert server.generation == 2 and server.configuration is not original
+    assert len(server.simulation_cache) == 0
+    assert server.configuration.principal_by_name("bob") is not None
+
+    config_file.write_text(text + "\n  - name: broken\n", encoding="utf-8")
+    assert asyncio.run(reload()) is False
+    assert server.generation == 2 and server.configuration.principal_by_name("bob") is not None
+
+    exposition = server.dispatch("GET", "/metrics")[1]
+    assert "adcs_lab_config_reload_failures_total 1" in exposition
+    assert "adcs_lab_config_generation 2" in exposition
+
+
+def test_server_exposes_prometheus_metrics():
+    server = LabServer("data/sample_templates.yaml", use_cache=False)
+    assert server.dispatch("GET", "/metrics")[0] == 200
+    server.load()
+    server.dispatch("GET", "/detect")
+    server.dispatch("GET", "/detect?rules=ESC1")
+
+    async def scrape():
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            raw = await reader.read()
+            writer.close()
+        return raw
+
+    head, body = asyncio.run(scrape()).split(b"\r\n\r\n", 1)
+    assert b"Content-Type: text/plain; version=0.0.4" in head
+    lines = body.decode().splitlines()
+    assert "# TYPE adcs_lab_scan_duration_seconds histogram" in lines
+    assert "adcs_lab_scans_total 2" in lines
+    assert "adcs_lab_templates_scanned_total 6" in lines
+    assert 'adcs_lab_findings_total{rule="ESC1",severity="high"} 4' in lines
+    assert 'adcs_lab_last_scan_findings{severity="high"} 2' in lines
+    assert "adcs_lab_config_reload_failures_total 0" in lines
+    assert 'adcs_lab_config_load_seconds_count{source="yaml"} 1' in lines
+    assert 'adcs_lab_scan_duration_seconds_bucket{le="+Inf"} 2' in lines
+    assert 'adcs_lab_http_requests_total{endpoint="/detect",status="200"} 2' in lines
+
+
+def test_server_allows_cross_origin_reads_of_the_dashboard_only():
+    async def heads(server):
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        found = {}
+        async with listener:
+            for target in ("/dashboard", "/simulate?requester=alice", "/metrics"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(f"GET {target} HTTP/1.1\r\n\r\n".encode())
+                await writer.drain()
+                found[target.split("?")[0]] = (await reader.read()).split(b"\r\n\r\n", 1)[0].decode()
+                writer.close()
+        return found
+
+    for origin in (None, "http://localhost:3000"):
+        server = LabServer("data/sample_templates.yaml", dashboard_origin=origin)
+        server.load()
+        found = asyncio.run(heads(server))
+        assert "Access-Control-Allow-Origin" not in found["/simulate"] + found["/metrics"]
+        expected = f"Access-Control-Allow-Origin: {origin}" if origin else "Access-Control-Allow-Origin"
+        assert (expected in found["/dashboard"]) is bool(origin)
+
+
+def test_server_rejects_oversized_request_lines():
+    server = LabServer("data/sample_templates.yaml")
+    server.load()
+
+    async def scenario():
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            oversized = await _get(port, "/health?pad=" + "x" * 10000)
+            healthy = await _get(port, "/health")
+        return oversized, healthy
+
+    oversized, healthy = asyncio.run(scenario())
+    assert oversized[0] == 414 and "too long" in oversized[2]["error"]
+    assert healthy[0] == 200
+
+
+def test_server_answers_unexpected_errors_with_a_500(monkeypatch, caplog):
+    from adcs_lab import dashboard
+
+    def broken(configuration, findings=None):
+        raise RuntimeError("feed exploded")
+
+    monkeypatch.setattr(dashboard, "build_dashboard", broken)
+    server = LabServer("data/sample_templates.yaml")
+    server.load()
+
+    async def scenario():
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            failed = await _get(port, "/dashboard")
+            healthy = await _get(port, "/health")
+        return failed, healthy
+
+    failed, healthy = asyncio.run(scenario())
+    assert failed[0] == 500 and failed[2] == {"error": "Internal server error"}
+    assert "Unhandled error while answering a request" in caplog.text and "feed exploded" in caplog.text
+    assert healthy[0] == 200
+
+
+def test_server_watcher_survives_unexpected_errors(caplog):
+    server = LabServer("data/sample_templates.yaml", poll_interval=0.001)
+    server.load()
+    checks = []
+
+    async def flaky():
+        checks.append(len(checks))
+        if len(checks) == 1:
+            raise RuntimeError("boom")
+        return False
+
+    server.reload_if_changed = flaky
+
+    async def scenario():
+        watcher = asyncio.create_task(server.watch())
+        while len(checks) < 3:
+            await asyncio.sleep(0.001)
+        watcher.cancel()
+
+    asyncio.run(scenario())
+    assert "checking data/sample_templates.yaml failed" in caplog.text
+    assert server.generation == 1
+
+
+def test_server_labels_load_metrics_with_the_parsed_format(tmp_path):
+    from adcs_lab import LabConfiguration
+
+    sample = LabConfiguration("data/sample_templates.yaml")
+    sample.load()
+    sample.dump(tmp_path / "lab.json")
+    server = LabServer(tmp_path / "lab.json", use_cache=False)
+    server.load()
+    assert server.configuration.load_source == "json"
+    assert 'adcs_lab_config_load_seconds_count{source="json"} 1' in server.dispatch("GET", "/metrics")[1]
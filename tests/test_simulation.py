@@ -1,9 +1,13 @@
 import json
+import os
+import stat
+from pathlib import Path
 
 import pytest
 
 from adcs_lab import Esc1Simulation, LabConfiguration, TemplateAnalyzer, EkuHardener
 from adcs_lab.cli import main as cli_main
+from adcs_lab.rules import select_rules
 
 
 def load_config():
@@ -40,6 +44,20 @@ def test_hardener_disables_subject_editing():
     assert any("Disabled subject name editing" in change for change in hardened["ESC1-Template"])
 
 
+def test_hardening_without_configuration_refreshes_simulation_results():
+    config = load_config()
+    alice = config.principal_by_name("alice")
+    assert Esc1Simulation(config).run(alice, show_table=False).success
+    generation = config.index_generation
+
+    EkuHardener(config.certificate_templates).apply()
+    assert config.index_generation != generation
+    result = Esc1Simulation(config).run(alice, show_table=False)
+    assert not result.success and result.impacted_templates == []
+    esc1 = config.template_by_name("ESC1-Template")
+    assert not config.template_flags(esc1).esc1_prone
+
+
 def test_invalid_configuration_raises(tmp_path):
     bad_file = tmp_path / "bad.yaml"
     bad_file.write_text(
@@ -54,7 +72,7 @@ security_principals: []
     config = LabConfiguration(bad_file)
     with pytest.raises(ValueError) as exc:
         config.load()
-    assert "Missing keys" in str(exc.value) or "missing required sections" in str(exc.value).lower()
+    assert "Missing key" in str(exc.value) or "missing required sections" in str(exc.value).lower()
 
 
 def test_duplicate_names_raise(tmp_path):
@@ -134,3 +152,341 @@ def test_cli_missing_config_returns_error(tmp_path):
     missing_file = tmp_path / "missing.yaml"
     exit_code = cli_main(["--config", str(missing_file), "detect"])
     assert exit_code == 3
+
+
+def test_run_all_matches_single_principal_runs():
+    config = load_config()
+    simulation = Esc1Simulation(config)
+    batch = simulation.run_all()
+    assert list(batch) == ["alice", "bob-admin", "pki-auditor"]
+    for principal in config.security_principals:
+        single = simulation.run(principal, show_table=False)
+        assert batch[principal.name].impacted_templates == single.impacted_templates
+    assert Esc1Simulation(config).run_all(workers=2) == batch
+
+
+def test_simulation_cache_shares_and_invalidates_results():
+    from dataclasses import replace
+
+    from adcs_lab.attack_simulator import SimulationCache
+
+    config = load_config()
+    cache = SimulationCache(maxsize=8)
+    alice = config.principal_by_name("alice")
+    twin = replace(alice, name="alice-twin")
+    first = Esc1Simulation(config, cache=cache).run(alice, show_table=False)
+    assert Esc1Simulation(config, cache=cache).run(twin, show_table=False) == first
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert "ESC1-Template" in first.impacted_templates
+
+    for _ in EkuHardener(config.certificate_templates, configuration=config).iter_apply():
+        pass
+    hardened = Esc1Simulation(config, cache=cache).run(alice, show_table=False)
+    assert not hardened.success and cache.misses == 2 and len(cache) == 1
+
+    results = Esc1Simulation(config, cache=cache).run_all()
+    assert not any(result.success for result in results.values())
+    reopened = replace(
+        config.template_by_name("ESC1-Template"),
+        name="Reopened",
+        enrollment_rights=alice.groups,
+        manager_approval_required=False,
+        subject_name_editable=True,
+    )
+    config.add_template(reopened)
+    assert Esc1Simulation(config, cache=cache).run(alice, show_table=False).impacted_templates == ["Reopened"]
+
+
+def test_cli_simulate_all_outputs_aggregate_json(capsys):
+    exit_code = cli_main(["--config", "data/sample_templates.yaml", "simulate", "--all", "--output-json"])
+    assert exit_code == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["summary"] == {"principals": 3, "escalation_possible": 2}
+    assert {entry["requester"] for entry in report["results"]} == {"alice", "bob-admin", "pki-auditor"}
+
+
+def test_cli_simulate_all_prints_table_by_default(capsys):
+    exit_code = cli_main(["--config", "data/sample_templates.yaml", "simulate", "--all"])
+    assert exit_code == 0
+    out = capsys.readouterr().out
+    assert "ESC1 Simulation" in out
+    for name in ("alice", "bob-admin", "pki-auditor"):
+        assert name in out
+    assert "ESC1-Template" in out
+
+
+def test_template_analyzer_rule_selection():
+    config = load_config()
+    findings = TemplateAnalyzer(config, rules=["esc1"]).run(show_table=False)
+    assert {f.rule for f in findings} == {"ESC1"}
+    assert {f.template for f in findings} == {"UserAuthentication", "ESC1-Template"}
+    with pytest.raises(ValueError):
+        TemplateAnalyzer(config, rules=["ESC99"])
+
+
+def test_template_analyzer_flags_esc2_esc3_esc4():
+    from dataclasses import replace
+
+    config = load_config()
+    base = config.template_by_name("MachineAuthentication")
+    analyzer = TemplateAnalyzer(config, rules=["ESC2", "ESC3", "ESC4"])
+    agent = replace(base, eku=["Certificate Request Agent"], manager_approval_required=False, owner="Everyone")
+    assert [f.rule for f in analyzer.evaluate_template(agent)] == ["ESC3", "ESC4"]
+    assert [f.rule for f in analyzer.evaluate_template(replace(agent, eku=[]))] == ["ESC2", "ESC4"]
+    assert analyzer.evaluate_template(base) == []
+    assert {f.rule for f in TemplateAnalyzer(config).evaluate_template(agent)}.isdisjoint({"ESC2", "ESC3", "ESC4"})
+    assert {rule.id for rule in select_rules(None)}.isdisjoint({"ESC2", "ESC3", "ESC4"})
+
+
+def test_eku_oids_and_friendly_names_resolve_alike():
+    from dataclasses import replace
+
+    from adcs_lab.eku import eku_id, eku_mask, eku_name
+
+    assert eku_id("1.3.6.1.4.1.311.20.2.2") == eku_id("smart card logon") == eku_id("Smartcard Logon")
+    assert eku_name("2.5.29.37.0") == "Any Purpose"
+    assert eku_mask(("Client Authentication", "1.3.6.1.5.5.7.3.2")) == eku_mask(["client authentication"])
+
+    config = load_config()
+    oid_logon = replace(config.template_by_name("ESC1-Template"), eku=("1.3.6.1.5.5.7.3.2", "1.3.6.1.4.1.311.20.2.2"))
+    assert "LOGON-EKU" in {f.rule for f in TemplateAnalyzer(config).evaluate_template(oid_logon)}
+    patch = EkuHardener([oid_logon], controls=["smart_card_logon"]).patch_for(oid_logon)
+    assert patch is not None and patch.after["eku"] == ("1.3.6.1.5.5.7.3.2",)
+
+
+def test_issuable_only_filters_simulation_and_detection(issuance_config):
+    config = LabConfiguration(issuance_config())
+    config.load()
+    alice = config.principal_by_name("alice")
+    assert Esc1Simulation(config).run(alice, show_table=False).impacted_templates == [
+        "Published",
+        "Untrusted",
+        "Unpublished",
+    ]
+    assert Esc1Simulation(config, issuable_only=True).run_all()["alice"].impacted_templates == ["Published"]
+    findings = TemplateAnalyzer(config, rules=["ESC1"], issuable_only=True).run(show_table=False)
+    assert [f.template for f in findings] == ["Published"]
+
+
+def test_cli_detect_issuable_only(issuance_config, capsys):
+    config_file = str(issuance_config())
+    assert cli_main(["--config", config_file, "detect", "--issuable-only", "--rules", "ESC1", "--format", "json"]) == 0
+    assert [f["template"] for f in json.loads(capsys.readouterr().out)] == ["Published"]
+
+
+def test_cli_detect_rejects_unknown_rule():
+    with pytest.raises(SystemExit):
+        cli_main(["detect", "--rules", "ESC1,NOPE"])
+
+
+def test_template_analyzer_parallel_matches_serial():
+    config = load_config()
+    analyzer = TemplateAnalyzer(config)
+    assert analyzer.run(show_table=False, workers=2) == analyzer.run(show_table=False)
+
+
+def test_cli_detect_streams_jsonl(capsys):
+    exit_code = cli_main(["--config", "data/sample_templates.yaml", "detect", "--format", "jsonl"])
+    assert exit_code == 0
+    lines = capsys.readouterr().out.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 5
+    assert all('", "' not in line and '": ' not in line for line in lines)
+    assert records[0]["template"] == "UserAuthentication"
+
+
+def test_cli_harden_writes_gzip_jsonl(tmp_path):
+    import gzip
+
+    output = tmp_path / "actions.jsonl.gz"
+    exit_code = cli_main(
+        ["--config", "data/sample_templates.yaml", "harden", "--format", "jsonl", "--output", str(output)]
+    )
+    assert exit_code == 0
+    with gzip.open(output, "rt", encoding="utf-8") as handle:
+        records = [json.loads(line) for line in handle]
+    assert {record["template"] for record in records} == {"UserAuthentication", "ESC1-Template"}
+
+
+def test_incremental_scan_only_evaluates_changed_templates(tmp_path):
+    from adcs_lab.incremental import IncrementalScanner
+
+    state = tmp_path / "state.json"
+    config = load_config()
+    first = IncrementalScanner(TemplateAnalyzer(config), state).run()
+    assert len(first.evaluated_templates) == 3
+    assert len(first.new) == len(first.findings) == 5
+
+    config = load_config()
+    config.template_by_name("UserAuthentication").manager_approval_required = True
+    config.remove_template("ESC1-Template")
+    second = IncrementalScanner(TemplateAnalyzer(config), state).run()
+    assert second.evaluated_templates == ["UserAuthentication"]
+    assert second.removed_templates == ["ESC1-Template"]
+    assert second.new == []
+    assert {(f.template, f.rule) for f in second.resolved} == {
+        ("UserAuthentication", "ESC1"),
+        ("ESC1-Template", "ESC1"),
+        ("ESC1-Template", "LOGON-EKU"),
+        ("ESC1-Template", "BROAD-ENROLLMENT"),
+    }
+    assert [(f.template, f.rule) for f in second.unchanged] == [("UserAuthentication", "BROAD-ENROLLMENT")]
+
+    from dataclasses import replace
+
+    analyzer = TemplateAnalyzer(config)
+    analyzer.rules = tuple(replace(rule, version=2) if rule.id == "ESC1" else rule for rule in analyzer.rules)
+    third = IncrementalScanner(analyzer, state).run()
+    assert third.evaluated_templates == ["UserAuthentication", "MachineAuthentication"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_hardening_plan_is_copy_on_write():
+    config = load_config()
+    templates = config.certificate_templates
+    plan = EkuHardener(templates).plan()
+    assert [patch.template for patch in plan.patches] == ["UserAuthentication", "ESC1-Template"]
+    assert templates[2].eku == ("Client Authentication", "Smart Card Logon")
+
+    view = plan.view(templates)
+    assert view[1] is templates[1]
+    assert view[2] is not templates[2] and view[2].eku == ("Client Authentication",)
+    assert TemplateAnalyzer(config, rules=["ESC1"]).evaluate_templates(view) == []
+
+    approval_only = EkuHardener(templates, controls=["manager_approval"]).plan()
+    assert all(list(patch.after) == ["manager_approval_required"] for patch in approval_only.patches)
+
+
+def test_hardening_plan_applies_selectively_and_writes_config(tmp_path):
+    config = load_config()
+    actions = list(
+        EkuHardener(config.certificate_templates)
+        .plan()
+        .select(["esc1-template"])
+        .iter_apply(config.certificate_templates, config)
+    )
+    assert [action.template for action in actions] == ["ESC1-Template"]
+    assert config.template_by_name("UserAuthentication").subject_name_editable is True
+    assert not config.template_flags(config.template_by_name("ESC1-Template")).esc1_prone
+
+    output = tmp_path / "hardened.yaml"
+    config.dump(output)
+    reloaded = LabConfiguration(output)
+    reloaded.load()
+    assert reloaded.certificate_templates == config.certificate_templates
+
+
+def test_cli_harden_dry_run_leaves_config_untouched(tmp_path, capsys):
+    output = tmp_path / "hardened.json"
+    exit_code = cli_main(
+        ["--config", "data/sample_templates.yaml", "harden", "--dry-run", "--output-json", "--write", str(output)]
+    )
+    assert exit_code == 0
+    patches = json.loads(capsys.readouterr().out)
+    assert {"field": "subject_name_editable", "before": True, "after": False} in patches[0]["diff"]
+    written = json.loads(output.read_text(encoding="utf-8"))
+    assert all(template["manager_approval_required"] for template in written["certificate_templates"])
+
+
+def test_cli_dashboard_exports_precomputed_feed(tmp_path):
+    feed = tmp_path / "dashboard.json"
+    previous = os.umask(0o022)
+    try:
+        assert cli_main(["--config", "data/sample_templates.yaml", "dashboard", "--output", str(feed)]) == 0
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE(feed.stat().st_mode) == 0o644
+    document = json.loads(feed.read_text(encoding="utf-8"))
+    assert document["cas"][0]["children"] == ["LAB-SUB-CA"]
+    risks = {template["name"]: template["risk"] for template in document["templates"]}
+    assert risks == {"UserAuthentication": "high", "MachineAuthentication": "none", "ESC1-Template": "high"}
+    assert document["rules"]["ESC1"]["severity"] == "high"
+    assert {"template": "ESC1-Template", "rule": "LOGON-EKU"} in document["detections"]
+    assert document["score"] == {"hardened": 1, "total": 3, "percentage": 33}
+    assert [path.name for path in tmp_path.iterdir() if path.name.startswith("dashboard")] == ["dashboard.json"]
+
+    from adcs_lab.dashboard import build_dashboard
+
+    config = load_config()
+    assert build_dashboard(config)["revision"] == document["revision"]
+
+
+def test_cli_detect_batch_isolates_load_errors(tmp_path, capsys):
+    from pathlib import Path
+
+    from adcs_lab.batch import BatchScanner, resolve_configs
+
+    tenants = tmp_path / "tenants"
+    tenants.mkdir()
+    sample = Path("data/sample_templates.yaml").read_text(encoding="utf-8")
+    (tenants / "a.yaml").write_text(sample, encoding="utf-8")
+    (tenants / "b.yml").write_text(sample, encoding="utf-8")
+    (tenants / "broken.yaml").write_text("certificate_templates: [\n", encoding="utf-8")
+    (tenants / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    exit_code = cli_main(["detect", "--configs", str(tenants), "--format", "json"])
+    assert exit_code == 3
+    report = json.loads(capsys.readouterr().out)
+    assert report["summary"]["configs"] == 3
+    assert report["summary"]["failed"] == 1
+    statuses = {Path(tenant["config"]).name: tenant["exit_code"] for tenant in report["tenants"]}
+    assert statuses == {"a.yaml": 0, "b.yml": 0, "broken.yaml": 3}
+    assert report["summary"]["findings"] == 2 * report["tenants"][0]["summary"]["findings"]
+
+    paths = resolve_configs(str(tenants / "*.yaml"))
+    serial = [report.to_dict() for report in BatchScanner(rules=["ESC1"]).run(paths)]
+    parallel = [report.to_dict() for report in BatchScanner(rules=["ESC1"], workers=2).run(paths)]
+    assert serial == parallel
+
+
+def test_batch_resolves_config_suffixes_case_insensitively(tmp_path):
+    from adcs_lab.batch import resolve_configs
+
+    for name in ("LAB.YAML", "lab.Json", "export.NDJSON", "notes.TXT"):
+        (tmp_path / name).write_text("{}", encoding="utf-8")
+    assert [path.name for path in resolve_configs(tmp_path)] == ["LAB.YAML", "export.NDJSON", "lab.Json"]
+
+
+def test_batch_reports_unreadable_configs(tmp_path):
+    from adcs_lab.batch import BatchScanner
+
+    unreadable = tmp_path / "directory.yaml"
+    unreadable.mkdir()
+    undecodable = tmp_path / "latin1.yaml"
+    undecodable.write_bytes('certificate_templates:\n  - name: "Zertifikat-Prüfung"\n'.encode("latin-1"))
+
+    reports = list(BatchScanner(rules=["ESC1"]).run([unreadable, undecodable, Path("data/sample_templates.yaml")]))
+    assert [report.exit_code for report in reports] == [3, 3, 0]
+    assert all(report.error for report in reports[:2])
+
+
+def test_cli_detect_writes_metrics_textfile(tmp_path):
+    metrics_file = tmp_path / "textfile" / "adcs_lab.prom"
+    argv = ["detect", "--format", "jsonl", "--output", str(tmp_path / "findings.jsonl"), "--metrics-file"]
+    assert cli_main([*argv, str(metrics_file)]) == 0
+    assert cli_main([*argv, str(metrics_file)]) == 0
+    lines = metrics_file.read_text(encoding="utf-8").splitlines()
+    findings = sum(1 for _ in (tmp_path / "findings.jsonl").open(encoding="utf-8"))
+    assert "adcs_lab_scans_total 1" in lines
+    assert "adcs_lab_templates_scanned_total 3" in lines
+    assert "adcs_lab_config_cache_hits_total 1" in lines
+    assert (
+        sum(int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith("adcs_lab_last_scan_findings{"))
+        == findings
+    )
+
+
+def test_metrics_textfile_keeps_collector_readable_permissions(tmp_path):
+    from adcs_lab.metrics import MetricsRegistry, write_textfile
+
+    target = tmp_path / "adcs_lab.prom"
+    previous = os.umask(0o022)
+    try:
+        write_textfile(target, MetricsRegistry())
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE(target.stat().st_mode) == 0o644
+    target.chmod(0o640)
+    write_textfile(target, MetricsRegistry())
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+    assert not list(tmp_path.glob("*.tmp"))
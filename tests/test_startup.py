@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative microseconds reported by ``-X importtime`` for ``adcs_lab.cli``.
+STARTUP_BUDGET_US = int(os.environ.get("ADCS_LAB_STARTUP_BUDGET_US", "200000"))
+DEFERRED_MODULES = (
+    "yaml",
+    "rich",
+    "concurrent.futures.process",
+    "gzip",
+    "adcs_lab.attack_simulator",
+    "adcs_lab.hardening",
+    "adcs_lab.rules",
+)
+
+
+def _import_cli(*options):
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    script = "import sys, adcs_lab.cli; print(','.join(sorted(sys.modules)))"
+    completed = subprocess.run(
+        [sys.executable, *options, "-c", script], capture_output=True, text=True, env=env, check=True
+    )
+    return set(completed.stdout.strip().split(",")), completed.stderr
+
+
+def test_cli_import_defers_heavy_dependencies():
+    modules, _ = _import_cli()
+    assert not [name for name in DEFERRED_MODULES if name in modules]
+
+
+@pytest.mark.benchmark
+def test_cli_import_within_startup_budget():
+    _, stderr = _import_cli("-X", "importtime")
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    assert timings["adcs_lab.cli"] <= STARTUP_BUDGET_US